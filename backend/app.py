@@ -1,16 +1,97 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+import json
+import logging
 import uvicorn
-from cv_process import cv_processing
-import os
+from cv_process import cv_processing_encoded, cv_processing_events, extraction_engine_used
+from circuit_breaker import get_llm_breaker
+from cache import get_result_cache
+from candidate_store import get_candidate_store
+from export import export_stream, export_filename, EXPORT_MEDIA_TYPES
+from matching import match_job_description
+from schema import MatchRequest
+from batch import BatchSource, stream_batch, NDJSON_MEDIA_TYPE
+from jobs import get_job_manager, QueueFullError
+from file_parsing.extraction_pool import get_extraction_pool, shutdown_extraction_pool
+from engine import get_engine, engine_ready
+from startup import get_warm_up
+from payloads import parse_fields, encode_result, json_response, choose_encoding, compressed_stream
+from llm_scheduler import LLMQueueFullError, LLMQueueTimeoutError
+from taxonomy import get_skill_taxonomy, reload_skill_taxonomy
+from uploads import receive_cv_upload, BodySizeLimitMiddleware, request_body_limit
+from logs import configure_logging, shutdown_logging, new_request_id, set_request_id, REQUEST_ID_HEADER
+from shared_state import get_shared_state
+from metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, HTTP_REQUESTS, in_flight, start_server_timing, server_timing_header
+import config
+
+logger=logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app:FastAPI):
+    # Log records are written by a background thread, never on the event loop
+    configure_logging()
+    # Imports, the LLM chain, the taxonomy and the matching matrix load in the background,
+    # so /health answers at once and /ready turns 200 when they are done (startup.py)
+    warm_up=get_warm_up()
+    warmer=asyncio.create_task(warm_up.run())
+    job_manager=get_job_manager()
+    await job_manager.start()
+    # Parsed CVs are written to the candidate store in batches, once it is open (loading its index takes a while)
+    flusher=asyncio.create_task(flush_candidates())
+    # Worker processes of serve.py publish their metrics for whichever one answers /metrics
+    shared_state=get_shared_state()
+    publisher=asyncio.create_task(publish_metrics(shared_state)) if shared_state is not None else None
+    yield
+    warmer.cancel()
+    await job_manager.stop()
+    flusher.cancel()
+    await asyncio.gather(flusher,return_exceptions=True)
+    if publisher is not None:
+        publisher.cancel()
+        await asyncio.to_thread(shared_state.publish_metrics,REGISTRY)
+    shutdown_extraction_pool()
+    shutdown_logging()
+
+async def flush_candidates():
+    """Open the candidate store off the event loop, then write queued candidates every CANDIDATE_STORE_FLUSH_SECONDS
+    (so a partial batch doesn't wait forever), and what is left when cancelled at shutdown"""
+    candidate_store=await asyncio.to_thread(get_candidate_store)
+    if candidate_store is None:
+        return
+    try:
+        while True:
+            await asyncio.sleep(config.CANDIDATE_STORE_FLUSH_SECONDS)
+            try:
+                await asyncio.to_thread(candidate_store.flush)
+            except Exception:
+                logger.exception("Writing candidates failed")
+    finally:
+        await asyncio.to_thread(candidate_store.flush)
+
+async def publish_metrics(shared_state):
+    """Store this worker's metric values every SHARED_METRICS_PUBLISH_SECONDS"""
+    while True:
+        await asyncio.sleep(config.SHARED_METRICS_PUBLISH_SECONDS)
+        try:
+            await asyncio.to_thread(shared_state.publish_metrics,REGISTRY)
+        except Exception:
+            logger.exception("Publishing metrics failed")
 
 app=FastAPI(
     title="CV Parser API",
     description="API to process CVs/Resumes and extract structured data using Google Gemini model",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS middleware
+# Reject oversized uploads with 413 while they are still arriving
+app.add_middleware(BodySizeLimitMiddleware,limit_for_path=request_body_limit)
+
+# CORS middleware (added last so it wraps the 413s too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -23,6 +104,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def observe_requests(request:Request,call_next):
+    """Count requests per route, tag their log records with a request id and add the optional Server-Timing header"""
+    request_id=new_request_id(request.headers.get(REQUEST_ID_HEADER))
+    set_request_id(request_id)
+    timings=start_server_timing() if config.SERVER_TIMING_ENABLED else None
+    status=500
+    try:
+        with in_flight("http_requests"):
+            response=await call_next(request)
+        status=response.status_code
+    finally:
+        # Route template rather than raw path, so ids in URLs don't explode label cardinality
+        route=request.scope.get("route")
+        HTTP_REQUESTS.inc(route=route.path if route is not None else "unmatched",status=status)
+    if timings:
+        response.headers["Server-Timing"]=server_timing_header(timings)
+    response.headers[REQUEST_ID_HEADER]=request_id
+    return response
+
 #API endpoint(s)
 @app.get("/")
 async def root():
@@ -34,46 +135,305 @@ async def root():
     
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status":"healthy"}
+    """Liveness: answers as soon as the server is up, without waiting for the warm-up"""
+    return {"status":"healthy","ready":get_warm_up().ready,"engine_ready":engine_ready(),"llm_breaker":get_llm_breaker().snapshot(),
+            "llm_scheduler":await asyncio.to_thread(get_engine().scheduler.snapshot) if engine_ready() else None}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the extraction engine and LLM chain are loaded, 503 until then"""
+    snapshot=get_warm_up().snapshot()
+    return JSONResponse(snapshot,status_code=200 if snapshot["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Pipeline metrics in Prometheus text format (added up over all serve.py workers)"""
+    shared_state=get_shared_state()
+    content=await asyncio.to_thread(shared_state.render_metrics,REGISTRY) if shared_state is not None else REGISTRY.render()
+    return Response(content=content,media_type=PROMETHEUS_CONTENT_TYPE)
+
+MODE_QUERY=Query(None,pattern="^(llm|lite|auto)$",description="llm (Gemini), lite (no LLM, fast) or auto (LLM with lite fallback)")
+FIELDS_QUERY=Query([],description="Only these EmployeeData fields, e.g. allSkills,experienceYears (repeat or comma separate)")
 
 @app.post("/api/process-cv")
-async def process_cv(file:UploadFile=File(...)):
+async def process_cv(request:Request,file:UploadFile=File(...),mode:Optional[str]=MODE_QUERY,fields:List[str]=FIELDS_QUERY):
     """
     Main endpoint to upload and parse CV files.
     
     Returns:
-        JSON with complete employee data including allSkills array
+        JSON with complete employee data including allSkills array (or only the fields asked for),
+        gzip/brotli compressed when enabled and accepted.
+        The X-Extraction-Engine header says whether Gemini or the lite engine produced it.
     """
-    if not file.filename:
-        raise HTTPException(status_code=400,detail="No file uploaded")
-    file_ext=os.path.splitext(file.filename)[1].lower()
-    
-    if file_ext not in ['.pdf','.docx','.doc']:
-        raise HTTPException(status_code=400,detail="Unsupported file format. Only PDF and DOCX are supported.")
+    upload=await receive_cv_upload(file)
+    file_size=upload.size/(1024*1024) #size in MB
     
-    file_content=await file.read()
-    file_size=len(file_content)/(1024*1024) #size in MB
-    
-    if file_size>10:
-        raise HTTPException(status_code=400,detail="File size exceeds 10MB limit.")
-    
-    # Process CV
+    # Process CV straight from the spooled upload, no in-memory copy of the file
     try:
-        print(f"NEW REQUEST: {file.filename} ({file_size:.2f}MB)")
-        result=await cv_processing(file_content,file_ext)
-        print(f"SUCCESS: Processed {file.filename}")
-        return result
+        projection=parse_fields(split_values(fields))
+        logger.info("CV upload",extra={"format":upload.file_ext,"mb":round(file_size,2)})
+        result,payload=await cv_processing_encoded(upload.buffer,upload.file_ext,file_hash=upload.sha256,mode=mode)
+        # The JSON as the pipeline encoded it; returning the dict would make FastAPI encode it all again
+        return json_response(encode_result(result,payload,projection),request.headers.get("accept-encoding",""),
+                             headers={"X-Extraction-Engine":extraction_engine_used() or ""})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except (LLMQueueFullError,LLMQueueTimeoutError) as e:
+        # Over the model quota for now; the client can come back shortly
+        raise HTTPException(status_code=503,detail=str(e),headers={"Retry-After":"10"})
     except Exception as e:
-        print(f"ERROR: {str(e)}")
+        logger.exception("Processing CV failed")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process CV: {str(e)}"
         )
+
+SSE_MEDIA_TYPE="text/event-stream"
+
+def sse_message(event:str,data:dict)->bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+def sse_result_message(data:dict)->bytes:
+    """The "result" event, with the result's JSON spliced in as the pipeline encoded it"""
+    head=json.dumps({"engine":data["engine"],"cached":data["cached"]})
+    return f"event: result\ndata: {head[:-1]}, \"data\": {data['json']}}}\n\n".encode()
+
+async def stream_cv_events(file_content:bytes,file_ext:str,file_hash:str,mode:Optional[str]):
+    """Pipeline events as Server-Sent Events; failures become a final "error" event"""
+    try:
+        async for event,data in cv_processing_events(file_content,file_ext,file_hash=file_hash,mode=mode):
+            yield sse_result_message(data) if event=="result" else sse_message(event,data)
+    except ValueError as e:
+        yield sse_message("error",{"status":400,"detail":str(e)})
+    except (LLMQueueFullError,LLMQueueTimeoutError) as e:
+        yield sse_message("error",{"status":503,"detail":str(e)})
+    except Exception as e:
+        logger.exception("Streaming CV failed")
+        yield sse_message("error",{"status":500,"detail":f"Failed to process CV: {str(e)}"})
+
+@app.post("/api/process-cv/stream")
+async def process_cv_stream(file:UploadFile=File(...),mode:Optional[str]=MODE_QUERY):
+    """
+    Same as /api/process-cv, but streams Server-Sent Events as each stage finishes:
+    extracted, contact, section (one per completed LLM section), skills, derived,
+    then result with the full EmployeeData (or error).
+    """
+    upload=await receive_cv_upload(file)
+    logger.info("CV stream upload",extra={"format":upload.file_ext,"mb":round(upload.size/(1024*1024),2)})
+    # The form's spooled files are closed once this handler returns, before the stream runs
+    file_content=await asyncio.to_thread(upload.read_bytes)
+    return StreamingResponse(
+        stream_cv_events(file_content,upload.file_ext,upload.sha256,mode),
+        media_type=SSE_MEDIA_TYPE,
+        # No proxy buffering, or the events arrive all at once at the end
+        headers={"Cache-Control":"no-cache","X-Accel-Buffering":"no"},
+    )
+
+@app.post("/api/process-cv/batch")
+async def process_cv_batch(request:Request,files:List[UploadFile]=File(...),mode:Optional[str]=MODE_QUERY,fields:List[str]=FIELDS_QUERY):
+    """
+    Upload several CV files, or a single ZIP archive of CVs, in one request.
+    
+    Returns:
+        Streamed NDJSON, one line per file as soon as it is processed:
+        {"index", "filename", "status": "ok", "engine": "llm"|"lite", "data": {...}} or
+        {"index", "filename", "status": "error", "error": "..."}
+        data has only the fields asked for, if any. The stream is compressed when enabled and accepted.
+    """
+    try:
+        projection=parse_fields(split_values(fields))
+        source=await BatchSource.from_uploads(files)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+    
+    if len(source)==0:
+        source.close()
+        raise HTTPException(status_code=400,detail="No files uploaded")
+    if len(source)>config.BATCH_MAX_FILES:
+        source.close()
+        raise HTTPException(status_code=400,detail=f"Batch exceeds {config.BATCH_MAX_FILES} files limit.")
+    
+    logger.info("CV batch",extra={"files":len(source)})
+    lines=stream_batch(source,on_close=source.close,mode=mode,fields=projection)
+    encoding=choose_encoding(request.headers.get("accept-encoding",""))
+    if encoding is None:
+        return StreamingResponse(lines,media_type=NDJSON_MEDIA_TYPE,headers={"Vary":"Accept-Encoding"} if config.RESPONSE_COMPRESSION else None)
+    return StreamingResponse(compressed_stream(lines,encoding),media_type=NDJSON_MEDIA_TYPE,
+                             headers={"Content-Encoding":encoding,"Vary":"Accept-Encoding"})
+
+@app.post("/api/jobs",status_code=202)
+async def submit_job(file:UploadFile=File(...)):
+    """
+    Queue a CV for background processing and return its job id right away.
+    
+    Returns:
+        Job status JSON; poll GET /api/jobs/{job_id} for the result.
+        429 when the queue is full.
+    """
+    upload=await receive_cv_upload(file)
+    # Jobs outlive the request (and its spooled file), so they keep the bytes
+    file_content=await asyncio.to_thread(upload.read_bytes)
+    try:
+        job=await get_job_manager().submit(file_content,file.filename,upload.file_ext)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429,detail=str(e),headers={"Retry-After":"5"})
+    logger.info("Job queued",extra={"job_id":job.id})
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id:str,wait:float=Query(0,ge=0,description="Long-poll: seconds to wait for the job to finish")):
+    """Job status, timings and (once done) the EmployeeData result"""
+    job=await get_job_manager().wait(job_id,min(wait,config.JOB_LONG_POLL_MAX_SECONDS))
+    if job is None:
+        raise HTTPException(status_code=404,detail="Job not found")
+    return job.to_dict()
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id:str):
+    """Cancel a queued or running job"""
+    job=await get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404,detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/extraction/stats")
+async def extraction_stats():
+    """Throughput of the text extraction process pool"""
+    extraction_pool=get_extraction_pool()
+    if extraction_pool is None:
+        return {"enabled":False}
+    return {"enabled":True,**extraction_pool.stats()}
+
+@app.get("/api/taxonomy")
+async def taxonomy_info():
+    """Loaded skill taxonomy: source file, fingerprint and skills per domain"""
+    return get_skill_taxonomy().describe()
+
+@app.post("/api/taxonomy/reload")
+async def reload_taxonomy():
+    """Recompile the skill taxonomy from its data file without restarting"""
+    try:
+        taxonomy=reload_skill_taxonomy()
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+    return taxonomy.describe()
+
+def split_values(values:List[str])->List[str]:
+    """Repeated and comma separated query values as one list"""
+    return [value.strip() for item in values for value in item.split(",") if value.strip()]
+
+async def require_candidate_store():
+    # Opened off the event loop: the first call loads the whole search index
+    candidate_store=await asyncio.to_thread(get_candidate_store)
+    if candidate_store is None:
+        raise HTTPException(status_code=404,detail="The candidate store is disabled")
+    return candidate_store
+
+@app.get("/api/candidates/search")
+async def search_candidates(
+    skills:List[str]=Query([],description="Skills a candidate must all have (repeat or comma separate)"),
+    any_skills:List[str]=Query([],description="Skills of which a candidate needs at least one"),
+    exclude_skills:List[str]=Query([],description="Skills a candidate must not have"),
+    domains:List[str]=Query([],description="Skill domains a candidate must all have"),
+    min_experience:Optional[float]=Query(None,ge=0),
+    max_experience:Optional[float]=Query(None,ge=0),
+    page:int=Query(1,ge=1),
+    page_size:int=Query(20,ge=1,le=config.CANDIDATE_SEARCH_MAX_PAGE_SIZE),
+):
+    """Parsed candidates by skills, skill domains and years of experience, most experienced first"""
+    candidate_store=await require_candidate_store()
+    return await asyncio.to_thread(
+        candidate_store.search,
+        skills=split_values(skills),
+        any_skills=split_values(any_skills),
+        exclude_skills=split_values(exclude_skills),
+        domains=split_values(domains),
+        min_experience=min_experience,
+        max_experience=max_experience,
+        page=page,
+        page_size=page_size,
+    )
+
+@app.get("/api/candidates/stats")
+async def candidate_stats():
+    """Stored candidates, index terms and writes not yet flushed"""
+    candidate_store=await asyncio.to_thread(get_candidate_store)
+    if candidate_store is None:
+        return {"enabled":False}
+    return {"enabled":True,**await asyncio.to_thread(candidate_store.stats)}
+
+@app.get("/api/candidates/export")
+async def export_candidates(
+    format:str=Query("jsonl",description="jsonl or csv"),
+    table:str=Query("candidates",description="candidates, skills or work_experience"),
+    after:int=Query(0,ge=0,description="Cursor: export candidates with an id above this"),
+    limit:Optional[int]=Query(None,ge=1,description="At most this many candidates; X-Next-Cursor gives the next page"),
+    gzip:bool=Query(False,description="Compress the stream with gzip"),
+):
+    """Stream stored candidates as JSONL or CSV, straight from the database cursor"""
+    candidate_store=await require_candidate_store()
+    try:
+        chunks=export_stream(candidate_store,format,table,after,limit,gzip)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+    headers={"Content-Disposition":f'attachment; filename="{export_filename(format,table,gzip)}"'}
+    if limit is not None:
+        next_cursor=await asyncio.to_thread(candidate_store.next_cursor,after,limit)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"]=str(next_cursor)
+    media_type=EXPORT_MEDIA_TYPES["gzip" if gzip else format]
+    return StreamingResponse(chunks,media_type=media_type,headers=headers)
+
+@app.get("/api/candidates/{candidate_id}")
+async def get_candidate(candidate_id:int):
+    """One stored candidate with the full parsed CV"""
+    candidate_store=await require_candidate_store()
+    candidate=await asyncio.to_thread(candidate_store.get,candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404,detail="Candidate not found")
+    return candidate
+
+@app.delete("/api/candidates/{candidate_id}")
+async def delete_candidate(candidate_id:int):
+    """Remove a candidate and its index entries"""
+    candidate_store=await require_candidate_store()
+    if not await asyncio.to_thread(candidate_store.delete,candidate_id):
+        raise HTTPException(status_code=404,detail="Candidate not found")
+    return {"id":candidate_id,"deleted":True}
+
+@app.post("/api/match")
+async def match_candidates(request:MatchRequest):
+    """Rank stored candidates against a job description by skills, skill domains and experience"""
+    try:
+        return await asyncio.to_thread(match_job_description,request.job_description,request.top_k,request.min_experience)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and sizes of the result cache"""
+    result_cache=get_result_cache()
+    if result_cache is None:
+        return {"enabled":False}
+    return {"enabled":True,**await asyncio.to_thread(result_cache.stats)}
+
+@app.delete("/api/cache")
+async def clear_cache():
+    """Drop every cached result"""
+    result_cache=get_result_cache()
+    if result_cache is not None:
+        await asyncio.to_thread(result_cache.clear)
+    return {"cleared":True}
+
+@app.delete("/api/cache/{file_hash}")
+async def invalidate_cache(file_hash:str):
+    """Drop cached results for one file, identified by the SHA-256 of its bytes"""
+    result_cache=get_result_cache()
+    removed=await asyncio.to_thread(result_cache.invalidate,file_hash.lower()) if result_cache is not None else 0
+    return {"file_hash":file_hash,"removed":removed}
         
 # Running the app: uvicorn app:app --host 0.0.0.0 --port 8000 --reload
+# In production use serve.py (worker processes, graceful draining)
 if __name__=="__main__":
     import uvicorn
     # FIXED: Use string import for reload to work properly
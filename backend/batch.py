@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Sequence
+
+from fastapi import UploadFile
+
+from cv_process import cv_processing_encoded, extraction_engine_used
+from payloads import encode_result
+from uploads import detect_cv_format
+import config
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@dataclass
+class BatchItem:
+    """One CV in a batch. The bytes are only read when the item is scheduled."""
+    filename: str
+    size: int
+    read: Callable[[], bytes]
+
+
+class BatchSource:
+    """
+    Owns the on-disk copy of a batch upload and yields its items lazily.
+
+    FastAPI closes UploadFile objects as soon as the endpoint returns, which is
+    before a StreamingResponse body runs, so uploads are spooled to one private
+    temporary file up front and read back slice by slice while streaming.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._lock = threading.Lock()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._items: List[BatchItem] = []
+
+    @classmethod
+    async def from_uploads(cls, uploads: List[UploadFile]) -> "BatchSource":
+        source = cls()
+        try:
+            if len(uploads) == 1 and (uploads[0].filename or "").lower().endswith(".zip"):
+                await asyncio.to_thread(shutil.copyfileobj, uploads[0].file, source._file)
+                source._open_zip()
+            else:
+                for upload in uploads:
+                    offset = source._file.tell()
+                    await asyncio.to_thread(shutil.copyfileobj, upload.file, source._file)
+                    size = source._file.tell() - offset
+                    source._items.append(BatchItem(upload.filename or "", size, source._slice_reader(offset, size)))
+        except Exception:
+            source.close()
+            raise
+        return source
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+        self._file.close()
+
+    def _slice_reader(self, offset: int, size: int) -> Callable[[], bytes]:
+        def read() -> bytes:
+            with self._lock:
+                self._file.seek(offset)
+                return self._file.read(size)
+        return read
+
+    def _open_zip(self) -> None:
+        self._file.seek(0)
+        try:
+            self._zip = zipfile.ZipFile(self._file)
+        except zipfile.BadZipFile:
+            raise ValueError("Uploaded archive is not a valid ZIP file")
+
+        for info in self._zip.infolist():
+            name = info.filename
+            base = os.path.basename(name)
+            # Skip folders and OS metadata (__MACOSX/, .DS_Store, ...)
+            if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+                continue
+            self._items.append(BatchItem(name, info.file_size, self._member_reader(info)))
+
+    def _member_reader(self, info: zipfile.ZipInfo) -> Callable[[], bytes]:
+        def read() -> bytes:
+            return self._zip.read(info)
+        return read
+
+
+_limits: Optional[tuple] = None
+
+
+def _batch_limits() -> tuple:
+    """Process-wide semaphores so concurrent batches share one extraction/LLM budget."""
+    global _limits
+    if _limits is None:
+        _limits = (
+            asyncio.Semaphore(config.BATCH_EXTRACTION_CONCURRENCY),
+            asyncio.Semaphore(config.BATCH_LLM_CONCURRENCY),
+        )
+    return _limits
+
+
+async def _process_item(index: int, item: BatchItem, extraction_limit, llm_limit, mode: Optional[str] = None,
+                        fields: Optional[Sequence[str]] = None) -> bytes:
+    line = {"index": index, "filename": item.filename}
+    file_ext = os.path.splitext(item.filename)[1].lower()
+    try:
+        if file_ext not in config.SUPPORTED_EXTENSIONS:
+            raise ValueError("Unsupported file format. Only PDF and DOCX are supported.")
+        if item.size > config.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+            raise ValueError(f"File size exceeds {config.MAX_UPLOAD_SIZE_MB}MB limit.")
+
+        file_content = await asyncio.to_thread(item.read)
+        file_ext = detect_cv_format(file_content)
+        data, payload = await cv_processing_encoded(file_content, file_ext, extraction_limit=extraction_limit, llm_limit=llm_limit, mode=mode)
+        line["status"] = "ok"
+        line["engine"] = extraction_engine_used()
+    except Exception as e:
+        logger.warning("Batch file failed", extra={"index": line["index"], "error": str(e)})
+        line["status"] = "error"
+        line["error"] = str(e)
+        return (json.dumps(line) + "\n").encode("utf-8")
+    # The result's JSON is spliced in as encoded by the pipeline, not decoded and encoded again
+    return json.dumps(line)[:-1].encode("utf-8") + b', "data": ' + encode_result(data, payload, fields) + b"}\n"
+
+
+async def stream_batch(items: Iterable[BatchItem], on_close: Optional[Callable[[], None]] = None, mode: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> AsyncIterator[bytes]:
+    """
+    Process batch items concurrently and yield one NDJSON line per file as soon as it finishes
+    (with only the given EmployeeData fields, if any).
+
+    Only a bounded window of items is in flight at once, so neither the inputs
+    nor the results of a large batch are all held in memory.
+    """
+    extraction_limit, llm_limit = _batch_limits()
+    max_in_flight = config.BATCH_EXTRACTION_CONCURRENCY + config.BATCH_LLM_CONCURRENCY
+    pending = set()
+    try:
+        for index, item in enumerate(items):
+            if len(pending) >= max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(_process_item(index, item, extraction_limit, llm_limit, mode, fields)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Client went away or the stream finished: stop outstanding work and drop the spool
+        for task in pending:
+            task.cancel()
+        if on_close is not None:
+            on_close()
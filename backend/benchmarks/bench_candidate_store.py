@@ -0,0 +1,112 @@
+"""
+Benchmark: candidate search through the inverted index vs scanning every stored CV.
+
+Loads synthetic parsed candidates into a temporary CandidateStore in batches,
+then runs a set of searches both ways, checks they return the same candidates
+and reports timings.
+
+Usage (from backend/):
+    python -m benchmarks.bench_candidate_store [--candidates 100000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from benchmarks.bench_skill_matcher import SKILL_POOL
+from candidate_store import CandidateStore, skill_term, domain_term, candidate_terms
+from taxonomy import get_skill_taxonomy
+
+QUERIES = [
+    {"skills": ["Kubernetes"], "min_experience": 3},
+    {"skills": ["Python", "Docker"], "any_skills": ["AWS", "GCP", "Azure"]},
+    {"skills": ["React.js"], "exclude_skills": ["Angular"], "max_experience": 2},
+    {"domains": ["DevOps & Cloud"], "min_experience": 5, "max_experience": 10},
+    {"skills": ["Rust", "Go", "Terraform", "PyTorch"]},
+    {"min_experience": 12},
+]
+
+
+def make_candidate(index: int, rng: random.Random) -> dict:
+    taxonomy = get_skill_taxonomy()
+    skills = rng.sample(SKILL_POOL, k=rng.randint(6, 24))
+    domains = [taxonomy.classify(name) for name in skills]
+    return {
+        "fullName": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "designation": rng.choice(["Backend Developer", "Data Scientist", "DevOps Engineer", "Frontend Developer"]),
+        "allSkills": [{"name": name, "mentions": rng.randint(1, 5), "category": "technical"} for name in skills],
+        "primarySkill": max(set(domains), key=domains.count),
+        "secondarySkill": "",
+        "experienceYears": round(rng.uniform(0, 20), 1),
+        "workExperience": [],
+        "education": "",
+    }
+
+
+def scan(store: CandidateStore, query: dict) -> List[int]:
+    """Reference search: parse every stored payload and filter in Python."""
+    required = {skill_term(name) for name in query.get("skills", [])} | {domain_term(name) for name in query.get("domains", [])}
+    optional = {skill_term(name) for name in query.get("any_skills", [])}
+    excluded = {skill_term(name) for name in query.get("exclude_skills", [])}
+    low, high = query.get("min_experience"), query.get("max_experience")
+    hits = []
+    for candidate_id, payload in store._db.execute("SELECT id, payload FROM candidates"):
+        data = json.loads(payload)
+        terms = set(candidate_terms(data))
+        years = data["experienceYears"]
+        if (required <= terms and (not optional or optional & terms) and not excluded & terms
+                and (low is None or years >= low) and (high is None or years <= high)):
+            hits.append((-years, -candidate_id))
+    return [-candidate_id for _, candidate_id in sorted(hits)]
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandidateStore(db_path=os.path.join(tmp, "candidates.db"))
+        start = time.perf_counter()
+        for first in range(0, args.candidates, args.batch):
+            store.add_many((f"hash{index}", make_candidate(index, rng)) for index in range(first, min(first + args.batch, args.candidates)))
+        load_s = time.perf_counter() - start
+
+        results = {"load": {**store.stats(), "seconds": round(load_s, 2), "per_second": round(args.candidates / load_s)}, "queries": []}
+        for query in QUERIES:
+            page = store.search(**query, page_size=20)
+            scan_start = time.perf_counter()
+            expected = scan(store, query)
+            scan_s = time.perf_counter() - scan_start
+            if page["total"] != len(expected) or [hit["id"] for hit in page["results"]] != expected[:20]:
+                raise SystemExit(f"Index and scan disagree on {query}: {page['total']} vs {len(expected)}")
+            index_s = timed(lambda: store.search(**query, page_size=20), args.repeat)
+            results["queries"].append({
+                "query": query,
+                "total": page["total"],
+                "index_ms": round(index_s * 1000, 2),
+                "scan_ms": round(scan_s * 1000, 1),
+                "speedup": round(scan_s / index_s, 1),
+            })
+        store.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Cold-start budget: how long `import app` takes and how soon a freshly
+started server answers /health and /ready, tracked across commits.
+
+Every run uses new interpreters: one for `python -X importtime -c "import
+app"` (total import time and the slowest imports directly under app), one
+running `uvicorn app:app` on a free port, polled until /health and then
+/ready answer 200 (times from process start). It also checks that none of
+the modules startup.py loads lazily (langchain, PDF/DOCX libraries) is
+imported by `import app` again. The report has the median of --runs runs;
+with --history it is appended there as one JSON line tagged with the git
+commit, and the change against the previous line is printed. With
+--budget-health / --budget-ready the exit code is 1 when the median is over
+budget or a lazy module is imported eagerly, for CI.
+
+The server runs in a temporary directory (empty candidate database, result
+cache off as in bench_pipeline) and without the LLM warm-up call, so only
+local work is timed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start [--runs 5] [--top 12]
+        [--history cold_start_history.jsonl] [--budget-health 1.5] [--budget-ready 5]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_pipeline import git_commit
+from startup import heavy_modules
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+POLL_SECONDS = 0.01
+STARTUP_TIMEOUT_SECONDS = 120
+
+
+def server_env(work_dir: str) -> Dict[str, str]:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, LLM_WARMUP_ON_STARTUP="false",
+               CANDIDATE_DB_PATH=os.path.join(work_dir, "candidates.db"))
+    env.setdefault("GOOGLE_API_KEY", "bench")
+    return env
+
+
+def measure_imports(env: Dict[str, str], work_dir: str) -> Tuple[float, Dict[str, float], List[str]]:
+    """(seconds to import app, seconds per module imported directly by app, lazy modules imported anyway)."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=work_dir, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    children: Dict[str, float] = {}
+    imported = set()
+    total = 0.0
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        cumulative, level, name = int(match.group(2)) / 1e6, (len(match.group(3)) - 1) // 2, match.group(4)
+        imported.add(name)
+        if level == 0:
+            if name == "app":
+                total = cumulative
+                break
+            children = {}
+        elif level == 1:
+            children[name] = cumulative
+    eager = [name for name in heavy_modules() if name in imported]
+    return total, children, eager
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_server(env: Dict[str, str], work_dir: str) -> Tuple[float, float]:
+    """Seconds from starting uvicorn until /health, then /ready, first answer 200."""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    times: Dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            for path in ("/health", "/ready"):
+                while True:
+                    if time.perf_counter() - started > STARTUP_TIMEOUT_SECONDS:
+                        raise RuntimeError(f"{path} did not answer 200 within {STARTUP_TIMEOUT_SECONDS}s")
+                    if process.poll() is not None:
+                        raise RuntimeError(f"The server exited with code {process.returncode} before {path} answered")
+                    try:
+                        if client.get(path).status_code == 200:
+                            times[path] = time.perf_counter() - started
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(POLL_SECONDS)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return times["/health"], times["/ready"]
+
+
+def last_entry(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="slowest imports under app to list")
+    parser.add_argument("--history", help="append the report to this JSON lines file and compare with its last entry")
+    parser.add_argument("--budget-health", type=float, help="max median seconds until /health answers")
+    parser.add_argument("--budget-ready", type=float, help="max median seconds until /ready answers")
+    args = parser.parse_args()
+
+    import_times, health_times, ready_times = [], [], []
+    slowest: Dict[str, List[float]] = {}
+    eager: List[str] = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as work_dir:
+            env = server_env(work_dir)
+            total, children, eager = measure_imports(env, work_dir)
+            import_times.append(total)
+            for name, seconds in children.items():
+                slowest.setdefault(name, []).append(seconds)
+            health, ready = measure_server(env, work_dir)
+            health_times.append(health)
+            ready_times.append(ready)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "import_app_seconds": round(statistics.median(import_times), 3),
+        "health_seconds": round(statistics.median(health_times), 3),
+        "ready_seconds": round(statistics.median(ready_times), 3),
+        "slowest_imports": {
+            name: round(statistics.median(seconds), 3)
+            for name, seconds in sorted(slowest.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+        },
+        "eager_heavy_imports": eager,
+    }
+    if args.history:
+        previous = last_entry(args.history)
+        if previous is not None:
+            report["change_since"] = {
+                "commit": previous.get("commit"),
+                **{key: round(report[key] - previous[key], 3)
+                   for key in ("import_app_seconds", "health_seconds", "ready_seconds") if key in previous},
+            }
+        with open(args.history, "a") as f:
+            f.write(json.dumps(report) + "\n")
+    print(json.dumps(report, indent=2))
+
+    over = []
+    if args.budget_health is not None and report["health_seconds"] > args.budget_health:
+        over.append(f"/health after {report['health_seconds']}s (budget {args.budget_health}s)")
+    if args.budget_ready is not None and report["ready_seconds"] > args.budget_ready:
+        over.append(f"/ready after {report['ready_seconds']}s (budget {args.budget_ready}s)")
+    if (args.budget_health is not None or args.budget_ready is not None) and eager:
+        over.append(f"imported by `import app`: {', '.join(eager)}")
+    if over:
+        print("Cold start over budget: " + "; ".join(over), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: streaming DOCX extraction (iterparse of word/document.xml) vs python-docx.
+
+Builds DOCX files from the synthetic corpus, optionally padded with many more
+paragraphs and with incompressible embedded images, then extracts each one
+with both extractors in a fresh subprocess, so peak RSS (which also counts
+lxml's C allocations) is that of one extraction alone. Also checks that both
+produce the same text blocks (the streaming extractor keeps document order,
+python-docx puts tables last).
+
+Usage (from backend/):
+    python -m benchmarks.bench_docx [--count 5] [--repeat-text 20] [--images 8] [--image-px 1000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from io import BytesIO
+from typing import Dict, List
+
+from docx import Document
+from docx.shared import Inches
+
+from benchmarks.corpus import generate_corpus
+from file_parsing.doc_parse import DOCX_EXTRACTORS, extract_from_doc
+
+
+def noise_png(size: int, rng: random.Random) -> bytes:
+    """RGB PNG of random pixels: doesn't compress, like photos in a portfolio CV."""
+    row_bytes = size * 3
+    raw = b"".join(b"\x00" + rng.getrandbits(8 * row_bytes).to_bytes(row_bytes, "little") for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+def build_docx(cv, repeat_text: int, images: List[bytes]) -> bytes:
+    """The corpus CV's content repeated repeat_text times, with the images spread through it."""
+    document = Document()
+    for copy in range(repeat_text):
+        for line in cv.lines:
+            if line:
+                document.add_paragraph(line)
+        table = document.add_table(rows=0, cols=2)
+        for group, names in cv.skill_table:
+            cells = table.add_row().cells
+            cells[0].text, cells[1].text = group, names
+        if copy < len(images):
+            document.add_picture(BytesIO(images[copy]), width=Inches(2))
+    for image in images[repeat_text:]:
+        document.add_picture(BytesIO(image), width=Inches(2))
+    out = BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _rss_kib(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def child(extractor: str, path: str) -> None:
+    """Extract one file and print time and peak RSS growth (run in its own process)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        # Reset the peak (VmHWM) so reading the file and importing don't hide the extraction's own peak
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        peak = lambda: _rss_kib("VmHWM")
+        before = _rss_kib("VmRSS")
+    except OSError:
+        # Not Linux: only growth above the peak so far shows (ru_maxrss is in KiB on Linux, bytes on macOS)
+        peak = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        before = peak()
+    start = time.perf_counter()
+    text = extract_from_doc(data, extractor)
+    seconds = time.perf_counter() - start
+    after = peak()
+    print(json.dumps({
+        "seconds": seconds,
+        "peak_rss_growth_mb": (after - before) / 1024,
+        "blocks": sorted(text.split("\n\n")),
+    }))
+
+
+def measure(extractor: str, path: str) -> Dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_docx", "--child", extractor, path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat-text", type=int, default=20, help="Copies of each CV's content per document")
+    parser.add_argument("--images", type=int, default=8, help="Embedded images per document")
+    parser.add_argument("--image-px", type=int, default=1000, help="Image width and height in pixels")
+    parser.add_argument("--child", nargs=2, metavar=("EXTRACTOR", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    rng = random.Random(args.seed)
+    images = [noise_png(args.image_px, rng) for _ in range(args.images)]
+    corpus = generate_corpus(args.count, args.seed)
+    totals = {extractor: {"seconds": 0.0, "peak_rss_growth_mb": []} for extractor in DOCX_EXTRACTORS}
+    same_text = True
+    sizes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for cv in corpus:
+            path = os.path.join(tmp, f"{cv.name}.docx")
+            with open(path, "wb") as f:
+                f.write(build_docx(cv, args.repeat_text, images))
+            sizes.append(os.path.getsize(path))
+            runs = {extractor: measure(extractor, path) for extractor in DOCX_EXTRACTORS}
+            same_text = same_text and runs["stream"]["blocks"] == runs["python-docx"]["blocks"]
+            for extractor, run in runs.items():
+                totals[extractor]["seconds"] += run["seconds"]
+                totals[extractor]["peak_rss_growth_mb"].append(run["peak_rss_growth_mb"])
+
+    results = {
+        extractor: {
+            "ms_per_document": round(total["seconds"] * 1000 / len(corpus), 1),
+            "avg_peak_rss_growth_mb": round(sum(total["peak_rss_growth_mb"]) / len(corpus), 1),
+            "max_peak_rss_growth_mb": round(max(total["peak_rss_growth_mb"]), 1),
+        }
+        for extractor, total in totals.items()
+    }
+    print(json.dumps({
+        "documents": len(corpus),
+        "avg_docx_mb": round(sum(sizes) / len(sizes) / (1024 * 1024), 2),
+        "same_text_blocks": same_text,
+        "extractors": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: per-request chain construction (old cv_processing) vs the shared ExtractionEngine.
+
+Both sides call the same zero-latency stub model, so the difference is the
+per-request setup: building ChatGoogleGenerativeAI (and its client), the
+PydanticOutputParser, the format instructions and the PromptTemplate.
+
+Usage (from backend/):
+    python -m benchmarks.bench_engine [--requests 200]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain.prompts import PromptTemplate
+from langchain.output_parsers import PydanticOutputParser
+
+from benchmarks.stub_llm import StubChatModel
+from engine import ExtractionEngine
+from schema import EmployeeData
+import config
+
+CV_TEXT = "Jane Doe\njane.doe@example.com\nTECHNICAL SKILLS\nPython, FastAPI, Docker\n" * 20
+
+
+async def per_request(stub: StubChatModel) -> EmployeeData:
+    """What cv_processing used to do on every call."""
+    ChatGoogleGenerativeAI(
+        model=config.GOOGLE_MODEL,
+        google_api_key=config.GOOGLE_API_KEY or "benchmark-key",
+        temperature=config.GENAI_TEMPERATURE,
+        max_output_tokens=config.GENAI_MAX_OUTPUT_TOKENS,
+    )
+    parser = PydanticOutputParser(pydantic_object=EmployeeData)
+    prompt = PromptTemplate(
+        template=config.CV_PROCESSING_PROMPT,
+        input_variables=["cv_text"],
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+    chain = prompt | stub | parser
+    return await chain.ainvoke({"cv_text": CV_TEXT})
+
+
+async def run(requests: int) -> dict:
+    stub = StubChatModel()
+    engine = ExtractionEngine(llm=stub)
+
+    # Warm both paths once (imports, lazy inits)
+    await per_request(stub)
+    await engine.extract(CV_TEXT)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await per_request(stub)
+    before = (time.perf_counter() - started) / requests
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await engine.extract(CV_TEXT)
+    after = (time.perf_counter() - started) / requests
+
+    return {
+        "requests": requests,
+        "per_request_build_ms": round(before * 1000, 3),
+        "shared_engine_ms": round(after * 1000, 3),
+        "overhead_saved_ms": round((before - after) * 1000, 3),
+        "speedup": round(before / after, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
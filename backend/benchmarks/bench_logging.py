@@ -0,0 +1,164 @@
+"""
+Benchmark: event-loop stalls from logging on the request path.
+
+Simulated requests run concurrently on one event loop while a ticker task
+measures how late its 1 ms sleeps wake up (event-loop lag). Each request
+logs what cv_processing used to print (the full CV text, every skill, every
+job, per-item experience and ranking lines) or what it logs now, to a stream
+whose writes are slow, as with a full pipe to a log collector:
+
+    print:          the old print() calls, written synchronously to the stream
+    sync_logging:   the new log calls with a plain StreamHandler (still on the loop)
+    queue_logging:  the new log calls through logs.configure_logging (writer thread)
+
+Usage (from backend/):
+    python -m benchmarks.bench_logging [--requests 200] [--concurrency 20] [--write-ms 0.2]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.bench_pipeline import percentile
+from benchmarks.corpus import generate_corpus
+import logs
+
+logger = logging.getLogger("cv_process")
+
+
+class SlowStream:
+    """Text stream whose every write blocks for a while, like a pipe nobody is draining fast enough."""
+
+    def __init__(self, write_seconds: float):
+        self.write_seconds = write_seconds
+        self.writes = 0
+        self.chars = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.write_seconds)
+        self.writes += 1
+        self.chars += len(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def old_prints(cv) -> None:
+    """The print volume of cv_processing and utils before they logged through logs.py."""
+    employee = cv.employee
+    text = "\n".join(cv.lines)
+    print(f"Extracting data from .pdf file")
+    print(f"Extracted {len(text)} characters from CV")
+    print(f"\n=== FULL CV TEXT ===")
+    print(text)
+    print("=" * 50)
+    print(f"Skills extracted: {len(employee['allSkills'])}")
+    for skill in employee["allSkills"]:
+        print(f"  - {skill['name']} (mentions: {skill['mentions']}, category: {skill['category']})")
+    for job in employee["workExperience"]:
+        print(f"  - {job['company']} | {job['position']}")
+        print(f"    Start: '{job['startDate']}' | End: '{job['endDate']}'")
+    for job in employee["workExperience"]:
+        print(f"Processing {job['company']}: startDate='{job['startDate']}', endDate='{job['endDate']}'")
+        print(f"  Parsed start_date: {job['startDate']}")
+        print(f"  Parsed end_date: {job['endDate']}")
+        print(f"  Duration: 365 days")
+    print(f"Ranking {len(employee['allSkills'])} skills")
+    print(f"\nDomain aggregation:")
+    print("Processing complete!")
+
+
+def new_logs(cv) -> None:
+    """The log calls cv_processing makes now, at INFO level."""
+    employee = cv.employee
+    text = "\n".join(cv.lines)
+    logger.info("Extracted text", extra={"format": "pdf", "bytes": len(cv.pdf), "characters": len(text)})
+    logger.debug("Full CV text", extra={"cv_text": text})
+    logger.info("Segmented CV", extra={"confidence": 0.9, "fallback": False, "original_tokens": len(text) // 4, "prompt_tokens": len(text) // 5})
+    logger.info("Extraction completed", extra={"engine": "llm", "skills": len(employee["allSkills"]), "jobs": len(employee["workExperience"])})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Extracted skills", extra={"skills": [skill["name"] for skill in employee["allSkills"]]})
+    logger.info("Processing complete", extra={"engine": "llm", "skills": len(employee["allSkills"]), "jobs": len(employee["workExperience"])})
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def run(mode: str, corpus, requests: int, concurrency: int, write_seconds: float) -> Dict:
+    stream = SlowStream(write_seconds)
+    root = logging.getLogger()
+    handler = None
+    if mode == "sync_logging":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logs.JsonFormatter())
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "queue_logging":
+        logs.configure_logging(level="INFO", fmt="json", stream=stream)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(1)
+
+    async def request(index: int) -> None:
+        async with semaphore:
+            # Stand-in for the awaits of a real request (extraction, model call)
+            await asyncio.sleep(rng.uniform(0.001, 0.005))
+            cv = corpus[index % len(corpus)]
+            if mode == "print":
+                with contextlib.redirect_stdout(stream):
+                    old_prints(cv)
+            else:
+                new_logs(cv)
+            await asyncio.sleep(rng.uniform(0.001, 0.005))
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(request(index) for index in range(requests)))
+    seconds = time.perf_counter() - started
+    stop.set()
+    await tick
+
+    if handler is not None:
+        root.removeHandler(handler)
+    elif mode == "queue_logging":
+        logs.shutdown_logging()  # waits for the writer thread to write everything out
+    lags.sort()
+    return {
+        "requests_per_second": round(requests / seconds, 1),
+        "loop_lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+        "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+        "writes": stream.writes,
+        "kb_written": round(stream.chars / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-ms", type=float, default=0.2, help="Time each write to the log stream blocks")
+    parser.add_argument("--count", type=int, default=10, help="Synthetic CVs to cycle through")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count)
+    results = {
+        mode: asyncio.run(run(mode, corpus, args.requests, args.concurrency, args.write_ms / 1000))
+        for mode in ("print", "sync_logging", "queue_logging")
+    }
+    print(json.dumps({"requests": args.requests, "write_ms": args.write_ms, "modes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
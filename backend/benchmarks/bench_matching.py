@@ -0,0 +1,120 @@
+"""
+Benchmark: ranking candidates against job descriptions with the vectorized
+CandidateMatrix vs scoring them one by one in Python.
+
+For each size it builds the matrix from synthetic parsed candidates, times
+adding one more batch incrementally, then ranks every candidate for a few job
+descriptions both ways and checks that the top scores agree.
+
+Usage (from backend/):
+    python -m benchmarks.bench_matching [--sizes 10000 100000] [--repeat 20]
+"""
+import argparse
+import json
+import math
+import random
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_candidate_store import make_candidate
+from candidate_store import SKILL_TERM, DOMAIN_TERM, candidate_terms
+from matching import CandidateMatrix, JobProfile, parse_job_description
+import config
+
+JOB_DESCRIPTIONS = {
+    "backend": """Senior Backend Engineer
+Requirements:
+- 5+ years of experience building APIs with Python and FastAPI or Django
+- PostgreSQL, Redis, Docker
+Nice to have:
+- Kubernetes, AWS
+""",
+    "ml": """Machine Learning Engineer (3-5 years experience)
+Must have: PyTorch or TensorFlow, Python, Pandas, NumPy, scikit-learn.
+Familiarity with Docker is a plus.
+""",
+    "frontend": "Frontend developer with React.js, TypeScript, HTML, CSS and Tailwind CSS. 2 years of experience.",
+}
+
+
+def reference_scores(entries: List[Tuple[int, float, Dict[str, int]]], profile: JobProfile) -> Dict[int, float]:
+    """Same score as CandidateMatrix.rank, computed per candidate in plain Python."""
+    scale = 1.0 / math.log1p(config.MATCH_MENTIONS_SATURATION)
+    skill_total = sum(profile.skills.values())
+    domain_norm = math.sqrt(sum(weight * weight for weight in profile.domains.values()))
+    scores = {}
+    for candidate_id, years, terms in entries:
+        parts = []
+        if profile.skills:
+            covered = sum(weight * min(1.0, math.log1p(terms[term]) * scale) for term, weight in profile.skills.items() if term in terms)
+            parts.append((config.MATCH_SKILL_WEIGHT, covered / skill_total))
+        if domain_norm:
+            domains = {term: mentions for term, mentions in terms.items() if term.startswith(DOMAIN_TERM)}
+            norm = math.sqrt(sum(mentions * mentions for mentions in domains.values()))
+            dot = sum(weight * domains.get(term, 0) for term, weight in profile.domains.items())
+            parts.append((config.MATCH_DOMAIN_WEIGHT, dot / (norm * domain_norm) if norm else 0.0))
+        if profile.min_years:
+            parts.append((config.MATCH_EXPERIENCE_WEIGHT, min(1.0, years / profile.min_years)))
+        scores[candidate_id] = sum(weight * value for weight, value in parts) / sum(weight for weight, _ in parts)
+    return scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    profiles = {name: parse_job_description(text) for name, text in JOB_DESCRIPTIONS.items()}
+    rng = random.Random(args.seed)
+    entries: List[Tuple[int, float, Dict[str, int]]] = []
+    results = []
+    for size in sorted(args.sizes):
+        while len(entries) < size + args.batch:
+            data = make_candidate(len(entries), rng)
+            entries.append((len(entries) + 1, data["experienceYears"], candidate_terms(data)))
+
+        matrix = CandidateMatrix()
+        start = time.perf_counter()
+        for first in range(0, size, args.batch):
+            matrix.add(entries[first:min(first + args.batch, size)])
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        matrix.add(entries[size:size + args.batch])
+        incremental_s = time.perf_counter() - start
+        ranked_entries = entries[:size + args.batch]
+
+        row = {
+            "candidates": len(matrix),
+            "build_s": round(build_s, 3),
+            f"add_{args.batch}_ms": round(incremental_s * 1000, 2),
+            "jobs": {},
+        }
+        for name, profile in profiles.items():
+            _, ranked = matrix.rank(profile, args.top_k)
+            start = time.perf_counter()
+            expected = reference_scores(ranked_entries, profile)
+            loop_s = time.perf_counter() - start
+            best = sorted(expected.values(), reverse=True)[:args.top_k]
+            if any(abs(result["score"] - score) > 1e-3 for result, score in zip(ranked, best)):
+                raise SystemExit(f"Vectorized and reference scores disagree for {name}")
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                matrix.rank(profile, args.top_k)
+            rank_s = (time.perf_counter() - start) / args.repeat
+            row["jobs"][name] = {
+                "jd_skills": len(profile.skills),
+                "rank_ms": round(rank_s * 1000, 2),
+                "python_loop_ms": round(loop_s * 1000, 1),
+                "speedup": round(loop_s / rank_s, 1),
+            }
+        results.append(row)
+
+    print(json.dumps({"job_profiles": {name: profile.to_dict() for name, profile in profiles.items()}, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
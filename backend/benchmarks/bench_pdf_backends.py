@@ -0,0 +1,80 @@
+"""
+Benchmark: PDF text extraction backends on the same synthetic corpus.
+
+Every installed backend (see file_parsing.pdf_parse.available_pdf_backends)
+extracts each PDF of the corpus in full and again under a page budget. Speed
+is pages per second; fidelity is how many of the words written into the PDF
+come back (recall) and how many extracted words were really there
+(precision), so a fast engine that drops or garbles text shows up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_backends [--count 20] [--max-pages 3] [--repeat 3]
+"""
+import argparse
+import json
+import re
+import time
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.corpus import generate_corpus
+from file_parsing.pdf_parse import PDF_BACKENDS, available_pdf_backends, extract_from_pdf
+
+WORD_RE = re.compile(r"\S+")
+
+
+def fidelity(expected: str, extracted: str) -> Dict[str, float]:
+    """Word-level recall and precision of extracted text against the text written into the PDF."""
+    expected_words = Counter(WORD_RE.findall(expected))
+    extracted_words = Counter(WORD_RE.findall(extracted))
+    matched = sum((expected_words & extracted_words).values())
+    return {
+        "recall": matched / max(1, sum(expected_words.values())),
+        "precision": matched / max(1, sum(extracted_words.values())),
+    }
+
+
+def run(backend: str, corpus, repeat: int, max_pages: int) -> Dict:
+    pages = sum(min(cv.pages, max_pages) if max_pages else cv.pages for cv in corpus)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        texts = [extract_from_pdf(cv.pdf, backend=backend, max_pages=max_pages, max_chars=0) for cv in corpus]
+    seconds = (time.perf_counter() - start) / repeat
+    row = {
+        "seconds": round(seconds, 3),
+        "ms_per_document": round(seconds * 1000 / len(corpus), 2),
+        "pages_per_second": round(pages / seconds, 1),
+    }
+    if not max_pages:
+        scores = [fidelity("\n".join(cv.lines), text) for cv, text in zip(corpus, texts)]
+        row["word_recall"] = round(sum(score["recall"] for score in scores) / len(scores), 4)
+        row["word_precision"] = round(sum(score["precision"] for score in scores) / len(scores), 4)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-pages", type=int, default=3, help="Page budget for the early-stop run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    installed = available_pdf_backends()
+    results: Dict[str, Dict] = {}
+    for backend in installed:
+        results[backend] = {
+            "full": run(backend, corpus, args.repeat, 0),
+            f"first_{args.max_pages}_pages": run(backend, corpus, args.repeat, args.max_pages),
+        }
+    print(json.dumps({
+        "documents": len(corpus),
+        "pages": sum(cv.pages for cv in corpus),
+        "not_installed": [name for name in PDF_BACKENDS if name not in installed],
+        "backends": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Offline throughput/latency benchmark for the CV pipeline.
+
+Runs each stage on a synthetic corpus (see benchmarks.corpus), then drives the
+full POST /api/process-cv endpoint in-process under concurrent load, with the
+Gemini model replaced by StubChatModel answering each CV's ground truth.
+Prints (and optionally writes) one JSON report with p50/p95/p99 latency,
+requests per second and peak RSS, tagged with the git commit so runs can be
+compared across commits.
+
+The result cache is off for the run (set CACHE_ENABLED=true to measure it).
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline [--count 20] [--requests 200] [--concurrency 16]
+        [--llm-latency 0.5] [--llm-jitter 0.2] [--llm-seconds-per-token 0.002]
+        [--strategy single|sectioned] [--output report.json]
+"""
+import os
+
+# Before config is imported: repeated corpus files must not be served from the cache
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("JOB_QUEUE_DB_PATH", "")
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import SyntheticCV, generate_corpus
+from benchmarks.stub_llm import StubChatModel
+from engine import ExtractionEngine, set_engine
+from file_parsing.doc_parse import extract_from_doc
+from file_parsing.pdf_parse import extract_from_pdf
+from schema import Skill, WorkExperience
+from utils import calc_years_of_experience, derive_domain_from_skills, recount_skill_mentions
+
+EMAIL_RE = re.compile(r"[\w.+-]+@example\.com")
+# Output schema in the prompt's format instructions (PydanticOutputParser)
+SCHEMA_RE = re.compile(r"```\n(\{.*?\})\n```", re.DOTALL)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list (q in 0-100)."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], wall_seconds: Optional[float] = None) -> Dict:
+    """Latency percentiles in ms; RPS over wall time (or back-to-back time for serial runs)."""
+    ordered = sorted(latencies)
+    elapsed = wall_seconds if wall_seconds is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def peak_rss_mb() -> Dict:
+    """Peak resident set size of this process and of reaped children (extraction pool workers)."""
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_calls(inputs: List, fn: Callable, repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        for args in inputs:
+            started = time.perf_counter()
+            fn(*args)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_stages(corpus: List[SyntheticCV], repeat: int) -> Dict:
+    """Each pipeline stage on its own, called back to back over the corpus."""
+    texts = [extract_from_pdf(cv.pdf) for cv in corpus]
+    skills = [[Skill(**s) for s in cv.employee["allSkills"]] for cv in corpus]
+    jobs = [[WorkExperience(**j) for j in cv.employee["workExperience"]] for cv in corpus]
+
+    return {
+        "extract_from_pdf": summarize(time_calls([(cv.pdf,) for cv in corpus], extract_from_pdf, repeat)),
+        "extract_from_doc": summarize(time_calls([(cv.docx,) for cv in corpus], extract_from_doc, repeat)),
+        "recount_skill_mentions": summarize(time_calls(
+            list(zip(texts, skills)), lambda text, s: recount_skill_mentions(text, [x.model_copy() for x in s]), repeat)),
+        "derive_domain_from_skills": summarize(time_calls([(s,) for s in skills], derive_domain_from_skills, repeat)),
+        "calc_years_of_experience": summarize(time_calls([(j,) for j in jobs], calc_years_of_experience, repeat)),
+    }
+
+
+def ground_truth_responder(corpus: List[SyntheticCV]) -> Callable[[str], str]:
+    """
+    Stub LLM answer: the EmployeeData of whichever corpus CV the prompt contains,
+    limited to the fields of the prompt's output schema (sectioned extraction
+    asks for a few fields per call).
+    """
+    answers = {cv.employee["email"]: cv.employee for cv in corpus}
+    default = next(iter(answers.values()))
+
+    def respond(prompt: str) -> str:
+        employee = default
+        for email in EMAIL_RE.findall(prompt):
+            if email in answers:
+                employee = answers[email]
+                break
+        schemas = SCHEMA_RE.findall(prompt)
+        if schemas:
+            fields = json.loads(schemas[-1]).get("properties", {})
+            employee = {key: value for key, value in employee.items() if key in fields}
+        return json.dumps(employee)
+    return respond
+
+
+async def run_endpoint(corpus: List[SyntheticCV], requests: int, concurrency: int, stub: StubChatModel, strategy: str = "single") -> Dict:
+    """POST /api/process-cv in-process (httpx ASGI transport) with `concurrency` clients."""
+    import app as app_module
+
+    set_engine(ExtractionEngine(llm=stub, strategy=strategy))
+    uploads = []
+    for cv in corpus:
+        uploads.append((cv.name + ".pdf", cv.pdf, "application/pdf"))
+        uploads.append((cv.name + ".docx", cv.docx, "application/vnd.openxmlformats-officedocument.wordprocessingml.document"))
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_request = 0
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal next_request
+        while next_request < requests:
+            upload = uploads[next_request % len(uploads)]
+            next_request += 1
+            started = time.perf_counter()
+            response = await client.post("/api/process-cv", files={"file": upload})
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # One warm-up request (extraction pool start, imports)
+            await client.post("/api/process-cv", files={"file": uploads[0]})
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+            wall = time.perf_counter() - started
+
+    report = summarize(latencies, wall)
+    report.update({"concurrency": concurrency, "strategy": strategy, "wall_seconds": round(wall, 3), "status_codes": statuses, "llm_calls": stub.calls})
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20, help="synthetic CVs (each as PDF and DOCX)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the corpus per stage")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub LLM seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="extra random stub LLM seconds per call")
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.0, help="stub LLM seconds per output token")
+    parser.add_argument("--strategy", choices=["single", "sectioned"], default="single", help="LLM extraction strategy")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--skip-endpoint", action="store_true")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "corpus": {
+            "documents": len(corpus) * 2,
+            "pages": sum(cv.pages for cv in corpus),
+            "pdf_bytes": sum(len(cv.pdf) for cv in corpus),
+            "docx_bytes": sum(len(cv.docx) for cv in corpus),
+        },
+    }
+
+    # The pipeline prints a lot; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not args.skip_stages:
+            report["stages"] = run_stages(corpus, args.repeat)
+        if not args.skip_endpoint:
+            stub = StubChatModel(latency=args.llm_latency, jitter=args.llm_jitter, seconds_per_output_token=args.llm_seconds_per_token,
+                                 responder=ground_truth_responder(corpus))
+            report["endpoint"] = asyncio.run(run_endpoint(corpus, args.requests, args.concurrency, stub, args.strategy))
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
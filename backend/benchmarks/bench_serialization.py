@@ -0,0 +1,120 @@
+"""
+Cost of turning a CV result into response bytes: the previous path against
+the encode-once path of payloads.py, field projections and compression.
+
+For each synthetic CV (its ground truth as the extracted EmployeeData):
+  - previous: a new EmployeeData built field by field, model_dump(), then FastAPI's
+    jsonable_encoder and JSONResponse rendering (what returning the dict did)
+  - encode_once: model_copy + model_dump, the JSON encoded from that dict and sent as is
+  - projection: encode_result with only the --fields asked for
+  - gzip / br: compressing the whole result (br only when brotli is installed)
+Reports microseconds per result (median over --repeat passes) and bytes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--count 50] [--repeat 20]
+        [--fields allSkills,experienceYears] [--output report.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from benchmarks.bench_pipeline import git_commit
+from benchmarks.corpus import generate_corpus
+from payloads import BROTLI_AVAILABLE, compress, encode_result, parse_fields
+from schema import EmployeeData
+import config
+
+DERIVED = {"primarySkill": "Python", "secondarySkill": "SQL", "experienceYears": 6.5}
+
+
+def previous_path(raw: EmployeeData) -> bytes:
+    final = EmployeeData(
+        fullName=raw.fullName, dob=raw.dob, contact=raw.contact, email=raw.email,
+        emergencyContact=raw.emergencyContact, employeeId=None, designation=raw.designation,
+        officeLocation=None, department=raw.department, allSkills=raw.allSkills,
+        workExperience=raw.workExperience, education=raw.education, **DERIVED,
+    )
+    return JSONResponse(jsonable_encoder(final.model_dump())).body
+
+
+def encode_once_path(raw: EmployeeData) -> bytes:
+    final = raw.model_copy(update={"employeeId": None, "officeLocation": None, **DERIVED})
+    return to_json(final.model_dump())
+
+
+def time_per_item(work: Callable, items: List, repeat: int) -> float:
+    """Median microseconds per item over repeat passes."""
+    passes = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            work(item)
+        passes.append((time.perf_counter() - started) / len(items))
+    return round(statistics.median(passes) * 1e6, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50, help="synthetic CVs")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fields", default="allSkills,experienceYears", help="projection to measure")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    extracted = [EmployeeData(**cv.employee) for cv in corpus]
+    fields = parse_fields(args.fields.split(","))
+    encoded = [(json.loads(body), body.decode("utf-8")) for body in map(encode_once_path, extracted)]
+    bodies = [payload.encode("utf-8") for _, payload in encoded]
+
+    def mean_bytes(values: List[bytes]) -> int:
+        return round(statistics.mean(len(value) for value in values))
+
+    report: Dict = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "previous": {
+            "us_per_result": time_per_item(previous_path, extracted, args.repeat),
+            "bytes": mean_bytes([previous_path(raw) for raw in extracted]),
+        },
+        "encode_once": {
+            "us_per_result": time_per_item(encode_once_path, extracted, args.repeat),
+            "bytes": mean_bytes(bodies),
+        },
+        "projection": {
+            "fields": fields,
+            "us_per_result": time_per_item(lambda item: encode_result(item[0], item[1], fields), encoded, args.repeat),
+            "bytes": mean_bytes([encode_result(data, payload, fields) for data, payload in encoded]),
+        },
+        "compression": {},
+    }
+    report["speedup"] = round(report["previous"]["us_per_result"] / report["encode_once"]["us_per_result"], 2)
+    encodings = ["gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+    for encoding in encodings:
+        compressed = [compress(body, encoding) for body in bodies]
+        report["compression"][encoding] = {
+            "level": config.RESPONSE_GZIP_LEVEL if encoding == "gzip" else config.RESPONSE_BROTLI_QUALITY,
+            "us_per_result": time_per_item(lambda body: compress(body, encoding), bodies, args.repeat),
+            "bytes": mean_bytes(compressed),
+            "ratio": round(sum(map(len, bodies)) / sum(map(len, compressed)), 2),
+        }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
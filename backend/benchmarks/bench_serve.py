@@ -0,0 +1,151 @@
+"""
+Throughput of serve.py by worker count, over real sockets.
+
+For each worker count, starts `python serve.py --workers N` on a free port
+(lite mode only: no model calls, cache and candidate store off, so the
+CPU-bound extraction is what is measured), drives POST
+/api/process-cv?mode=lite with `concurrency` clients over the synthetic
+corpus, then sends SIGTERM and times the shutdown. Throughput can only
+scale up to the number of CPU cores of the machine.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serve [--workers 1,2,4] [--count 20] [--requests 400]
+        [--concurrency 32] [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_pipeline import git_commit, summarize
+from benchmarks.corpus import SyntheticCV, generate_corpus
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_ENV = {
+    "EXTRACTION_MODE": "lite",
+    "CACHE_ENABLED": "false",
+    "CANDIDATE_STORE_ENABLED": "false",
+    # Workers run extraction on their own event loop's threads; one pool per worker would oversubscribe
+    "EXTRACTION_PROCESS_WORKERS": "0",
+    "LOG_LEVEL": "WARNING",
+    "GOOGLE_API_KEY": "bench",
+}
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, state_dir: str) -> subprocess.Popen:
+    env = dict(os.environ, **SERVER_ENV, SHARED_STATE_DB_PATH=os.path.join(state_dir, f"shared_state_{port}.db"),
+               JOB_QUEUE_DB_PATH=os.path.join(state_dir, f"jobs_{port}.db"))
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"serve.py --workers {workers} did not start within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+async def drive(port: int, corpus: List[SyntheticCV], requests: int, concurrency: int) -> Dict:
+    uploads = [(cv.name + ".pdf", cv.pdf, "application/pdf") for cv in corpus]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_request = 0
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal next_request
+        while next_request < requests:
+            upload = uploads[next_request % len(uploads)]
+            next_request += 1
+            started = time.perf_counter()
+            response = await client.post("/api/process-cv", params={"mode": "lite"}, files={"file": upload})
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None, limits=limits) as client:
+        # Warm every worker's imports and thread pool a little
+        await asyncio.gather(*(client.post("/api/process-cv", params={"mode": "lite"}, files={"file": uploads[0]})
+                               for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    report = summarize(latencies, wall)
+    report.update({"wall_seconds": round(wall, 3), "status_codes": statuses})
+    return report
+
+
+def stop_server(process: subprocess.Popen) -> float:
+    """SIGTERM the supervisor; returns the seconds until it exited."""
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=120)
+    return round(time.perf_counter() - started, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--count", type=int, default=20, help="synthetic CVs (PDF)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "runs": [],
+    }
+    state_dir = os.path.join(BACKEND_DIR, "benchmarks")
+    for workers in [int(value) for value in args.workers.split(",")]:
+        port = free_port()
+        process = start_server(workers, port, state_dir)
+        try:
+            run = asyncio.run(drive(port, corpus, args.requests, args.concurrency))
+        finally:
+            run_shutdown = stop_server(process)
+        for name in (f"shared_state_{port}.db", f"jobs_{port}.db"):
+            for suffix in ("", "-wal", "-shm"):
+                path = os.path.join(state_dir, name + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+        run.update({"workers": workers, "shutdown_seconds": run_shutdown})
+        report["runs"].append(run)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
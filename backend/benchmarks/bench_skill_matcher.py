@@ -0,0 +1,115 @@
+"""
+Micro-benchmark: single-pass SkillMatcher vs the original per-skill regex recount.
+
+Checks that both produce identical mention counts on a set of generated CVs
+(including the tricky "C" / "C++" / "C#" cases) and reports timings.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skill_matcher [--skills 60] [--repeat 200]
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import List
+
+from schema import Skill
+from utils import recount_skill_mentions
+
+SKILL_POOL = [
+    "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "R", "Go", "Rust",
+    "React", "React.js", "React Native", "Node.js", "Express.js", "Next.js", "Vue.js",
+    "Angular", "HTML", "HTML5", "CSS", "Tailwind CSS", "SASS", "MongoDB", "MySQL",
+    "PostgreSQL", "SQL", "SQLite", "Redis", "Docker", "Kubernetes", "AWS", "Azure", "GCP",
+    "CI/CD", "Jenkins", "Terraform", "TensorFlow", "PyTorch", "Keras", "scikit-learn",
+    "LangChain", "Pandas", "NumPy", "Matplotlib", "Seaborn", "Git", "GitHub", "Postman",
+    "Machine Learning", "Deep Learning", "Computer Vision", "NLP", "OpenCV", "Flask",
+    "Django", "FastAPI", "Spring", "GraphQL", "REST", ".NET", "Socket.io", "Web3",
+    "Data Analysis", "Data Visualization", "Jupyter Notebook", "Linux", "Bash",
+]
+
+FILLER = (
+    "Created scalable services and improved performance across teams. "
+    "Led a team of engineers, mentored interns and reviewed code. "
+    "Collaborated with C-level stakeholders on product strategy; "
+    "shipped features in C, C++ and C#.\n"
+)
+
+
+def legacy_recount(cv_text: str, skills: List[Skill]) -> List[Skill]:
+    """The original implementation: one re.findall over the full text per skill."""
+    recounted_skills = []
+    for skill in skills:
+        skill_name = re.escape(skill.name)
+        if len(skill.name) == 1:
+            pattern = r'(?:^|\s)' + skill_name + r'(?=\s|\.|,|;|$)(?!\+)'
+        elif skill.name in ['C++', 'C#']:
+            pattern = r'\b' + skill_name
+        else:
+            pattern = r'\b' + skill_name + r'\b'
+        matches = re.findall(pattern, cv_text, re.IGNORECASE)
+        skill.mentions = max(1, len(matches))
+        recounted_skills.append(skill)
+    return recounted_skills
+
+
+def make_cv(rng: random.Random, n_paragraphs: int) -> str:
+    parts = []
+    for _ in range(n_paragraphs):
+        picked = rng.sample(SKILL_POOL, 8)
+        sep = rng.choice([", ", " | ", " / ", "; ", " and "])
+        parts.append("Technologies: " + sep.join(picked) + ".")
+        parts.append(FILLER)
+        parts.append(rng.choice(["c++17 templates", "C.", "C;", "(C)", "ReactJS", "react-native", "node.js!"]))
+    return "\n".join(parts)
+
+
+def make_skills(rng: random.Random, n: int) -> List[Skill]:
+    names = rng.sample(SKILL_POOL, min(n, len(SKILL_POOL)))
+    names += [n.lower() for n in rng.sample(names, len(names) // 5)]  # case duplicates
+    return [Skill(name=name) for name in names]
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    for n_paragraphs in (10, 50, 200):
+        cv_text = make_cv(rng, n_paragraphs)
+        skills = make_skills(rng, args.skills)
+
+        expected = [(s.name, s.mentions) for s in legacy_recount(cv_text, [s.model_copy() for s in skills])]
+        actual = [(s.name, s.mentions) for s in recount_skill_mentions(cv_text, [s.model_copy() for s in skills])]
+        if expected != actual:
+            diff = [(e, a) for e, a in zip(expected, actual) if e != a]
+            raise SystemExit(f"Count mismatch on {n_paragraphs} paragraphs: {diff[:10]}")
+
+        legacy_s = timed(lambda: legacy_recount(cv_text, skills), args.repeat)
+        matcher_s = timed(lambda: recount_skill_mentions(cv_text, skills), args.repeat)
+        results.append({
+            "chars": len(cv_text),
+            "skills": len(skills),
+            "legacy_ms": round(legacy_s * 1000, 3),
+            "matcher_ms": round(matcher_s * 1000, 3),
+            "speedup": round(legacy_s / matcher_s, 2),
+            "identical_counts": True,
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark: years of experience for many parsed CVs.
+
+Generates synthetic workExperience lists in the date forms CVs use ("Sep
+2024", "09/2024", "2019-09", "2019 – Present"...), some with
+overlapping internships or concurrent roles, and computes experienceYears:
+
+    legacy:       the old calc_years_of_experience (strptime per format, durations summed)
+    per_record:   timeline.experience_years for each CV, date memo cold, then warm
+    batch:        timeline.experience_years_batch over all of them at once (warm memo)
+
+Also reports how many jobs the old parser couldn't read, and how many CVs it
+over-counted because of overlaps (among those it could read).
+
+Usage (from backend/):
+    python -m benchmarks.bench_timeline [--records 10000 100000] [--repeat 3]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import timeline
+
+
+def legacy_parse_date(date_str: str) -> datetime:
+    """utils.parse_date before timeline.py."""
+    date_str = date_str.strip()
+    for fmt in ("%Y-%m-%d", "%Y-%m", "%Y"):
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            pass
+    month_mapping = {
+        "jan": "01", "january": "01", "feb": "02", "february": "02", "mar": "03", "march": "03",
+        "apr": "04", "april": "04", "may": "05", "jun": "06", "june": "06", "jul": "07", "july": "07",
+        "aug": "08", "august": "08", "sep": "09", "september": "09", "oct": "10", "october": "10",
+        "nov": "11", "november": "11", "dec": "12", "december": "12",
+    }
+    parts = date_str.split()
+    if len(parts) == 2:
+        month_str, year_str = parts
+        month_str_lower = month_str.lower().strip(",")
+        if month_str_lower in month_mapping:
+            try:
+                return datetime.strptime(f"{year_str}-{month_mapping[month_str_lower]}-01", "%Y-%m-%d")
+            except ValueError:
+                pass
+    raise ValueError(f"Cannot parse date: {date_str}")
+
+
+def legacy_end(end_date: str) -> datetime:
+    return datetime.now() if end_date.lower() in ["present", "ongoing", "current", "now"] else legacy_parse_date(end_date)
+
+
+def legacy_years(jobs: List[dict]) -> float:
+    """utils.calc_years_of_experience before timeline.py: every job's duration added up."""
+    total_days = 0
+    for job in jobs:
+        try:
+            duration = (legacy_end(job["endDate"]) - legacy_parse_date(job["startDate"])).days
+        except ValueError:
+            continue
+        if duration > 0:
+            total_days += duration
+    return round(total_days / 365.25, 1)
+
+
+def legacy_unparsed(job: dict) -> bool:
+    try:
+        legacy_parse_date(job["startDate"])
+        legacy_end(job["endDate"])
+    except ValueError:
+        return True
+    return False
+
+
+def _format(year: int, month: int, rng: random.Random) -> str:
+    name = datetime(year, month, 1).strftime("%b")
+    return rng.choice([f"{year}-{month:02d}", f"{name} {year}", f"{month:02d}/{year}", f"{datetime(year, month, 1):%B}, {year}"])
+
+
+def make_jobs(rng: random.Random) -> List[dict]:
+    """A career of 1-8 jobs going back from today, sometimes with overlapping ones."""
+    jobs = []
+    year, month = 2026, rng.randint(1, 9)
+    for index in range(rng.randint(1, 8)):
+        months = rng.randint(3, 48)
+        end_year, end_month = year, month
+        start = (year * 12 + month - 1) - months
+        year, month = start // 12, start % 12 + 1
+        end = "Present" if index == 0 and rng.random() < 0.5 else _format(end_year, end_month, rng)
+        jobs.append({"startDate": _format(year, month, rng), "endDate": end})
+        if rng.random() < 0.15:
+            # Internship or side role during this job
+            jobs.append({"startDate": f"{_format(year, month, rng)} – {_format(end_year, end_month, rng)}", "endDate": ""})
+        # Gap or overlap with the previous job
+        shift = (year * 12 + month - 1) - rng.randint(-4, 6)
+        year, month = shift // 12, shift % 12 + 1
+    return jobs
+
+
+def timed(function: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(count: int, repeat: int) -> Dict:
+    rng = random.Random(count)
+    records = [{"workExperience": make_jobs(rng)} for _ in range(count)]
+    jobs = [record["workExperience"] for record in records]
+
+    legacy_seconds = timed(lambda: [legacy_years(job_list) for job_list in jobs], repeat)
+    timeline.parse_date.cache_clear()
+    timeline.parse_date_range.cache_clear()
+    cold_seconds = timed(lambda: [timeline.experience_years(job_list) for job_list in jobs], 1)
+    warm_seconds = timed(lambda: [timeline.experience_years(job_list) for job_list in jobs], repeat)
+    batch_seconds = timed(lambda: timeline.experience_years_batch(records), repeat)
+
+    legacy = [legacy_years(job_list) for job_list in jobs]
+    merged = timeline.experience_years_batch(records)
+    per_record = [timeline.experience_years(job_list) for job_list in jobs]
+    # Over-count from overlaps, on the CVs whose dates the old parser could read at all
+    readable = [index for index, job_list in enumerate(jobs) if not any(legacy_unparsed(job) for job in job_list)]
+    over_counted = [legacy[index] - merged[index] for index in readable if legacy[index] - merged[index] > 0.05]
+    return {
+        "records": count,
+        "jobs": sum(len(job_list) for job_list in jobs),
+        "legacy_ms": round(legacy_seconds * 1000, 1),
+        "per_record_cold_ms": round(cold_seconds * 1000, 1),
+        "per_record_warm_ms": round(warm_seconds * 1000, 1),
+        "batch_ms": round(batch_seconds * 1000, 1),
+        "batch_speedup_vs_legacy": round(legacy_seconds / batch_seconds, 1),
+        "batch_matches_per_record": merged == per_record,
+        "date_cache": timeline.parse_date.cache_info()._asdict(),
+        "legacy_readable_records": len(readable),
+        "legacy_over_counted_records": len(over_counted),
+        "legacy_over_count_mean_years": round(sum(over_counted) / len(over_counted), 2) if over_counted else 0.0,
+        "legacy_unparsed_jobs": sum(legacy_unparsed(job) for job_list in jobs for job in job_list),
+        "timeline_unparsed_jobs": sum(timeline.build_timeline(job_list).unparsed for job_list in jobs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps([run(count, args.repeat) for count in args.records], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Synthetic CV corpus for offline benchmarks.
+
+Generates PDFs and DOCX files of 1-10 pages with skills tables and many jobs,
+together with the EmployeeData each one describes (so a stub LLM can answer
+with data that matches the document). Everything is deterministic for a seed.
+
+Usage (from backend/):
+    python -m benchmarks.corpus --out /tmp/cv_corpus [--count 50] [--seed 7]
+"""
+import argparse
+import io
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from docx import Document
+
+from benchmarks.bench_skill_matcher import SKILL_POOL
+
+FIRST_NAMES = ["Aarav", "Priya", "Jane", "Rahul", "Meera", "John", "Ananya", "Vikram", "Sara", "Arjun"]
+LAST_NAMES = ["Sharma", "Doe", "Iyer", "Patel", "Khan", "Smith", "Reddy", "Nair", "Gupta", "Rao"]
+COMPANIES = ["Acme Corp", "Initech", "Globex", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech", "Cyberdyne"]
+POSITIONS = ["Software Engineer", "Backend Developer", "Frontend Developer", "Data Scientist", "DevOps Engineer", "ML Engineer"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+SKILL_GROUPS = ["Languages", "Frameworks", "Databases", "Cloud & DevOps", "Tools"]
+
+LINES_PER_PAGE = 50
+LINE_WIDTH = 95
+
+
+@dataclass
+class SyntheticCV:
+    """One generated CV: the ground-truth data and the document bytes."""
+    name: str
+    pages: int
+    employee: Dict = field(default_factory=dict)
+    lines: List[str] = field(default_factory=list)
+    skill_table: List[List[str]] = field(default_factory=list)
+    pdf: bytes = b""
+    docx: bytes = b""
+
+
+def _wrap(text: str, width: int = LINE_WIDTH) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def make_cv(index: int, pages: int, rng: random.Random) -> SyntheticCV:
+    """Build the text and ground truth for a CV of roughly `pages` pages."""
+    full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{full_name.lower().replace(' ', '.')}{index}@example.com"
+    phone = f"+91 98{rng.randint(10000000, 99999999)}"
+    skills = rng.sample(SKILL_POOL, k=min(len(SKILL_POOL), 12 + 4 * pages))
+
+    lines = [full_name, f"{email} | {phone}", "", "TECHNICAL SKILLS"]
+    skill_table = []
+    for group_index, group in enumerate(SKILL_GROUPS):
+        group_skills = skills[group_index::len(SKILL_GROUPS)]
+        if group_skills:
+            skill_table.append([group, ", ".join(group_skills)])
+            lines.extend(_wrap(f"{group}: {', '.join(group_skills)}"))
+    lines += ["", "EXPERIENCE"]
+
+    jobs = []
+    cursor = 2024 * 12 + 5  # months since year 0, walking backwards through the career
+    for _ in range(2 + 3 * pages):
+        end_month = cursor
+        start_month = end_month - rng.randint(3, 14)
+        company, position = rng.choice(COMPANIES), rng.choice(POSITIONS)
+        used = rng.sample(skills, k=min(len(skills), 4))
+        description = (
+            f"Built and maintained services using {used[0]} and {used[1]}. "
+            f"Migrated legacy systems to {used[2]}, cutting latency by {rng.randint(10, 60)}%. "
+            f"Mentored engineers and introduced {used[3]} across the team."
+        )
+        end = "Present" if not jobs else f"{MONTHS[end_month % 12]} {end_month // 12}"
+        lines.append(f"{company} | {position} | {MONTHS[start_month % 12]} {start_month // 12} - {end}")
+        lines.extend("- " + line for line in _wrap(description, LINE_WIDTH - 2))
+        lines.append("")
+        jobs.append({
+            "company": company,
+            "position": position,
+            "startDate": f"{start_month // 12}-{start_month % 12 + 1:02d}-01",
+            "endDate": "Present" if end == "Present" else f"{end_month // 12}-{end_month % 12 + 1:02d}-01",
+            "duration": "",
+            "description": description,
+        })
+        cursor = start_month - rng.randint(0, 3)
+
+    education = f"B.Tech Computer Science, Example Institute of Technology ({cursor // 12})"
+    lines += ["EDUCATION", education, "", "PROJECTS"]
+    # Pad with projects until the requested page count is reached
+    project = 0
+    while len(lines) < pages * LINES_PER_PAGE - 2:
+        used = rng.sample(skills, k=2)
+        project += 1
+        lines.append(f"Project {project}: dashboard built with {used[0]} and {used[1]} for internal reporting.")
+
+    employee = {
+        "fullName": full_name,
+        "dob": "",
+        "contact": phone,
+        "email": email,
+        "emergencyContact": "",
+        "employeeId": None,
+        "designation": jobs[0]["position"],
+        "officeLocation": None,
+        "department": "",
+        "allSkills": [{"name": name, "mentions": 1, "category": "technical"} for name in skills],
+        "primarySkill": "",
+        "secondarySkill": "",
+        "experienceYears": 0.0,
+        "workExperience": jobs,
+        "education": education,
+    }
+    return SyntheticCV(name=f"cv_{index:04d}", pages=pages, employee=employee, lines=lines, skill_table=skill_table)
+
+
+def write_pdf(lines: List[str], lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """Minimal text-only PDF (Helvetica, one line per text row), no dependencies."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # filled in once the page ids are known
+    kids = []
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        ops = ["BT /F1 10 Tf 14 TL 40 780 Td"]
+        for line in lines[start:start + lines_per_page]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def write_docx(cv: SyntheticCV) -> bytes:
+    """DOCX with the same content; skills go in a two-column table, as many real CVs do."""
+    document = Document()
+    skills_start = cv.lines.index("TECHNICAL SKILLS")
+    skills_end = cv.lines.index("EXPERIENCE")
+    for line in cv.lines[:skills_start + 1]:
+        if line:
+            document.add_paragraph(line)
+    table = document.add_table(rows=0, cols=2)
+    for group, names in cv.skill_table:
+        cells = table.add_row().cells
+        cells[0].text = group
+        cells[1].text = names
+    for line in cv.lines[skills_end:]:
+        if line.startswith("- "):
+            document.add_paragraph(line[2:], style="List Bullet")
+        elif line:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_corpus(count: int = 20, seed: int = 7, min_pages: int = 1, max_pages: int = 10) -> List[SyntheticCV]:
+    """`count` CVs with page counts spread evenly over [min_pages, max_pages]."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        pages = min_pages + index % (max_pages - min_pages + 1)
+        cv = make_cv(index, pages, rng)
+        cv.pdf = write_pdf(cv.lines)
+        cv.docx = write_docx(cv)
+        corpus.append(cv)
+    return corpus
+
+
+def write_corpus(corpus: List[SyntheticCV], out_dir: str) -> str:
+    """Write the files plus a manifest.json with the ground truth. Returns the manifest path."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for cv in corpus:
+        for ext, data in ((".pdf", cv.pdf), (".docx", cv.docx)):
+            with open(os.path.join(out_dir, cv.name + ext), "wb") as f:
+                f.write(data)
+        manifest.append({"name": cv.name, "pages": cv.pages, "employee": cv.employee})
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-pages", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=10)
+    args = parser.parse_args(argv)
+    corpus = generate_corpus(args.count, args.seed, args.min_pages, args.max_pages)
+    print(write_corpus(corpus, args.out))
+
+
+if __name__ == "__main__":
+    main()
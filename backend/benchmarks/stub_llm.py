@@ -0,0 +1,157 @@
+"""
+Local stand-in for ChatGoogleGenerativeAI, so the pipeline can be benchmarked
+without network access or API quota.
+
+    from engine import ExtractionEngine, set_engine
+    set_engine(ExtractionEngine(llm=StubChatModel(latency=0.5)))
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+CANNED_EMPLOYEE = {
+    "fullName": "Jane Doe",
+    "dob": "",
+    "contact": "+1 555 010 2000",
+    "email": "jane.doe@example.com",
+    "emergencyContact": "",
+    "employeeId": None,
+    "designation": "Backend Developer",
+    "officeLocation": None,
+    "department": "",
+    "allSkills": [
+        {"name": name, "mentions": 1, "category": "technical"}
+        for name in ["Python", "FastAPI", "Docker", "Kubernetes", "PostgreSQL", "React", "C++", "Git"]
+    ],
+    "primarySkill": "",
+    "secondarySkill": "",
+    "experienceYears": 0.0,
+    "workExperience": [
+        {
+            "company": "Acme Corp",
+            "position": "Backend Developer",
+            "startDate": "2021-07-01",
+            "endDate": "Present",
+            "duration": "",
+            "description": "Built APIs with Python and FastAPI.",
+        },
+        {
+            "company": "Initech",
+            "position": "Software Engineer Intern",
+            "startDate": "2020-01-01",
+            "endDate": "2020-06-01",
+            "duration": "5 months",
+            "description": "Maintained Docker based CI pipelines.",
+        },
+    ],
+    "education": "B.Tech Computer Science, Example University (2021)",
+}
+
+
+class StubLLMError(Exception):
+    """Injected failure (see StubChatModel.failure_rate)."""
+
+
+class StubRateLimitError(Exception):
+    """Injected quota error, like Gemini's 429 ResourceExhausted (see StubChatModel.quota_requests)."""
+
+    code = 429
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that sleeps for `latency` seconds and answers with canned JSON.
+
+    `jitter` adds up to that many extra seconds per call, `failure_rate` makes
+    a fraction of calls raise StubLLMError, and `responder` (prompt text ->
+    response text) replaces the fixed `response`, e.g. to answer with the
+    ground truth of a synthetic CV. `quota_requests` per `quota_window`
+    seconds simulates the API quota: calls beyond it raise StubRateLimitError
+    (and still count). `seconds_per_output_token` adds time
+    proportional to the response length, like real generation. Streaming (astream) sends the response in
+    `stream_chunks` pieces spread over the same latency.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    response: str = json.dumps(CANNED_EMPLOYEE)
+    responder: Optional[Callable[[str], str]] = None
+    seconds_per_output_token: float = 0.0
+    quota_requests: int = 0
+    quota_window: float = 60.0
+    call_times: List[float] = []
+    rate_limited: int = 0
+    stream_chunks: int = 8
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _delay(self) -> float:
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _generation_delay(self, result: ChatResult) -> float:
+        return result.generations[0].message.usage_metadata["output_tokens"] * self.seconds_per_output_token
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        if self.quota_requests:
+            now = time.monotonic()
+            self.call_times = [t for t in self.call_times if now - t < self.quota_window] + [now]
+            if len(self.call_times) > self.quota_requests:
+                self.rate_limited += 1
+                raise StubRateLimitError("Quota exceeded (stub)")
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise StubLLMError("Injected stub LLM failure")
+        prompt = "\n".join(str(m.content) for m in messages)
+        response = self.responder(prompt) if self.responder is not None else self.response
+        message = AIMessage(
+            content=response,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(response) // 4,
+                "total_tokens": len(prompt) // 4 + len(response) // 4,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        result = self._result(messages)
+        if self.seconds_per_output_token:
+            time.sleep(self._generation_delay(result))
+        return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        result = self._result(messages)
+        if self.seconds_per_output_token:
+            await asyncio.sleep(self._generation_delay(result))
+        return result
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        result = self._result(messages)
+        delay = self._delay() + self._generation_delay(result)
+        message = result.generations[0].message
+        text = message.content
+        pieces = max(1, self.stream_chunks)
+        size = -(-len(text) // pieces)
+        for index in range(pieces):
+            if delay:
+                await asyncio.sleep(delay / pieces)
+            chunk = AIMessageChunk(content=text[index * size:(index + 1) * size])
+            if index == pieces - 1:
+                chunk.usage_metadata = message.usage_metadata
+            yield ChatGenerationChunk(message=chunk)
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Union
+
+from metrics import CACHE_LOOKUPS
+from taxonomy import get_skill_taxonomy
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(file_content: Union[bytes, BinaryIO]) -> str:
+    """SHA-256 of the uploaded file bytes (or of a file object, read in chunks from the start)."""
+    if isinstance(file_content, (bytes, bytearray)):
+        return hashlib.sha256(file_content).hexdigest()
+    digest = hashlib.sha256()
+    file_content.seek(0)
+    for chunk in iter(lambda: file_content.read(1024 * 1024), b""):
+        digest.update(chunk)
+    file_content.seek(0)
+    return digest.hexdigest()
+
+
+def _extraction_settings() -> str:
+    """Text extraction settings: they decide which text, and how much of it, the engines see."""
+    return (f"pdf={config.PDF_BACKEND.lower()},{config.PDF_MAX_PAGES},{config.PDF_MAX_CHARS}"
+            f";docx={config.DOCX_EXTRACTOR}")
+
+
+def make_cache_key(file_hash: str, variant: str = "") -> str:
+    """
+    Build the cache key for a file.
+
+    The key combines the file hash with everything that changes the output:
+    the model name, the prompt version and the schema version from config,
+    the fingerprint of the skill taxonomy (it decides primary/secondary) and
+    the text extraction settings (PDF backend and page/character budgets,
+    DOCX extractor).
+
+    Args:
+        file_hash: SHA-256 hex digest of the file bytes (see content_hash)
+        variant: Extra discriminator for alternative pipelines producing different output
+
+    Returns:
+        Cache key as a hex string
+    """
+    parts = [file_hash, config.GOOGLE_MODEL, config.PROMPT_VERSION, config.SCHEMA_VERSION,
+             get_skill_taxonomy().fingerprint, _extraction_settings(), variant]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for processed CV results.
+
+    Tier 1 is a bounded in-process LRU; tier 2 is a SQLite table that survives
+    restarts and is evicted by TTL, entry count and total payload size.
+    Values are stored as JSON strings so callers always get a fresh dict.
+
+    Several processes (serve.py workers) can share the disk tier. Every
+    invalidate() or clear() bumps a generation number stored with it, and a
+    process that sees a new generation empties its own memory tier, so no
+    worker keeps serving a result another one dropped. The generation is read
+    at most once every generation_check_seconds, so a memory hit usually
+    costs no query; another worker's invalidation takes effect here within
+    that interval (this process's own take effect at once).
+    """
+
+    def __init__(
+        self,
+        memory_max_entries: int = config.CACHE_MEMORY_MAX_ENTRIES,
+        db_path: Optional[str] = config.CACHE_DB_PATH,
+        disk_max_entries: int = config.CACHE_DISK_MAX_ENTRIES,
+        disk_max_bytes: int = config.CACHE_DISK_MAX_BYTES,
+        ttl_seconds: int = config.CACHE_TTL_SECONDS,
+        generation_check_seconds: float = config.CACHE_GENERATION_CHECK_SECONDS,
+    ):
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.generation_check_seconds = generation_check_seconds
+
+        # key -> (file_hash, expires_at, payload)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._generation = 0
+        self._generation_checked = 0.0  # time.monotonic() of the last generation read
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_file_hash ON results(file_hash)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._generation = self._stored_generation()
+            self._generation_checked = time.monotonic()
+
+    # Lookup / store
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for key, or None on a miss."""
+        payload = self.get_payload(key)
+        return json.loads(payload) if payload is not None else None
+
+    def get_payload(self, key: str) -> Optional[str]:
+        """The cached result for key as its stored JSON, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            self._sync_generation()
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    CACHE_LOOKUPS.inc(result="memory_hit")
+                    return entry[2]
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT file_hash, payload, created_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    file_hash, payload, created_at = row
+                    if created_at + self.ttl_seconds > now:
+                        self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+                        self._remember(key, file_hash, created_at + self.ttl_seconds, payload)
+                        self._stats["disk_hits"] += 1
+                        CACHE_LOOKUPS.inc(result="disk_hit")
+                        return payload
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._stats["expired"] += 1
+
+            self._stats["misses"] += 1
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+    def set(self, key: str, file_hash: str, value: dict, payload: Optional[str] = None) -> None:
+        """Store a result in both tiers, evicting old entries if over budget. payload: value already encoded as JSON."""
+        if payload is None:
+            payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._remember(key, file_hash, now + self.ttl_seconds, payload)
+            self._stats["sets"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, file_hash, payload, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, file_hash, payload, len(payload), now, now),
+                )
+                self._evict_disk(now)
+
+    # Invalidation
+    def invalidate(self, file_hash: str) -> int:
+        """Drop every cached result for one file (all models/prompt versions). Returns entries removed."""
+        removed = 0
+        with self._lock:
+            for key in [k for k, v in self._memory.items() if v[0] == file_hash]:
+                del self._memory[key]
+                removed += 1
+            if self._db is not None:
+                cur = self._db.execute("DELETE FROM results WHERE file_hash = ?", (file_hash,))
+                removed = max(removed, cur.rowcount)
+                self._bump_generation()
+            self._stats["invalidations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop everything from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._bump_generation()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    # Internals (caller holds self._lock)
+    def _stored_generation(self) -> int:
+        row = self._db.execute("SELECT value FROM cache_meta WHERE name = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _sync_generation(self, force: bool = False) -> None:
+        """Empty the memory tier if another process invalidated entries since we last looked."""
+        if self._db is None:
+            return
+        checked = time.monotonic()
+        if not force and checked - self._generation_checked < self.generation_check_seconds:
+            return
+        self._generation_checked = checked
+        generation = self._stored_generation()
+        if generation != self._generation:
+            self._memory.clear()
+            self._generation = generation
+
+    def _bump_generation(self) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Catch up on other processes' invalidations first, or ours would hide them
+            self._sync_generation(force=True)
+            self._db.execute(
+                "INSERT INTO cache_meta (name, value) VALUES ('generation', 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+            )
+            self._generation = self._stored_generation()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _remember(self, key: str, file_hash: str, expires_at: float, payload: str) -> None:
+        self._memory[key] = (file_hash, expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        cur = self._db.execute("DELETE FROM results WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._stats["expired"] += max(cur.rowcount, 0)
+
+        count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.disk_max_entries and size <= self.disk_max_bytes:
+            return
+
+        # Least recently used first
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY last_access ASC").fetchall()
+        doomed = []
+        for key, entry_size in rows:
+            if count <= self.disk_max_entries and size <= self.disk_max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            size -= entry_size
+        self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._stats["evictions"] += len(doomed)
+        logger.info(f"Evicted {len(doomed)} cached results from disk")
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Shared cache instance, or None when caching is disabled in config."""
+    global _result_cache
+    if not config.CACHE_ENABLED:
+        return None
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
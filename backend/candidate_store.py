@@ -0,0 +1,576 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from taxonomy import get_skill_taxonomy, normalize_skill
+import config
+
+logger = logging.getLogger(__name__)
+
+# Term prefixes in the inverted index
+SKILL_TERM = "skill:"
+DOMAIN_TERM = "domain:"
+
+# Columns returned for each search hit (the full EmployeeData is fetched with get())
+_SUMMARY_COLUMNS = "id, file_hash, full_name, email, designation, primary_skill, secondary_skill, experience_years, updated_at"
+
+
+def skill_term(name: str) -> str:
+    """Index term for a skill: its taxonomy key ("K8s" -> "kubernetes"), else the normalized name."""
+    name = name or ""
+    return SKILL_TERM + (get_skill_taxonomy().canonical(name) or normalize_skill(name))
+
+
+def domain_term(name: str) -> str:
+    return DOMAIN_TERM + " ".join((name or "").split()).casefold()
+
+
+def candidate_terms(data: dict) -> Dict[str, int]:
+    """
+    Skill and domain terms of one parsed CV with their mention counts. A
+    domain counts the mentions of all its skills; the derived primary and
+    secondary domains are always included.
+    """
+    taxonomy = get_skill_taxonomy()
+    terms: Dict[str, int] = {}
+    for skill in data.get("allSkills") or []:
+        if isinstance(skill, dict):
+            name, mentions = skill.get("name"), skill.get("mentions")
+        else:
+            name, mentions = getattr(skill, "name", ""), getattr(skill, "mentions", 1)
+        if not name:
+            continue
+        mentions = max(1, int(mentions or 1))
+        for term in (skill_term(name), domain_term(taxonomy.classify(name))):
+            terms[term] = terms.get(term, 0) + mentions
+    for derived in (data.get("primarySkill"), data.get("secondarySkill")):
+        if derived:
+            terms.setdefault(domain_term(derived), 1)
+    return terms
+
+
+class BitmapIndex:
+    """
+    In-memory inverted index over candidate ids.
+
+    Every term has a bitmap (a Python int with bit i set for candidate i), so
+    AND / OR / NOT of terms is a handful of big-int operations no matter how
+    many candidates match. experienceYears is indexed the same way in
+    whole-year buckets, which also gives the result order without sorting
+    every match: only the buckets that reach the requested page are expanded.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.postings: Dict[str, int] = {}
+        self.everyone = 0
+        self.years: Dict[int, float] = {}
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, entries: Iterable[Tuple[int, float, Dict[str, int]]]) -> None:
+        """Index (candidate_id, experience_years, {term: mentions}) entries."""
+        by_term, by_bucket, ids = self._group(entries)
+        for candidate_id, years in ids.items():
+            self.years[candidate_id] = years
+        for term, term_ids in by_term.items():
+            self.postings[term] = self.postings.get(term, 0) | _bitmap(term_ids)
+        for bucket, bucket_ids in by_bucket.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) | _bitmap(bucket_ids)
+        if ids:
+            self.everyone |= _bitmap(ids)
+
+    def remove(self, entries: Iterable[Tuple[int, float, Dict[str, int]]]) -> None:
+        """Drop (candidate_id, experience_years, {term: mentions}) entries as they were indexed."""
+        by_term, by_bucket, ids = self._group(entries)
+        for candidate_id in ids:
+            self.years.pop(candidate_id, None)
+        for term, term_ids in by_term.items():
+            remaining = self.postings.get(term, 0) & ~_bitmap(term_ids)
+            if remaining:
+                self.postings[term] = remaining
+            else:
+                self.postings.pop(term, None)
+        for bucket, bucket_ids in by_bucket.items():
+            remaining = self.buckets.get(bucket, 0) & ~_bitmap(bucket_ids)
+            if remaining:
+                self.buckets[bucket] = remaining
+            else:
+                self.buckets.pop(bucket, None)
+        if ids:
+            self.everyone &= ~_bitmap(ids)
+
+    def match(self, required: Sequence[str], optional: Sequence[str], excluded: Sequence[str]) -> int:
+        """Bitmap of candidates with every required term, one of the optional ones and none excluded."""
+        matches = self.everyone
+        for term in required:
+            matches &= self.postings.get(term, 0)
+        if optional:
+            matches &= _union(self.postings.get(term, 0) for term in optional)
+        if excluded:
+            matches &= ~_union(self.postings.get(term, 0) for term in excluded)
+        return matches
+
+    def page(self, matches: int, min_years: Optional[float], max_years: Optional[float], offset: int, limit: int) -> Tuple[int, List[int]]:
+        """(total, ids of the page) of the matches within the years range, most experienced first, then newest."""
+        low = int(min_years) if min_years is not None else None
+        high = int(max_years) if max_years is not None else None
+        total, ordered = 0, []
+        for bucket in sorted(self.buckets, reverse=True):
+            if (high is not None and bucket > high) or (low is not None and bucket < low):
+                continue
+            hits = matches & self.buckets[bucket]
+            if not hits:
+                continue
+            # A bucket at either end of the range can hold candidates just outside it
+            edge = bucket == low or bucket == high
+            if not edge and total >= offset + limit:
+                total += _count(hits)
+                continue
+            bucket_ids = _members(hits)
+            if edge:
+                bucket_ids = [
+                    candidate_id for candidate_id in bucket_ids
+                    if (min_years is None or self.years[candidate_id] >= min_years)
+                    and (max_years is None or self.years[candidate_id] <= max_years)
+                ]
+            if total < offset + limit:
+                # _members lists newest first; the stable sort keeps that among equal years
+                bucket_ids.sort(key=lambda candidate_id: -self.years[candidate_id])
+                ordered.extend(bucket_ids[:offset + limit - total])
+            total += len(bucket_ids)
+        return total, ordered[offset:offset + limit]
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    @staticmethod
+    def _group(entries):
+        by_term: Dict[str, List[int]] = {}
+        by_bucket: Dict[int, List[int]] = {}
+        ids: Dict[int, float] = {}
+        for candidate_id, years, terms in entries:
+            ids[candidate_id] = years
+            by_bucket.setdefault(int(years), []).append(candidate_id)
+            for term in terms:
+                by_term.setdefault(term, []).append(candidate_id)
+        return by_term, by_bucket, ids
+
+
+def _bitmap(ids: Iterable[int]) -> int:
+    ids = list(ids)
+    bits = bytearray(max(ids) // 8 + 1)
+    for candidate_id in ids:
+        bits[candidate_id >> 3] |= 1 << (candidate_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _union(bitmaps: Iterable[int]) -> int:
+    result = 0
+    for bitmap in bitmaps:
+        result |= bitmap
+    return result
+
+
+def _count(bitmap: int) -> int:
+    return bin(bitmap).count("1")
+
+
+def _members(bitmap: int) -> List[int]:
+    """Ids set in a bitmap, highest first."""
+    digits = bin(bitmap)
+    top = len(digits) - 3
+    members = []
+    position = digits.find("1", 2)
+    while position != -1:
+        members.append(top - (position - 2))
+        position = digits.find("1", position + 1)
+    return members
+
+
+class CandidateStore:
+    """
+    Parsed CVs kept in SQLite, searchable by skill, domain and experience.
+
+    Each candidate is one row (keyed by the file hash, so a re-parsed CV
+    replaces its old row) plus (term, candidate_id) postings for every
+    normalized skill and skill domain. The postings are loaded into a
+    BitmapIndex when the store opens and kept in step with every write, so a
+    search never scans rows: it combines bitmaps in memory and reads only the
+    page of results from SQLite, in a millisecond or two with 100k+ candidates.
+
+    Several processes can share the database (serve.py workers). Every write
+    also appends to a change log (candidate_changes: the candidate id and the
+    entry it had before), and each process replays the changes it hasn't seen
+    into its in-memory indexes before a read, so every worker answers from
+    the same candidates. A process that falls more than
+    CANDIDATE_CHANGE_LOG_MAX_ROWS changes behind rebuilds its indexes.
+
+    Writes are buffered with add() and written in one transaction per batch
+    (flush()); add_many() loads a batch directly. Terms use the skill taxonomy
+    of the time they were written. Other in-memory indexes over the same
+    entries (e.g. matching.CandidateMatrix) can be kept in step with attach().
+    """
+
+    def __init__(self, db_path: str = config.CANDIDATE_DB_PATH, batch_size: int = config.CANDIDATE_STORE_BATCH_SIZE):
+        self.batch_size = batch_size
+        # file_hash -> data; a CV parsed twice before a flush is written once
+        self._pending: Dict[str, Tuple[dict, Optional[str]]] = {}
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY,
+                file_hash TEXT NOT NULL UNIQUE,
+                full_name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                designation TEXT NOT NULL,
+                primary_skill TEXT NOT NULL,
+                secondary_skill TEXT NOT NULL,
+                experience_years REAL NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS candidate_terms (
+                term TEXT NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                mentions INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (term, candidate_id)
+            ) WITHOUT ROWID"""
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(candidate_terms)")]
+        if "mentions" not in columns:
+            self._db.execute("ALTER TABLE candidate_terms ADD COLUMN mentions INTEGER NOT NULL DEFAULT 1")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_candidate_terms_candidate ON candidate_terms(candidate_id)")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS candidate_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                candidate_id INTEGER NOT NULL,
+                old_years REAL,
+                old_terms TEXT
+            )"""
+        )
+        # Last change in candidate_changes that the in-memory indexes reflect
+        self._seen = self._last_change()
+        self._index = BitmapIndex()
+        self._indexes: List = []
+        self.attach(self._index)
+
+    # Writes
+    def add(self, file_hash: str, data: dict, payload: Optional[str] = None) -> bool:
+        """Queue a parsed CV (and its JSON, if already encoded) for the next flush. Returns True once a full batch is waiting."""
+        with self._pending_lock:
+            self._pending[file_hash] = (data, payload)
+            return len(self._pending) >= self.batch_size
+
+    def flush(self) -> int:
+        """Write every queued CV in one transaction. Returns the number written."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            self.sync()
+            return 0
+        return self.add_many((file_hash, data, payload) for file_hash, (data, payload) in pending.items())
+
+    def add_many(self, records: Iterable[tuple]) -> int:
+        """Insert or replace (file_hash, EmployeeData dict[, its JSON]) records in one transaction."""
+        now = time.time()
+        rows, terms = [], []
+        for file_hash, data, *encoded in records:
+            rows.append((
+                file_hash,
+                data.get("fullName") or "",
+                data.get("email") or "",
+                data.get("designation") or "",
+                data.get("primarySkill") or "",
+                data.get("secondarySkill") or "",
+                float(data.get("experienceYears") or 0.0),
+                encoded[0] if encoded and encoded[0] is not None else json.dumps(data),
+                now,
+            ))
+            terms.append(candidate_terms(data))
+        if not rows:
+            return 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for row, row_terms in zip(rows, terms):
+                    existing = self._db.execute(
+                        "SELECT id, experience_years FROM candidates WHERE file_hash = ?", (row[0],)
+                    ).fetchone()
+                    if existing is not None:
+                        candidate_id = existing[0]
+                        self._log_change(candidate_id, existing[1], self._terms_of(candidate_id))
+                        self._db.execute(
+                            "UPDATE candidates SET full_name = ?, email = ?, designation = ?, primary_skill = ?, "
+                            "secondary_skill = ?, experience_years = ?, payload = ?, updated_at = ? WHERE id = ?",
+                            row[1:] + (candidate_id,),
+                        )
+                        self._db.execute("DELETE FROM candidate_terms WHERE candidate_id = ?", (candidate_id,))
+                    else:
+                        candidate_id = self._db.execute(
+                            "INSERT INTO candidates (file_hash, full_name, email, designation, primary_skill, "
+                            "secondary_skill, experience_years, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            row,
+                        ).lastrowid
+                        self._log_change(candidate_id)
+                    self._db.executemany(
+                        "INSERT INTO candidate_terms (term, candidate_id, mentions) VALUES (?, ?, ?)",
+                        [(term, candidate_id, mentions) for term, mentions in row_terms.items()],
+                    )
+                self._prune_changes()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            # The in-memory indexes only change once the rows are committed
+            self._sync()
+        return len(rows)
+
+    def delete(self, candidate_id: int) -> bool:
+        with self._lock:
+            existing = self._db.execute("SELECT experience_years FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+            if existing is None:
+                return False
+            terms = self._terms_of(candidate_id)
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM candidate_terms WHERE candidate_id = ?", (candidate_id,))
+                self._db.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+                self._log_change(candidate_id, existing[0], terms)
+                self._prune_changes()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._sync()
+        return True
+
+    # Reads
+    def get(self, candidate_id: int) -> Optional[dict]:
+        """Summary of one candidate plus the full stored EmployeeData under "data"."""
+        self.flush()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_SUMMARY_COLUMNS}, payload FROM candidates WHERE id = ?", (candidate_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**_summary(row), "data": json.loads(row[-1])}
+
+    def search(
+        self,
+        skills: Sequence[str] = (),
+        any_skills: Sequence[str] = (),
+        exclude_skills: Sequence[str] = (),
+        domains: Sequence[str] = (),
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> dict:
+        """
+        Candidates matching every filter, most experienced first.
+
+        Args:
+            skills: Skills a candidate must all have (aliases and versions are normalized)
+            any_skills: Skills of which a candidate must have at least one
+            exclude_skills: Skills a candidate must not have
+            domains: Skill domains a candidate must all have (e.g. "DevOps & Cloud")
+            min_experience / max_experience: experienceYears range, inclusive
+            page / page_size: 1-based page of the results
+
+        Returns:
+            {"total", "page", "page_size", "results": [candidate summaries]}
+        """
+        self.flush()
+        required = sorted({skill_term(name) for name in skills} | {domain_term(name) for name in domains})
+        optional = sorted({skill_term(name) for name in any_skills})
+        excluded = sorted({skill_term(name) for name in exclude_skills})
+        with self._lock:
+            matches = self._index.match(required, optional, excluded)
+            total, ids = self._index.page(matches, min_experience, max_experience, (page - 1) * page_size, page_size)
+            results = self._summaries(ids)
+        return {"total": total, "page": page, "page_size": page_size, "results": results}
+
+    def iter_records(self, after_id: int = 0, limit: Optional[int] = None, batch_size: int = 500) -> Iterator[Tuple[int, str, float, str]]:
+        """
+        (id, file_hash, updated_at, payload JSON) of stored candidates in id
+        order, starting after after_id. Rows are fetched batch_size at a time
+        by keyset (id > last id), so the lock is never held for the whole scan
+        and memory stays flat however many rows there are.
+        """
+        self.flush()
+        remaining = limit
+        while remaining is None or remaining > 0:
+            count = batch_size if remaining is None else min(batch_size, remaining)
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, file_hash, updated_at, payload FROM candidates WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, count),
+                ).fetchall()
+            yield from rows
+            if len(rows) < count:
+                return
+            after_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def next_cursor(self, after_id: int, limit: int) -> Optional[int]:
+        """Cursor for the page after the `limit` records following after_id, or None if that is the last page."""
+        self.flush()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM candidates WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?", (after_id, limit - 1)
+            ).fetchone()
+            if row is None:
+                return None
+            more = self._db.execute("SELECT 1 FROM candidates WHERE id > ? LIMIT 1", (row[0],)).fetchone()
+        return row[0] if more else None
+
+    def summaries(self, ids: Sequence[int]) -> List[dict]:
+        """Search-result summaries of the given candidates, in the same order (unknown ids skipped)."""
+        with self._lock:
+            return self._summaries(ids)
+
+    def sync(self) -> None:
+        """Bring the in-memory indexes up to date with writes made through other connections (other workers)."""
+        with self._lock:
+            self._sync()
+
+    def attach(self, index) -> None:
+        """
+        Keep another in-memory index in step with the store. It is filled with
+        every stored candidate now, then gets add(entries) and remove(entries)
+        calls with (candidate_id, experience_years, {term: mentions}) entries
+        after each committed write, like BitmapIndex, and clear() before a rebuild.
+        """
+        with self._lock:
+            self._sync()
+            started = time.perf_counter()
+            index.add(self._entries())
+            self._indexes.append(index)
+            if len(self._index):
+                logger.info(f"Indexed {len(self._index)} stored candidates into {type(index).__name__} in {time.perf_counter() - started:.2f}s")
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._sync()
+            candidates = len(self._index)
+            terms = len(self._index.postings)
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"candidates": candidates, "terms": terms, "pending_writes": pending}
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    # Internals (caller holds self._lock, or is __init__)
+    def _terms_of(self, candidate_id: int) -> Dict[str, int]:
+        return dict(self._db.execute("SELECT term, mentions FROM candidate_terms WHERE candidate_id = ?", (candidate_id,)))
+
+    def _entries(self, ids: Optional[Sequence[int]] = None) -> List[Tuple[int, float, Dict[str, int]]]:
+        """Index entries of every stored candidate, or of the given ones (those that still exist)."""
+        term_rows = "SELECT term, candidate_id, mentions FROM candidate_terms"
+        candidate_rows = "SELECT id, experience_years FROM candidates"
+        params: list = []
+        if ids is not None:
+            term_rows += f" WHERE candidate_id IN ({_placeholders(ids)})"
+            candidate_rows += f" WHERE id IN ({_placeholders(ids)})"
+            params = list(ids)
+        terms: Dict[int, Dict[str, int]] = {}
+        for term, candidate_id, mentions in self._db.execute(term_rows, params):
+            terms.setdefault(candidate_id, {})[term] = mentions
+        return [(candidate_id, years, terms.get(candidate_id, {})) for candidate_id, years in self._db.execute(candidate_rows, params)]
+
+    def _last_change(self) -> int:
+        return self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM candidate_changes").fetchone()[0]
+
+    def _log_change(self, candidate_id: int, old_years: Optional[float] = None, old_terms: Optional[Dict[str, int]] = None) -> None:
+        """Record a write to candidate_id, with the entry it had before (None for a new candidate)."""
+        self._db.execute(
+            "INSERT INTO candidate_changes (candidate_id, old_years, old_terms) VALUES (?, ?, ?)",
+            (candidate_id, old_years, json.dumps(old_terms) if old_terms is not None else None),
+        )
+
+    def _prune_changes(self) -> None:
+        self._db.execute(
+            "DELETE FROM candidate_changes WHERE seq <= (SELECT MAX(seq) FROM candidate_changes) - ?",
+            (config.CANDIDATE_CHANGE_LOG_MAX_ROWS,),
+        )
+
+    def _sync(self) -> None:
+        """Replay the changes logged since the last sync into the in-memory indexes."""
+        changes = self._db.execute(
+            "SELECT seq, candidate_id, old_years, old_terms FROM candidate_changes WHERE seq > ? ORDER BY seq", (self._seen,)
+        ).fetchall()
+        if not changes:
+            return
+        if changes[0][0] > self._seen + 1:
+            # Changes this process never saw were pruned from the log: start over
+            logger.info("Candidate change log is past this process, rebuilding the indexes")
+            entries = self._entries()
+            for index in self._indexes:
+                index.clear()
+                index.add(entries)
+        else:
+            # Replaying is idempotent: drop every entry a candidate had, then index what it has now
+            changed = sorted({candidate_id for _, candidate_id, _, _ in changes})
+            current = self._entries(changed)
+            removed = [(candidate_id, old_years, json.loads(old_terms))
+                       for _, candidate_id, old_years, old_terms in changes if old_terms is not None]
+            for index in self._indexes:
+                index.remove(removed + current)
+                index.add(current)
+        self._seen = changes[-1][0]
+
+    def _summaries(self, ids: Sequence[int]) -> List[dict]:
+        if not ids:
+            return []
+        rows = self._db.execute(f"SELECT {_SUMMARY_COLUMNS} FROM candidates WHERE id IN ({_placeholders(ids)})", list(ids))
+        by_id = {row[0]: _summary(row) for row in rows}
+        return [by_id[candidate_id] for candidate_id in ids if candidate_id in by_id]
+
+
+def _placeholders(values: Sequence) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def _summary(row: tuple) -> dict:
+    return {
+        "id": row[0],
+        "file_hash": row[1],
+        "fullName": row[2],
+        "email": row[3],
+        "designation": row[4],
+        "primarySkill": row[5],
+        "secondarySkill": row[6],
+        "experienceYears": row[7],
+        "updated_at": row[8],
+    }
+
+
+_candidate_store: Optional[CandidateStore] = None
+_candidate_store_lock = threading.Lock()
+
+
+def get_candidate_store() -> Optional[CandidateStore]:
+    """Shared store, or None when it is disabled in config."""
+    global _candidate_store
+    if not config.CANDIDATE_STORE_ENABLED:
+        return None
+    with _candidate_store_lock:
+        if _candidate_store is None:
+            _candidate_store = CandidateStore()
+        return _candidate_store
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from metrics import BREAKER_OPEN
+import config
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding window of recent calls.
+
+    A call counts as bad if it failed or took longer than slow_call_seconds.
+    Once at least min_calls are in the window and the bad share reaches
+    failure_rate, the breaker opens and allow() returns False for open_seconds.
+    After that one trial call is let through (half-open): success closes the
+    breaker with a fresh window, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = config.LLM_BREAKER_WINDOW,
+        min_calls: int = config.LLM_BREAKER_MIN_CALLS,
+        failure_rate: float = config.LLM_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = config.LLM_BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = config.LLM_BREAKER_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque = deque(maxlen=window)  # True = bad call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (in half-open state, only one trial at a time)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            # Half-open; a trial that never reported back (cancelled) doesn't block forever
+            now = self._clock()
+            if self._trial_started is None or now - self._trial_started >= self.open_seconds:
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self, seconds: float) -> None:
+        if seconds > self.slow_call_seconds:
+            self._record(bad=True)
+        else:
+            self._record(bad=False)
+
+    def record_failure(self) -> None:
+        self._record(bad=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            bad = sum(self._outcomes)
+            return {
+                "state": self._current_state(),
+                "calls": calls,
+                "failure_rate": round(bad / calls, 4) if calls else 0.0,
+            }
+
+    # Internals (caller holds self._lock)
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_started = None
+        return self._state
+
+    def _record(self, bad: bool) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                if bad:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._state = CLOSED
+                    BREAKER_OPEN.set(0, name=self.name)
+                    logger.info(f"Circuit breaker '{self.name}' closed")
+                return
+            self._outcomes.append(bad)
+            if state == CLOSED and len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._trial_started = None
+        BREAKER_OPEN.set(1, name=self.name)
+        logger.warning(f"Circuit breaker '{self.name}' opened for {self.open_seconds}s")
+
+
+_llm_breaker: Optional[CircuitBreaker] = None
+
+
+def get_llm_breaker() -> CircuitBreaker:
+    """Breaker guarding the Gemini calls (shared by every request, batch and job)."""
+    global _llm_breaker
+    if _llm_breaker is None:
+        _llm_breaker = CircuitBreaker("llm")
+    return _llm_breaker
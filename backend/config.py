@@ -3,10 +3,139 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Several keys (comma separated) spread model calls over their separate quotas
+GOOGLE_API_KEYS = [key.strip() for key in os.getenv("GOOGLE_API_KEYS", "").split(",") if key.strip()] or [GOOGLE_API_KEY]
 GOOGLE_MODEL="gemini-2.5-flash"
 GENAI_TEMPERATURE = 0
 GENAI_MAX_OUTPUT_TOKENS = 8000
-CV_PROCESSING_PROMPT = """You are an expert at extracting structured data from CVs/Resumes.
+LLM_WARMUP_ON_STARTUP = os.getenv("LLM_WARMUP_ON_STARTUP", "false").lower() == "true"  # one tiny model call at startup
+
+# Model call scheduling (llm_scheduler.py). Quotas are per key: set them to your Gemini tier's limits
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "1000"))  # 0 = no limit
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))  # 0 = no limit
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))  # on 429s, 5xx and timeouts
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "30"))
+LLM_QUEUE_MAX_WAITING = int(os.getenv("LLM_QUEUE_MAX_WAITING", "200"))  # calls waiting for quota before new ones are refused
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "60"))  # longest wait for quota
+
+# "single": one prompt for the whole EmployeeData. "sectioned": concurrent smaller calls for
+# profile/education, skills and work experience (see CV_SECTION_PROMPTS), each with its own
+# output budget and retried on its own when its JSON doesn't parse
+LLM_EXTRACTION_STRATEGY = os.getenv("LLM_EXTRACTION_STRATEGY", "single")
+LLM_SECTION_MAX_OUTPUT_TOKENS = {"profile": 1024, "skills": 2048, "experience": 4096}
+LLM_SECTION_RETRIES = int(os.getenv("LLM_SECTION_RETRIES", "1"))  # extra attempts per section after a parse failure
+
+# Uploads
+MAX_UPLOAD_SIZE_MB = 10
+SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.doc']
+
+# Batch processing (/api/process-cv/batch)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_EXTRACTION_CONCURRENCY = int(os.getenv("BATCH_EXTRACTION_CONCURRENCY", "4"))  # files parsed at once
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))  # Gemini calls in flight at once
+BATCH_MAX_REQUEST_MB = int(os.getenv("BATCH_MAX_REQUEST_MB", "500"))  # whole request body, rejected with 413 while uploading
+
+# Job queue (/api/jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE_DEPTH = int(os.getenv("JOB_MAX_QUEUE_DEPTH", "100"))  # waiting jobs before submissions get 429
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", "")  # set to a file path for a durable queue; serve.py uses "jobs.db" with several workers
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_LONG_POLL_MAX_SECONDS = 30
+
+# Text extraction process pool (0 workers = extract on the default thread pool)
+EXTRACTION_PROCESS_WORKERS = int(os.getenv("EXTRACTION_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "4"))  # PDFs longer than this are split across workers
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PDF_PAGE_TIMEOUT_SECONDS", "10"))
+# PDF text engine: "pypdf2" (default), "pypdfium2" or "pdfminer" when installed, or "auto" (pypdfium2 if installed)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf2")
+# Extraction stops early past these budgets (0 = no limit); CV content is in the first pages of long portfolios
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+# DOCX text: "stream" (iterparse of word/document.xml, document order, low memory) or "python-docx"
+DOCX_EXTRACTOR = os.getenv("DOCX_EXTRACTOR", "stream")
+EXTRACTION_DOCUMENT_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_DOCUMENT_TIMEOUT_SECONDS", "60"))
+
+# Experience timeline (timeline.py)
+TIMELINE_MIN_GAP_DAYS = int(os.getenv("TIMELINE_MIN_GAP_DAYS", "90"))  # shorter breaks between jobs aren't reported as gaps
+TIMELINE_DATE_CACHE_SIZE = 8192  # distinct date strings memoized
+
+# Section segmenter: send only contact/skills/experience/education to the LLM
+SEGMENTER_ENABLED = os.getenv("SEGMENTER_ENABLED", "true").lower() == "true"
+SEGMENTER_MIN_CONFIDENCE = float(os.getenv("SEGMENTER_MIN_CONFIDENCE", "0.7"))  # below this the full text is sent
+
+# Extraction engine: "llm" (Gemini), "lite" (LLM-free heuristics, a few ms per CV)
+# or "auto" (Gemini, falling back to lite behind a circuit breaker). Overridable per request with ?mode=
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "llm")
+LLM_AUTO_TIMEOUT_SECONDS = float(os.getenv("LLM_AUTO_TIMEOUT_SECONDS", "30"))  # auto mode stops waiting for the LLM after this
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))  # recent LLM calls considered
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))  # share of failed or slow calls that opens it
+LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "20"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))  # time on lite before retrying the LLM
+
+# Skill -> domain taxonomy (data file, reloaded when it changes on disk)
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.json"))
+SKILL_TAXONOMY_RELOAD_SECONDS = float(os.getenv("SKILL_TAXONOMY_RELOAD_SECONDS", "5"))  # how often to check the file's mtime, 0 = never
+
+# Observability
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"  # per-stage Server-Timing response header
+# Logs go through a queue to a background writer thread (logs.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG also logs the full CV text and every skill and job
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" (one object per line) or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records waiting to be written; beyond this they are dropped
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))  # longer messages/fields are cut below DEBUG
+
+# Production server (serve.py): pre-forked worker processes on one socket
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "0"))  # 0 = one per CPU core
+SERVE_WORKER_CONCURRENCY = int(os.getenv("SERVE_WORKER_CONCURRENCY", "64"))  # requests in progress per worker; more get 503
+SERVE_DRAIN_SECONDS = float(os.getenv("SERVE_DRAIN_SECONDS", "90"))  # on SIGTERM, time for in-flight requests and jobs to finish
+# State shared by the workers (shared_state.py): LLM quota buckets and metrics. Empty = per process;
+# serve.py uses "shared_state.db" when running several workers and this isn't set
+SHARED_STATE_DB_PATH = os.getenv("SHARED_STATE_DB_PATH", "")
+SHARED_METRICS_PUBLISH_SECONDS = 5.0  # how stale other workers' numbers in /metrics may be
+
+# Compression of CV results (payloads.py), off unless set: encodings offered to clients, in order of
+# preference, e.g. "br,gzip" ("br" needs `pip install brotli`); the client picks with Accept-Encoding
+RESPONSE_COMPRESSION = [name.strip().lower() for name in os.getenv("RESPONSE_COMPRESSION", "").split(",") if name.strip()]
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))  # smaller bodies are sent as they are
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))  # 0-11; higher is much slower
+
+# Bump these whenever the prompt or the EmployeeData schema changes so cached
+# results produced by the old version are no longer served
+PROMPT_VERSION = "1"
+SCHEMA_VERSION = "1"
+
+# Result cache (in-process LRU + on-disk SQLite tier)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "256"))
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cv_cache.db")  # empty string disables the disk tier
+CACHE_DISK_MAX_ENTRIES = int(os.getenv("CACHE_DISK_MAX_ENTRIES", "10000"))
+CACHE_DISK_MAX_BYTES = int(os.getenv("CACHE_DISK_MAX_BYTES", str(200 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_GENERATION_CHECK_SECONDS = float(os.getenv("CACHE_GENERATION_CHECK_SECONDS", "0.5"))  # how stale another worker's invalidation may be here
+
+# Parsed candidates kept for search (SQLite with an inverted skill/domain index)
+CANDIDATE_STORE_ENABLED = os.getenv("CANDIDATE_STORE_ENABLED", "true").lower() == "true"
+CANDIDATE_DB_PATH = os.getenv("CANDIDATE_DB_PATH", "candidates.db")
+CANDIDATE_STORE_BATCH_SIZE = int(os.getenv("CANDIDATE_STORE_BATCH_SIZE", "100"))  # parsed CVs written per transaction
+CANDIDATE_STORE_FLUSH_SECONDS = float(os.getenv("CANDIDATE_STORE_FLUSH_SECONDS", "2"))  # longest a parsed CV waits to be written
+CANDIDATE_SEARCH_MAX_PAGE_SIZE = 100
+CANDIDATE_CHANGE_LOG_MAX_ROWS = 10000  # writes kept for other workers to replay; one further behind rebuilds its index
+
+# Ranking stored candidates against a job description (matching.py)
+MATCH_SKILL_WEIGHT = float(os.getenv("MATCH_SKILL_WEIGHT", "0.6"))  # share of the job's skills the candidate has
+MATCH_DOMAIN_WEIGHT = float(os.getenv("MATCH_DOMAIN_WEIGHT", "0.2"))  # similarity of the skill domain mix
+MATCH_EXPERIENCE_WEIGHT = float(os.getenv("MATCH_EXPERIENCE_WEIGHT", "0.2"))  # years against the years asked for
+MATCH_MENTIONS_SATURATION = 3  # mentions of a skill in a CV that count as fully covering it
+MATCH_OPTIONAL_SKILL_WEIGHT = 0.5  # weight of "nice to have" skills in a job description
+MATCH_MAX_TOP_K = 200
+
+# The extraction prompt, in parts so sectioned extraction can reuse them
+_PROMPT_HEADER = """You are an expert at extracting structured data from CVs/Resumes.
 
 **CRITICAL RULE:** Only extract information that is EXPLICITLY mentioned in the CV.
 Do NOT infer, guess, or make up any information.
@@ -21,14 +150,18 @@ Do NOT infer, guess, or make up any information.
 
 **EXTRACTION INSTRUCTIONS:**
 
-1. **Personal Information:**
+"""
+
+_PERSONAL_INSTRUCTIONS = """1. **Personal Information:**
    - fullName: Extract as written
    - dob: Date of birth in YYYY-MM-DD format (if mentioned)
    - contact: Phone number with country code (if visible)
    - email: Email address
    - emergencyContact: Only if explicitly mentioned (family member contact)
 
-2. **Skills - EXTRACT INDIVIDUAL TECHNOLOGIES (CRITICAL):**
+"""
+
+_SKILLS_INSTRUCTIONS = """2. **Skills - EXTRACT INDIVIDUAL TECHNOLOGIES (CRITICAL):**
    - READ THE CV CAREFULLY - Look for sections titled "TECHNICAL SKILLS", "Skills:", "Languages:", "Technologies:"
    - When you see comma-separated lists like "C++, Java, JavaScript, Python" - YOU MUST extract EACH ONE as a separate skill
    - When you see "Node.js, Express.js, MongoDB" - Extract 3 skills: "Node.js", "Express.js", "MongoDB"
@@ -51,7 +184,9 @@ Do NOT infer, guess, or make up any information.
      * category: "technical", "soft", "finance", "design", "domain", or "other"
    - If NO skills found: []
 
-3. **Work Experience - LOOK FOR EXPERIENCE/INTERNSHIPS SECTION:**
+"""
+
+_EXPERIENCE_INSTRUCTIONS = """3. **Work Experience - LOOK FOR EXPERIENCE/INTERNSHIPS SECTION:**
    - Search for sections: "EXPERIENCE", "WORK EXPERIENCE", "Professional Experience", "INTERNSHIPS", "Employment History"
    - Extract EVERY job/internship/freelance role mentioned BELOW the projects section
    - IMPORTANT: If NO work experience/internships found, return empty array []
@@ -71,25 +206,35 @@ Do NOT infer, guess, or make up any information.
    - EXAMPLE:
      * "Backend Developer Intern at Tech Corp | Jul 2024 - Sep 2024" → company: "Tech Corp", position: "Backend Developer Intern", startDate: "2024-07-01", endDate: "2024-09-01"
 
-4. **Employment Fields:**
+"""
+
+_EMPLOYMENT_INSTRUCTIONS = """4. **Employment Fields:**
    - designation: Current/most recent job title from work experience
    - department: Only if explicitly mentioned in CV, otherwise empty string ""
 
-5. **Calculated Fields (leave as default, will be computed later):**
+"""
+
+_CALCULATED_INSTRUCTIONS = """5. **Calculated Fields (leave as default, will be computed later):**
    - experienceYears: 0.0 
    - primarySkill: ""
    - secondarySkill: ""
 
-6. **Fields NOT in CV (leave as null/empty):**
+"""
+
+_NOT_IN_CV_INSTRUCTIONS = """6. **Fields NOT in CV (leave as null/empty):**
    - employeeId: null
    - officeLocation: null
    - emergencyContact: "" (unless explicitly mentioned)
 
-7. **Education:**
+"""
+
+_EDUCATION_INSTRUCTIONS = """7. **Education:**
    - Extract degrees, institutions, years
    - Format: "B.Tech Computer Science, XYZ University (2018)"
 
-**OUTPUT FORMAT:**
+"""
+
+_PROMPT_FOOTER = """**OUTPUT FORMAT:**
 {format_instructions}
 
 **IMPORTANT:**
@@ -103,3 +248,15 @@ Do NOT infer, guess, or make up any information.
 
 **BEGIN EXTRACTION:**
 """
+
+CV_PROCESSING_PROMPT = (
+    _PROMPT_HEADER + _PERSONAL_INSTRUCTIONS + _SKILLS_INSTRUCTIONS + _EXPERIENCE_INSTRUCTIONS
+    + _EMPLOYMENT_INSTRUCTIONS + _CALCULATED_INSTRUCTIONS + _NOT_IN_CV_INSTRUCTIONS + _EDUCATION_INSTRUCTIONS + _PROMPT_FOOTER
+)
+
+# Sectioned extraction: one smaller prompt per group of fields, sent concurrently
+CV_SECTION_PROMPTS = {
+    "profile": _PROMPT_HEADER + _PERSONAL_INSTRUCTIONS + _EMPLOYMENT_INSTRUCTIONS + _NOT_IN_CV_INSTRUCTIONS + _EDUCATION_INSTRUCTIONS + _PROMPT_FOOTER,
+    "skills": _PROMPT_HEADER + _SKILLS_INSTRUCTIONS + _PROMPT_FOOTER,
+    "experience": _PROMPT_HEADER + _EXPERIENCE_INSTRUCTIONS + _PROMPT_FOOTER,
+}
@@ -1,121 +1,333 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from schema import EmployeeData
+from engine import load_engine, engine_strategy, SECTIONS
+from lite_engine import get_lite_engine
+from circuit_breaker import get_llm_breaker
 from utils import calc_years_of_experience, rank_skill, recount_skill_mentions, derive_domain_from_skills
 from file_parsing.pdf_parse import extract_from_pdf
 from file_parsing.doc_parse import extract_from_doc
+from file_parsing.extraction_pool import get_extraction_pool
+from cache import get_result_cache, content_hash, make_cache_key
+from candidate_store import get_candidate_store
+from metrics import stage_timer, in_flight, INPUT_BYTES, INPUT_CHARACTERS, SEGMENTER_TOKENS, SEGMENTER_REDUCTION, SEGMENTER_FALLBACKS, EXTRACTIONS
+from segmenter import segment_cv, estimate_tokens
+from contextvars import ContextVar
+from pydantic_core import to_json
+from typing import AsyncIterator, BinaryIO, Callable, Optional, Tuple, Union
 import asyncio
+import json
+import logging
+import time
 import config
 
-async def cv_processing(file_content:bytes,file_ext:str)->dict:
+logger=logging.getLogger(__name__)
+
+EXTRACTION_MODES=("llm","lite","auto")
+
+# Which engine produced the current request's result ("llm" or "lite")
+_engine_used:ContextVar[Optional[str]]=ContextVar("engine_used",default=None)
+
+def extraction_engine_used()->Optional[str]:
+    """Engine behind the last cv_processing result in this context (for response headers)"""
+    return _engine_used.get()
+
+async def _run_limited(limit,start):
+    """Call start() and await the result, holding the semaphore limit first if one is given"""
+    if limit is None:
+        return await start()
+    async with limit:
+        return await start()
+
+def record_segmentation(segmented)->None:
+    SEGMENTER_TOKENS.observe(segmented.original_tokens,kind="original")
+    SEGMENTER_TOKENS.observe(segmented.prompt_tokens,kind="prompt")
+    SEGMENTER_REDUCTION.observe(segmented.token_reduction)
+    if segmented.used_fallback:
+        SEGMENTER_FALLBACKS.inc()
+
+def _cache_variant(engine_name:str)->str:
+    if engine_name=="lite":
+        return "lite"
+    variant="segmented" if config.SEGMENTER_ENABLED else ""
+    if engine_strategy()=="sectioned":
+        variant+="+sectioned"
+    return variant
+
+async def _cache_lookup(result_cache,file_hash:str,engine_name:str)->Optional[Tuple[dict,str]]:
+    """(result, its JSON) from the cache, or None. The lookup may hit SQLite, so it runs in a thread"""
+    key=make_cache_key(file_hash,variant=_cache_variant(engine_name))
+    def lookup():
+        payload=result_cache.get_payload(key)
+        return None if payload is None else (json.loads(payload),payload)
+    with stage_timer("cache_lookup"):
+        cached=await asyncio.to_thread(lookup)
+    if cached is None:
+        return None
+    logger.info("Cache hit",extra={"file_hash":file_hash[:12],"engine":engine_name})
+    # Set here, on the loop: a context variable set inside the thread would not come back
+    _engine_used.set(engine_name)
+    return cached
+
+async def _extract_with_llm(llm_text:str,llm_limit,timeout:Optional[float]=None,on_section:Optional[Callable[[str,dict],None]]=None)->EmployeeData:
+    """Gemini extraction; every outcome is reported to the LLM circuit breaker. With on_section the output is streamed"""
+    breaker=get_llm_breaker()
+    engine=await load_engine()
     
-    print(f"Extracting data from {file_ext} file")
+    async def call():
+        started=time.perf_counter()
+        extraction=engine.extract(llm_text) if on_section is None else engine.extract_streaming(llm_text,on_section)
+        try:
+            if timeout:
+                raw_data=await asyncio.wait_for(extraction,timeout)
+            else:
+                raw_data=await extraction
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.perf_counter()-started)
+        return raw_data
+    return await _run_limited(llm_limit,call)
+
+async def _store_candidate(file_content,file_hash:Optional[str],data:dict,payload:Optional[str]=None)->None:
+    """Queue the result (and its JSON) for the candidate store, writing the batch once it is full"""
+    candidate_store=await asyncio.to_thread(get_candidate_store)
+    if candidate_store is None:
+        return
+    if file_hash is None:
+        file_hash=await asyncio.to_thread(content_hash,file_content)
+    if candidate_store.add(file_hash,data,payload):
+        await asyncio.to_thread(candidate_store.flush)
+
+async def _until_done(task:asyncio.Future,queue:asyncio.Queue)->AsyncIterator:
+    """Yield queue items as they arrive while task runs, then whatever is left"""
+    while not task.done():
+        getter=asyncio.ensure_future(queue.get())
+        await asyncio.wait({task,getter},return_when=asyncio.FIRST_COMPLETED)
+        if getter.done():
+            yield getter.result()
+        else:
+            getter.cancel()
+    while not queue.empty():
+        yield queue.get_nowait()
+
+def _content_size(file_content)->int:
+    if isinstance(file_content,(bytes,bytearray)):
+        return len(file_content)
+    file_content.seek(0,2)
+    size=file_content.tell()
+    file_content.seek(0)
+    return size
+
+def _read_all(file_content)->bytes:
+    if isinstance(file_content,(bytes,bytearray)):
+        return file_content
+    file_content.seek(0)
+    return file_content.read()
+
+async def _extract_text(file_content,file_ext:str)->str:
     loop =asyncio.get_event_loop()
-    if file_ext=='.pdf':
-        cv_text=await loop.run_in_executor(None,extract_from_pdf,file_content)
-    elif file_ext in ['.docx','.doc']:
-        cv_text=await loop.run_in_executor(None,extract_from_doc,file_content)
-    else:
+    with stage_timer("extraction"):
+        extraction_pool=get_extraction_pool()
+        if extraction_pool is not None:
+            # Dedicated worker processes, large PDFs split by page range.
+            # Bytes are what crosses the process boundary, so a file object is read once here
+            if not isinstance(file_content,(bytes,bytearray)):
+                file_content=await loop.run_in_executor(None,_read_all,file_content)
+            return await extraction_pool.extract(file_content,file_ext)
+        elif file_ext=='.pdf':
+            return await loop.run_in_executor(None,extract_from_pdf,file_content)
+        else:
+            return await loop.run_in_executor(None,extract_from_doc,file_content)
+
+async def cv_processing(file_content:Union[bytes,BinaryIO],file_ext:str,extraction_limit=None,llm_limit=None,file_hash:Optional[str]=None,mode:Optional[str]=None)->dict:
+    """
+    Parse a CV file into EmployeeData (as a dict).
+    
+    Args:
+        file_content: Uploaded file as bytes, or a seekable binary file object
+            (e.g. an upload's spooled file) that the extractors read in place
+        file_ext: File extension including the dot ('.pdf', '.docx', '.doc')
+        extraction_limit: Optional asyncio.Semaphore bounding concurrent text extraction
+        llm_limit: Optional asyncio.Semaphore bounding concurrent LLM calls
+        file_hash: SHA-256 of the file if the caller already computed it (skips rehashing)
+        mode: "llm", "lite" (LLM-free) or "auto" (LLM, lite while the LLM circuit
+            breaker is open or when the call fails); defaults to config.EXTRACTION_MODE
+        
+    Returns:
+        EmployeeData as a dict
+        
+    Raises:
+        ValueError: For an unsupported file or unknown mode
+    """
+    result,_=await cv_processing_encoded(file_content,file_ext,extraction_limit,llm_limit,file_hash,mode)
+    return result
+
+async def cv_processing_encoded(file_content:Union[bytes,BinaryIO],file_ext:str,extraction_limit=None,llm_limit=None,file_hash:Optional[str]=None,mode:Optional[str]=None)->Tuple[dict,str]:
+    """
+    Like cv_processing, plus the result already encoded as JSON (by pydantic,
+    once, or as stored in the cache), for endpoints that send it as it is.
+    """
+    # "result" is the last event; running the generator to its end also closes its in-flight gauge
+    result=None
+    async for event,data in cv_processing_events(file_content,file_ext,extraction_limit,llm_limit,file_hash,mode,progressive=False):
+        if event=="result":
+            result=data["data"],data["json"]
+    return result
+
+async def cv_processing_events(file_content:Union[bytes,BinaryIO],file_ext:str,extraction_limit=None,llm_limit=None,file_hash:Optional[str]=None,mode:Optional[str]=None,progressive:bool=True)->AsyncIterator[Tuple[str,dict]]:
+    """
+    The CV pipeline as a stream of (event, data) pairs, each sent as soon as its stage finishes.
+    
+    With progressive=True (the SSE endpoint):
+        "extracted": format, bytes, characters and estimated tokens of the text
+        "contact":   fullName, dob, contact, email found by regex, before any LLM call
+        "section":   {"section", "engine", "data"} for each group of fields the
+                     model (or lite engine) has finished: personal, skills,
+                     workExperience, education
+        "skills":    allSkills with recounted mentions
+        "derived":   primarySkill, secondarySkill, experienceYears
+    and always, last:
+        "result":    {"engine", "cached", "data": EmployeeData dict, "json": the same as JSON text}
+    cv_processing runs the same generator with progressive=False and only uses "result".
+    
+    Raises:
+        ValueError: For an unsupported file or unknown mode
+    """
+    with in_flight("cv_processing"):
+        async for event in _cv_processing_events(file_content,file_ext,extraction_limit,llm_limit,file_hash,mode or config.EXTRACTION_MODE,progressive):
+            yield event
+
+async def _cv_processing_events(file_content,file_ext:str,extraction_limit,llm_limit,file_hash,mode:str,progressive:bool):
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}'. Use one of: {', '.join(EXTRACTION_MODES)}.")
+    engine_name="lite" if mode=="lite" else "llm"
+    reason="requested"
+    
+    # Same file + same model/prompt/schema -> same result, skip extraction and the LLM call
+    result_cache=get_result_cache()
+    if result_cache is not None:
+        if file_hash is None:
+            file_hash=await asyncio.to_thread(content_hash,file_content)
+        cached=await _cache_lookup(result_cache,file_hash,engine_name)
+        if cached is not None:
+            await _store_candidate(file_content,file_hash,*cached)
+            yield "result",{"engine":engine_name,"cached":True,"data":cached[0],"json":cached[1]}
+            return
+    
+    # Auto mode doesn't wait on an LLM that is failing or too slow
+    if mode=="auto" and not get_llm_breaker().allow():
+        engine_name,reason="lite","breaker_open"
+        if result_cache is not None:
+            cached=await _cache_lookup(result_cache,file_hash,engine_name)
+            if cached is not None:
+                await _store_candidate(file_content,file_hash,*cached)
+                yield "result",{"engine":engine_name,"cached":True,"data":cached[0],"json":cached[1]}
+                return
+    
+    if file_ext not in ['.pdf','.docx','.doc']:
         raise ValueError("Unsupported file format. Only PDF and DOCX are supported.")
     
-    print(f"Extracted {len(cv_text)} characters from CV")
-    print(f"\n=== FULL CV TEXT ===")
-    print(cv_text)
-    print("=" * 50)
-    
-    print("Initializing model")   
-    # FIXED: Changed model_name to model (new langchain-google-genai version)
-    llm=ChatGoogleGenerativeAI(
-        model=config.GOOGLE_MODEL,  # Changed from model_name to model
-        google_api_key=config.GOOGLE_API_KEY,
-        temperature=config.GENAI_TEMPERATURE,
-        max_output_tokens=config.GENAI_MAX_OUTPUT_TOKENS
-    )
-    
-    print(f"Setting up parser for EmployeeData schema")
-    parser=PydanticOutputParser(pydantic_object=EmployeeData)
-    
-    print(f"Creating prompt template")
-    prompt=PromptTemplate(
-        template=config.CV_PROCESSING_PROMPT,
-        input_variables=["cv_text"],
-        partial_variables={"format_instructions": parser.get_format_instructions()}
-    )
-    
-    print(f"API call to process CV")
-    chain =prompt | llm | parser
-    raw_data=await chain.ainvoke({"cv_text":cv_text})
-    
-    print(f"API extraction completed")
-    print(f"\n=== RAW EXTRACTED DATA ===")
-    print(f"Skills extracted: {len(raw_data.allSkills)}")
-    if raw_data.allSkills:
-        print("All skills:")
-        for skill in raw_data.allSkills:
-            print(f"  - {skill.name} (mentions: {skill.mentions}, category: {skill.category})")
-    else:
-        print("  NO SKILLS EXTRACTED")
-    
-    print(f"\nWork Experience extracted: {len(raw_data.workExperience)}")
-    if raw_data.workExperience:
-        print("All work experience:")
-        for exp in raw_data.workExperience:
-            print(f"  - {exp.company} | {exp.position}")
-            print(f"    Start: '{exp.startDate}' | End: '{exp.endDate}'")
-    else:
-        print("  NO WORK EXPERIENCE EXTRACTED")
-    print("=" * 50)
-    
-    print(f"\nNow recounting skill mentions with accurate matching")
+    file_size=_content_size(file_content)
+    INPUT_BYTES.observe(file_size,format=file_ext.lstrip('.'))
+    cv_text=await _run_limited(extraction_limit,lambda:_extract_text(file_content,file_ext))
+    INPUT_CHARACTERS.observe(len(cv_text))
     
-    # Recount skill mentions with accurate whole-word matching
-    if raw_data.allSkills:
-        print(f"Before recount: {[(s.name, s.mentions) for s in raw_data.allSkills[:5]]}")
-        raw_data.allSkills = recount_skill_mentions(cv_text, raw_data.allSkills)
-        print(f"After recount: {[(s.name, s.mentions) for s in raw_data.allSkills[:5]]}")
+    logger.info("Extracted text",extra={"format":file_ext.lstrip('.'),"bytes":file_size,"characters":len(cv_text)})
+    # The CV itself is personal data: only at DEBUG
+    logger.debug("Full CV text",extra={"cv_text":cv_text})
+    if progressive:
+        yield "extracted",{"format":file_ext.lstrip('.'),"bytes":file_size,"characters":len(cv_text),"tokens":estimate_tokens(cv_text)}
+    
+    # Send only the sections the model needs; recounting below still uses the full text.
+    # The lite engine and the early contact fields work from the same sections
+    llm_text=cv_text
+    segmented=None
+    if config.SEGMENTER_ENABLED or mode!="llm" or progressive:
+        with stage_timer("segment"):
+            segmented=segment_cv(cv_text)
+    if config.SEGMENTER_ENABLED:
+        record_segmentation(segmented)
+        llm_text=segmented.prompt_text
+        logger.info("Segmented CV",extra={"confidence":segmented.confidence,"fallback":segmented.used_fallback,
+                                          "original_tokens":segmented.original_tokens,"prompt_tokens":segmented.prompt_tokens})
+    if progressive:
+        yield "contact",get_lite_engine().contact_fields(cv_text,segmented)
+    
+    if engine_name=="llm":
+        timeout=config.LLM_AUTO_TIMEOUT_SECONDS if mode=="auto" else None
+        try:
+            if progressive:
+                # Stream the model output and pass on each section as soon as it is complete
+                sections=asyncio.Queue()
+                task=asyncio.ensure_future(_extract_with_llm(llm_text,llm_limit,timeout,on_section=lambda name,fields:sections.put_nowait((name,fields))))
+                try:
+                    async for name,fields in _until_done(task,sections):
+                        yield "section",{"section":name,"engine":"llm","data":fields}
+                    raw_data=await task
+                finally:
+                    task.cancel()
+            else:
+                raw_data=await _extract_with_llm(llm_text,llm_limit,timeout)
+        except Exception as e:
+            if mode!="auto":
+                raise
+            logger.warning("LLM extraction failed, falling back to lite extraction",extra={"error":f"{type(e).__name__}: {str(e)}"})
+            engine_name,reason="lite","llm_timeout" if isinstance(e,asyncio.TimeoutError) else "llm_error"
+    if engine_name=="lite":
+        logger.info("Lite extraction (no LLM)",extra={"reason":reason})
+        with stage_timer("lite"):
+            raw_data=get_lite_engine().extract_sync(cv_text,segmented)
+        if progressive:
+            lite_data=raw_data.model_dump()
+            for name,fields in SECTIONS.items():
+                yield "section",{"section":name,"engine":"lite","data":{field:lite_data[field] for field in fields}}
+    EXTRACTIONS.inc(engine=engine_name,reason=reason)
+    _engine_used.set(engine_name)
     
-    print(f"Now deriving the experience and primary/secondary skills")
+    logger.info("Extraction completed",extra={"engine":engine_name,"skills":len(raw_data.allSkills),"jobs":len(raw_data.workExperience)})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Extracted skills",extra={"skills":[(s.name,s.mentions,s.category) for s in raw_data.allSkills]})
+        logger.debug("Extracted work experience",extra={"jobs":[(exp.company,exp.position,exp.startDate,exp.endDate) for exp in raw_data.workExperience]})
     
-    experience_years=calc_years_of_experience(raw_data.workExperience)
-    print(f"calculated experience is {experience_years}")
+    # Recount skill mentions with accurate whole-word matching
+    if raw_data.allSkills:
+        with stage_timer("recount"):
+            raw_data.allSkills = recount_skill_mentions(cv_text, raw_data.allSkills)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Recounted skill mentions",extra={"top_skills":[(s.name,s.mentions) for s in raw_data.allSkills[:5]]})
+    if progressive:
+        yield "skills",{"allSkills":[skill.model_dump() for skill in raw_data.allSkills]}
     
-    if raw_data.workExperience:
-        print(f"Work experience dates: {[(exp.company, exp.startDate, exp.endDate) for exp in raw_data.workExperience]}")
+    with stage_timer("experience"):
+        experience_years=calc_years_of_experience(raw_data.workExperience)
     
     # Use domain-based aggregation for primary/secondary skills
-    print(f"\nCalculating domain-based primary/secondary skills...")
-    primary_skill, secondary_skill = derive_domain_from_skills(raw_data.allSkills)
-    print(f"Primary domain: {primary_skill}, Secondary domain: {secondary_skill}")    
-    
-    print("final Data Preparation")
-    final_data=EmployeeData(
-        # Personal info - from CV
-        fullName=raw_data.fullName,
-        dob=raw_data.dob,
-        contact=raw_data.contact,
-        email=raw_data.email,
-        emergencyContact=raw_data.emergencyContact,
-        
-        # Employment info - from CV or null for user input
-        employeeId=None,  # Not in CV - user fills
-        designation=raw_data.designation,  # From CV
-        officeLocation=None,  # Not in CV - user fills
-        department=raw_data.department,  # From CV if mentioned, else empty
-        
-        # Skills - from CV + calculations
-        allSkills=raw_data.allSkills,  # From CV with frequencies
-        primarySkill=primary_skill,  # CALCULATED from ranking
-        secondarySkill=secondary_skill,  # CALCULATED from ranking
-        
-        # Experience - from CV + calculations
-        experienceYears=experience_years,  # CALCULATED from dates
-        workExperience=raw_data.workExperience,  # From CV
+    with stage_timer("domain"):
+        primary_skill, secondary_skill = derive_domain_from_skills(raw_data.allSkills)
+    if progressive:
+        yield "derived",{"primarySkill":primary_skill,"secondarySkill":secondary_skill,"experienceYears":experience_years}
+    
+    # Everything else comes from the CV as extracted. A copy with these fields replaced,
+    # not a new EmployeeData: the extracted values are valid already and aren't validated again
+    final_data=raw_data.model_copy(update={
+        # Employment info - null for user input
+        "employeeId":None,  # Not in CV - user fills
+        "officeLocation":None,  # Not in CV - user fills
         
-        # Education - from CV
-        education=raw_data.education
-    )
-    print("Processing complete!")
-    print(f"Extracted: {len(final_data.allSkills)} skills, {len(final_data.workExperience)} jobs")
+        # CALCULATED from ranking and dates
+        "primarySkill":primary_skill,
+        "secondarySkill":secondary_skill,
+        "experienceYears":experience_years,
+    })
+    logger.info("Processing complete",extra={"engine":engine_name,"skills":len(final_data.allSkills),"jobs":len(final_data.workExperience),
+                                            "experience_years":experience_years,"primary_skill":primary_skill,"secondary_skill":secondary_skill})
     
-    return final_data.dict()
\ No newline at end of file
+    # Encoded once here: the cache, the candidate store and the response all reuse the JSON.
+    # One walk of the model; the JSON comes from the plain dict (same bytes as model_dump_json)
+    with stage_timer("serialize"):
+        result=final_data.model_dump()
+        payload=to_json(result).decode("utf-8")
+    if result_cache is not None:
+        cache_key=make_cache_key(file_hash,variant=_cache_variant(engine_name))
+        await asyncio.to_thread(result_cache.set,cache_key,file_hash,result,payload)
+    await _store_candidate(file_content,file_hash,result,payload)
+    yield "result",{"engine":engine_name,"cached":False,"data":result,"json":payload}
\ No newline at end of file
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set
+
+from schema import EmployeeData, SECTION_MODELS
+from segmenter import estimate_tokens
+from llm_scheduler import LLMScheduler
+from shared_state import get_shared_state
+from metrics import stage_timer, in_flight, record_llm_usage, LLM_SECTION_RETRIES
+import config
+
+# langchain and the Gemini client take over a second to import: they are
+# imported where first used, so the app starts answering before (startup.py)
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
+
+# Groups of EmployeeData fields reported together while the model output streams in
+SECTIONS: Dict[str, tuple] = {
+    "personal": ("fullName", "dob", "contact", "email", "emergencyContact", "designation", "department"),
+    "skills": ("allSkills",),
+    "workExperience": ("workExperience",),
+    "education": ("education",),
+}
+_FIELD_ORDER = {name: index for index, name in enumerate(EmployeeData.model_fields)}
+
+LLM_STRATEGIES = ("single", "sectioned")
+
+
+class SectionChain:
+    """One call of sectioned extraction: its prompt, sub-schema parser and output token budget."""
+
+    def __init__(self, name: str):
+        from langchain.output_parsers import PydanticOutputParser
+        from langchain.prompts import PromptTemplate
+
+        self.name = name
+        self.fields = tuple(SECTION_MODELS[name].model_fields)
+        self.parser = PydanticOutputParser(pydantic_object=SECTION_MODELS[name])
+        self.prompt = PromptTemplate(
+            template=config.CV_SECTION_PROMPTS[name],
+            input_variables=["cv_text"],
+            partial_variables={"format_instructions": self.parser.get_format_instructions()}
+        )
+        self.prompt_tokens = estimate_tokens(self.prompt.format(cv_text=""))
+        self.max_output_tokens = config.LLM_SECTION_MAX_OUTPUT_TOKENS.get(name, config.GENAI_MAX_OUTPUT_TOKENS)
+
+    def llm_chain(self, llm, max_output_tokens: int):
+        return self.prompt | llm.bind(generation_config={"max_output_tokens": max_output_tokens})
+
+
+def build_llm(api_key: Optional[str] = None) -> "ChatGoogleGenerativeAI":
+    """Gemini chat model configured from config.py (with config.GOOGLE_API_KEY unless another key is given)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # FIXED: Changed model_name to model (new langchain-google-genai version)
+    return ChatGoogleGenerativeAI(
+        model=config.GOOGLE_MODEL,
+        google_api_key=api_key or config.GOOGLE_API_KEY,
+        temperature=config.GENAI_TEMPERATURE,
+        max_output_tokens=config.GENAI_MAX_OUTPUT_TOKENS
+    )
+
+
+class ExtractionEngine:
+    """
+    The prompt | llm | parser chain, built once and shared by every request.
+
+    Building ChatGoogleGenerativeAI creates a new client (and a new connection
+    to the model endpoint), and the format instructions are rendered from the
+    EmployeeData schema; doing that per request was pure overhead. One engine
+    keeps one long-lived client per API key whose channel is reused across
+    calls, and every call goes through its LLMScheduler (quotas, retries).
+    """
+
+    def __init__(self, llm=None, strategy: Optional[str] = None, scheduler: Optional[LLMScheduler] = None):
+        """
+        Args:
+            llm: Chat model to use; defaults to one Gemini client per key in
+                config.GOOGLE_API_KEYS (tests and benchmarks pass a stub)
+            strategy: "single" or "sectioned"; defaults to config.LLM_EXTRACTION_STRATEGY
+            scheduler: Scheduler to call the model(s) through; defaults to one
+                configured from config around the model(s) above
+        """
+        from langchain.output_parsers import PydanticOutputParser
+        from langchain.prompts import PromptTemplate
+
+        self.strategy = strategy or config.LLM_EXTRACTION_STRATEGY
+        if self.strategy not in LLM_STRATEGIES:
+            raise ValueError(f"Unknown LLM extraction strategy '{self.strategy}'. Use one of: {', '.join(LLM_STRATEGIES)}.")
+        self.parser = PydanticOutputParser(pydantic_object=EmployeeData)
+        self.format_instructions = self.parser.get_format_instructions()
+        self.prompt = PromptTemplate(
+            template=config.CV_PROCESSING_PROMPT,
+            input_variables=["cv_text"],
+            partial_variables={"format_instructions": self.format_instructions}
+        )
+        self.prompt_tokens = estimate_tokens(self.prompt.format(cv_text=""))
+        if scheduler is None:
+            llms = [llm] if llm is not None else [build_llm(key) for key in config.GOOGLE_API_KEYS]
+            # Worker processes of serve.py draw on the same quota
+            scheduler = LLMScheduler(llms, shared_state=get_shared_state())
+        self.scheduler = scheduler
+        self.llm = scheduler.slots[0].llm
+        self.sections = {name: SectionChain(name) for name in SECTION_MODELS}
+        self.keys_configured = all(_has_api_key(slot.llm) for slot in scheduler.slots)
+        self.warmed_up = False
+
+    @property
+    def ready(self) -> bool:
+        """Able to serve: every model has an API key, or a warm-up call has gone through."""
+        return self.keys_configured or self.warmed_up
+
+    async def extract(self, cv_text: str) -> EmployeeData:
+        """Run the chain on CV text and return the parsed (raw) EmployeeData."""
+        if self.strategy == "sectioned":
+            return await self.extract_sectioned(cv_text)
+        # Model call and output parsing are timed separately
+        async def invoke(llm):
+            with stage_timer("llm"), in_flight("llm_calls"):
+                return await (self.prompt | llm).ainvoke({"cv_text": cv_text})
+        message = await self.scheduler.call(invoke, self.prompt_tokens + estimate_tokens(cv_text))
+        record_llm_usage(getattr(message, "usage_metadata", None))
+        with stage_timer("parse"):
+            return self.parser.invoke(message)
+
+    async def extract_streaming(self, cv_text: str, on_section: Callable[[str, dict], None]) -> EmployeeData:
+        """
+        Like extract, but streams the model output and calls on_section(name, fields)
+        as soon as each group of fields in SECTIONS is complete, before the rest
+        of the JSON has been generated. Returns the same parsed EmployeeData.
+        """
+        if self.strategy == "sectioned":
+            # Each section call finishes on its own already
+            return await self.extract_sectioned(cv_text, on_section)
+        # Shared across retries, so a retried call doesn't report sections twice
+        reported: Set[str] = set()
+
+        async def invoke(llm):
+            message = None
+            with stage_timer("llm"), in_flight("llm_calls"):
+                async for chunk in (self.prompt | llm).astream({"cv_text": cv_text}):
+                    message = chunk if message is None else message + chunk
+                    for name, fields in _completed_sections(_message_text(message), reported, final=False):
+                        reported.add(name)
+                        on_section(name, fields)
+            return message
+        message = await self.scheduler.call(invoke, self.prompt_tokens + estimate_tokens(cv_text))
+        if message is None:
+            raise ValueError("The model returned an empty response")
+        for name, fields in _completed_sections(_message_text(message), reported, final=True):
+            reported.add(name)
+            on_section(name, fields)
+        record_llm_usage(getattr(message, "usage_metadata", None))
+        with stage_timer("parse"):
+            return self.parser.invoke(message)
+
+    async def extract_sectioned(self, cv_text: str, on_section: Optional[Callable[[str, dict], None]] = None) -> EmployeeData:
+        """
+        Map-reduce extraction: one concurrent call per SectionChain, each with a
+        small sub-schema and output budget, merged into EmployeeData. Latency is
+        that of the slowest section rather than one long serial generation, and
+        a section whose JSON doesn't parse is retried alone.
+        """
+        with stage_timer("llm"):
+            tasks = [asyncio.ensure_future(self._extract_section(section, cv_text, on_section)) for section in self.sections.values()]
+            try:
+                parts = await asyncio.gather(*tasks)
+            except BaseException:
+                # One section failed for good: the others are of no use
+                for task in tasks:
+                    task.cancel()
+                raise
+        merged: dict = {}
+        for part in parts:
+            merged.update(part.model_dump())
+        return EmployeeData(**merged)
+
+    async def _extract_section(self, section: SectionChain, cv_text: str, on_section: Optional[Callable[[str, dict], None]]):
+        from langchain_core.exceptions import OutputParserException
+
+        max_output_tokens = section.max_output_tokens
+
+        async def invoke(llm):
+            with stage_timer(f"llm_{section.name}"), in_flight("llm_calls"):
+                return await section.llm_chain(llm, max_output_tokens).ainvoke({"cv_text": cv_text})
+        for attempt in range(config.LLM_SECTION_RETRIES + 1):
+            message = await self.scheduler.call(invoke, section.prompt_tokens + estimate_tokens(cv_text))
+            record_llm_usage(getattr(message, "usage_metadata", None))
+            try:
+                if _truncated(message):
+                    # The parser accepts cut-off JSON, so check before it drops the rest silently
+                    raise OutputParserException(f"Output stopped at the {max_output_tokens} token limit")
+                with stage_timer("parse"):
+                    result = section.parser.invoke(message)
+                break
+            except OutputParserException as e:
+                if _truncated(message):
+                    max_output_tokens = min(max_output_tokens * 2, config.GENAI_MAX_OUTPUT_TOKENS)
+                if attempt == config.LLM_SECTION_RETRIES:
+                    raise
+                LLM_SECTION_RETRIES.inc(section=section.name)
+                logger.warning(f"Retrying the {section.name} section, its output didn't parse: {str(e)[:200]}")
+        if on_section is not None:
+            fields = result.model_dump()
+            for name, group in SECTIONS.items():
+                if set(group) <= set(section.fields):
+                    on_section(name, {field: fields[field] for field in group})
+        return result
+
+    async def warm_up(self) -> bool:
+        """
+        Send one tiny request so the connection (TLS, channel setup) is open
+        before the first real CV arrives. Failure is logged, not raised.
+        """
+        started = time.perf_counter()
+        try:
+            # Every key has its own client and connection
+            await asyncio.gather(*(slot.llm.ainvoke("Reply with OK.") for slot in self.scheduler.slots))
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed: {str(e)}")
+            return False
+        self.warmed_up = True
+        logger.info(f"LLM warm-up done in {time.perf_counter() - started:.2f}s")
+        return True
+
+
+def _has_api_key(llm) -> bool:
+    """A non-empty google_api_key; stub models (tests, benchmarks) have none and need none."""
+    if not hasattr(llm, "google_api_key"):
+        return True
+    key = llm.google_api_key
+    if hasattr(key, "get_secret_value"):
+        key = key.get_secret_value()
+    return bool(key and key.strip())
+
+
+def _truncated(message) -> bool:
+    finish_reason = (getattr(message, "response_metadata", None) or {}).get("finish_reason")
+    return str(finish_reason).upper() in ("MAX_TOKENS", "LENGTH")
+
+
+def _message_text(message) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+
+
+def _completed_sections(text: str, reported: Set[str], final: bool):
+    """
+    (name, fields) for every not yet reported section whose fields are complete
+    in the partial JSON text. While streaming, the last key present may still
+    be growing, so a section counts as done once all its fields are complete
+    or the model has moved on to a field that comes after it in the schema.
+    """
+    from langchain_core.utils.json import parse_json_markdown
+
+    try:
+        partial = parse_json_markdown(text)
+    except ValueError:
+        return []
+    if not isinstance(partial, dict) or not partial:
+        return []
+    keys = list(partial)
+    complete = set(keys) if final else set(keys[:-1])
+    furthest = max(_FIELD_ORDER.get(key, -1) for key in keys)
+
+    done = []
+    for name, fields in SECTIONS.items():
+        if name in reported:
+            continue
+        present = [field for field in fields if field in complete]
+        moved_on = furthest > max(_FIELD_ORDER[field] for field in fields) and (set(fields) & complete) == set(fields) & set(keys)
+        if final or len(present) == len(fields) or (present and moved_on):
+            done.append((name, {field: partial[field] for field in present}))
+    return done
+
+
+_engine: Optional[ExtractionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> ExtractionEngine:
+    """Shared engine, built on first use if the startup warm-up has not built it yet."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ExtractionEngine()
+        return _engine
+
+
+async def load_engine() -> ExtractionEngine:
+    """get_engine for the event loop: building the engine (and importing langchain) runs in a thread."""
+    if _engine is not None:
+        return _engine
+    return await asyncio.to_thread(get_engine)
+
+
+def engine_strategy() -> str:
+    """LLM extraction strategy in use, without building the engine for it."""
+    return _engine.strategy if _engine is not None else config.LLM_EXTRACTION_STRATEGY
+
+
+def set_engine(engine: Optional[ExtractionEngine]) -> None:
+    """Install a specific engine (e.g. one built around a stub LLM), or None to reset."""
+    global _engine
+    _engine = engine
+
+
+def engine_ready() -> bool:
+    """The engine is built and able to call the model (see ExtractionEngine.ready); never builds it."""
+    return _engine is not None and _engine.ready
@@ -0,0 +1,154 @@
+"""
+Bulk export of stored candidates as JSONL or CSV, streamed chunk by chunk.
+
+Used by GET /api/candidates/export and as a CLI (from backend/):
+    python export.py --format csv --table skills --out skills.csv.gz
+    python export.py --format jsonl --after 1200 --limit 500 --out -
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from candidate_store import CandidateStore, get_candidate_store
+from schema import EmployeeData, Skill, WorkExperience
+
+EXPORT_FORMATS = ("jsonl", "csv")
+# "candidates" is one record per CV; the others flatten its lists into child rows keyed by candidate_id
+EXPORT_TABLES = ("candidates", "skills", "work_experience")
+EXPORT_MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv", "gzip": "application/gzip"}
+
+CHUNK_BYTES = 64 * 1024
+
+_CHILD_LISTS = ("allSkills", "workExperience")
+_CANDIDATE_FIELDS = [name for name in EmployeeData.model_fields if name not in _CHILD_LISTS]
+_COLUMNS = {
+    "candidates": ["id", "file_hash", "updated_at"] + _CANDIDATE_FIELDS,
+    "skills": ["candidate_id"] + list(Skill.model_fields),
+    "work_experience": ["candidate_id", "position_index"] + list(WorkExperience.model_fields),
+}
+
+
+def export_filename(fmt: str, table: str, gzip: bool) -> str:
+    return f"{table}.{fmt}" + (".gz" if gzip else "")
+
+
+def _rows(records: Iterable[Tuple[int, str, float, str]], table: str) -> Iterator[list]:
+    """Flat rows (in _COLUMNS order) of a table, from (id, file_hash, updated_at, payload) records."""
+    for candidate_id, file_hash, updated_at, payload in records:
+        data = json.loads(payload)
+        if table == "candidates":
+            yield [candidate_id, file_hash, updated_at] + [data.get(name) for name in _CANDIDATE_FIELDS]
+        elif table == "skills":
+            for skill in data.get("allSkills") or []:
+                yield [candidate_id] + [skill.get(name) for name in Skill.model_fields]
+        else:
+            for index, job in enumerate(data.get("workExperience") or []):
+                yield [candidate_id, index] + [job.get(name) for name in WorkExperience.model_fields]
+
+
+def _jsonl(records: Iterable[Tuple[int, str, float, str]], table: str) -> Iterator[str]:
+    if table == "candidates":
+        # The stored payload already is the record's JSON: splice it in without parsing it
+        for candidate_id, file_hash, updated_at, payload in records:
+            yield f'{{"id": {candidate_id}, "file_hash": "{file_hash}", "updated_at": {updated_at!r}, "data": {payload}}}\n'
+        return
+    columns = _COLUMNS[table]
+    for row in _rows(records, table):
+        yield json.dumps(dict(zip(columns, row))) + "\n"
+
+
+def _csv(records: Iterable[Tuple[int, str, float, str]], table: str) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_COLUMNS[table])
+    for row in _rows(records, table):
+        writer.writerow(["" if value is None else value for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[bytes]:
+    """Join small pieces of text into CHUNK_BYTES-sized byte chunks."""
+    pending: List[str] = []
+    size = 0
+    for piece in pieces:
+        pending.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield "".join(pending).encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(
+    store: CandidateStore,
+    fmt: str = "jsonl",
+    table: str = "candidates",
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    gzip: bool = False,
+) -> Iterator[bytes]:
+    """
+    Stored candidates (those with id > after_id, at most limit of them) as
+    JSONL or CSV bytes, gzip-compressed on the fly if asked. Records are read
+    from the store cursor a batch at a time and serialized as they come, so
+    memory doesn't grow with the size of the export.
+
+    Raises:
+        ValueError: Unknown format or table
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table '{table}'. Use one of: {', '.join(EXPORT_TABLES)}.")
+    records = store.iter_records(after_id, limit)
+    pieces = _jsonl(records, table) if fmt == "jsonl" else _csv(records, table)
+    chunks = _chunked(pieces)
+    return _gzipped(chunks) if gzip else chunks
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--table", choices=EXPORT_TABLES, default="candidates")
+    parser.add_argument("--after", type=int, default=0, help="Export candidates with an id above this cursor")
+    parser.add_argument("--limit", type=int, default=None, help="At most this many candidates")
+    parser.add_argument("--out", default="-", help="Output file ('-' = stdout); a .gz name is gzip-compressed")
+    parser.add_argument("--gzip", action="store_true", help="Compress even without a .gz name")
+    args = parser.parse_args(argv)
+
+    store = get_candidate_store()
+    if store is None:
+        raise SystemExit("The candidate store is disabled (CANDIDATE_STORE_ENABLED=false)")
+    gzip = args.gzip or args.out.endswith(".gz")
+    chunks = export_stream(store, args.format, args.table, args.after, args.limit, gzip)
+    out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    if args.limit:
+        cursor = store.next_cursor(args.after, args.limit)
+        print(f"Next cursor: {cursor}" if cursor is not None else "Last page exported", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,197 @@
-from docx import Document
+import posixpath
+import zipfile
 from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+from xml.etree.ElementTree import Element, iterparse
 
-def extract_from_doc(file_content: bytes) -> str:
+from file_parsing.time_limit import ExtractionTimeout
+import config
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# Run content with a text equivalent, as python-docx maps it (w:br only for line breaks)
+_RUN_TEXT = {W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+DOCX_EXTRACTORS = ("stream", "python-docx")
+
+
+def extract_from_doc(file_content: Union[bytes, BinaryIO], extractor: Optional[str] = None) -> str:
     """
     Extract text from DOCX file including paragraphs, tables, and lists.
-    
+
     Args:
-        file_content: DOCX file as bytes
-        
+        file_content: DOCX file as bytes, or a seekable binary file object
+        extractor: "stream" (default, config.DOCX_EXTRACTOR) or "python-docx"
+
     Returns:
         Extracted text as string
-        
+
+    Raises:
+        ValueError: If DOCX parsing fails
+    """
+    extractor = extractor or config.DOCX_EXTRACTOR
+    if extractor == "python-docx":
+        return extract_from_doc_python_docx(file_content)
+    if extractor != "stream":
+        raise ValueError(f"Unknown DOCX extractor '{extractor}'. Use one of: {', '.join(DOCX_EXTRACTORS)}.")
+    return extract_from_doc_stream(file_content)
+
+
+def extract_from_doc_stream(file_content: Union[bytes, BinaryIO]) -> str:
+    """
+    Extract text from a DOCX by stream-parsing its main document XML.
+
+    Paragraphs and table rows come out in document order, with the same
+    text python-docx gives for them. Parsed elements are dropped as soon as
+    they are read and images are never decompressed, so memory stays small
+    however large or image-heavy the file is.
+
     Raises:
         ValueError: If DOCX parsing fails
     """
     try:
-        doc = Document(BytesIO(file_content))
-        
+        stream = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+        with zipfile.ZipFile(stream) as package:
+            with package.open(_main_document_part(package)) as document_xml:
+                full_text = "\n\n".join(iter_docx_blocks(document_xml))
+        return full_text.strip()
+
+    except ExtractionTimeout:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error parsing DOCX: {str(e)}")
+
+
+def _main_document_part(package: zipfile.ZipFile) -> str:
+    """Zip member name of the main document (word/document.xml unless the package says otherwise)."""
+    try:
+        rels = package.read("_rels/.rels")
+    except KeyError:
+        return "word/document.xml"
+    for _, element in iterparse(BytesIO(rels)):
+        if element.tag == _PACKAGE_RELS and element.get("Type") == _OFFICE_DOCUMENT:
+            return posixpath.normpath(element.get("Target", "").lstrip("/"))
+    return "word/document.xml"
+
+
+def iter_docx_blocks(document_xml: BinaryIO) -> Iterator[str]:
+    """
+    Text blocks of a WordprocessingML document, in document order: each
+    non-empty body paragraph, and each table row with its non-empty cells
+    joined by " | ". Only body-level paragraphs and tables count, like
+    python-docx's doc.paragraphs and doc.tables.
+    """
+    # Element depths: w:document 1, w:body 2, body paragraphs and tables 3, table rows 4
+    path = []
+    body: Optional[Element] = None
+    table: Optional[Element] = None
+    cells_above: Dict[int, str] = {}  # grid column -> cell text of the previous row, for vertical merges
+    for event, element in iterparse(document_xml, events=("start", "end")):
+        if event == "start":
+            path.append(element)
+            if len(path) == 2 and element.tag == W + "body":
+                body = element
+            elif len(path) == 3 and element.tag == W + "tbl":
+                table, cells_above = element, {}
+            continue
+
+        depth = len(path)
+        path.pop()
+        if body is None:
+            continue
+        if depth == 4 and element.tag == W + "tr" and table is not None:
+            row_text = _row_text(element, cells_above)
+            if row_text:
+                yield row_text
+            element.clear()
+            table.remove(element)
+        elif depth == 3:
+            if element.tag == W + "p":
+                text = _paragraph_text(element).strip()
+                if text:
+                    yield text
+            table = None
+            element.clear()
+            body.remove(element)
+
+
+def _paragraph_text(paragraph: Element) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == W + "r":
+            _run_text(child, parts)
+        elif child.tag == W + "hyperlink":
+            for run in child.iterfind(W + "r"):
+                _run_text(run, parts)
+    return "".join(parts)
+
+
+def _run_text(run: Element, parts: list) -> None:
+    for child in run:
+        if child.tag == W + "t":
+            parts.append(child.text or "")
+        elif child.tag == W + "br":
+            if child.get(W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_TEXT.get(child.tag, ""))
+
+
+def _row_text(row: Element, cells_above: Dict[int, str]) -> str:
+    """
+    Non-empty cells of a table row joined by " | ", one cell per layout grid
+    column as python-docx's row.cells: a cell spanning columns repeats, and a
+    vertically merged continuation repeats the cell above.
+    """
+    properties = row.find(W + "trPr")
+    grid_before = properties.find(W + "gridBefore") if properties is not None else None
+    column = int(grid_before.get(W + "val", "0")) if grid_before is not None else 0
+    cells = []
+    for cell in row.iterfind(W + "tc"):
+        cell_properties = cell.find(W + "tcPr")
+        span, merge = 1, None
+        if cell_properties is not None:
+            grid_span = cell_properties.find(W + "gridSpan")
+            if grid_span is not None:
+                span = int(grid_span.get(W + "val", "1"))
+            vertical_merge = cell_properties.find(W + "vMerge")
+            if vertical_merge is not None:
+                merge = vertical_merge.get(W + "val", "continue")
+        if merge == "continue":
+            text = cells_above.get(column, "")
+        else:
+            text = "\n".join(_paragraph_text(paragraph) for paragraph in cell.iterfind(W + "p"))
+        for offset in range(span):
+            cells_above[column + offset] = text
+            cells.append(text.strip())
+        column += span
+    return " | ".join(text for text in cells if text)
+
+
+def extract_from_doc_python_docx(file_content: Union[bytes, BinaryIO]) -> str:
+    """
+    Extract text from a DOCX with python-docx: body paragraphs first, then
+    table rows. Loads the whole document into memory.
+
+    Raises:
+        ValueError: If DOCX parsing fails
+    """
+    from docx import Document
+
+    try:
+        stream = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+        doc = Document(stream)
+
         all_text = []
-        
+
         # Extract paragraphs (including bullet points)
         for para in doc.paragraphs:
             text = para.text.strip()
             if text:
                 all_text.append(text)
-        
+
         # IMPORTANT: Extract tables (skills often in tables!)
         for table in doc.tables:
             for row in table.rows:
@@ -36,13 +203,12 @@ def extract_from_doc(file_content: bytes) -> str:
                 if row_text:
                     # Join cells with space or comma
                     all_text.append(" | ".join(row_text))
-        
+
         # Join all extracted text with double line breaks
         full_text = "\n\n".join(all_text)
         return full_text.strip()
-        
+
+    except ExtractionTimeout:
+        raise
     except Exception as e:
         raise ValueError(f"Error parsing DOCX: {str(e)}")
-
-
-
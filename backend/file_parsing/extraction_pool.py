@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from file_parsing.pdf_parse import extract_pdf_page_range, get_pdf_backend, join_pdf_pages
+from file_parsing.doc_parse import extract_from_doc
+from file_parsing.time_limit import ExtractionTimeout, time_limit
+from logs import configure_worker_logging
+from metrics import INPUT_PAGES
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionPool:
+    """
+    Runs text extraction in a dedicated ProcessPoolExecutor.
+
+    PyPDF2's extract_text is pure Python and holds the GIL, so running it on
+    the default thread pool serializes it with every other request. Here each
+    document goes to worker processes instead, and PDFs longer than
+    pages_per_chunk are split into page ranges extracted in parallel and
+    reassembled in order. Only the first max_pages pages are extracted, and
+    when the first chunk alone fills max_chars the rest are never scheduled.
+
+    Time limits:
+        page_timeout: enforced inside the worker, a slow page is skipped
+        document_timeout: the whole document fails with ValueError. A DOCX has
+            no pages to skip, so the worker itself stops at this limit too and
+            is free for the next document, not held by a pathological file
+    """
+
+    def __init__(
+        self,
+        workers: int = config.EXTRACTION_PROCESS_WORKERS,
+        pages_per_chunk: int = config.PDF_PAGES_PER_CHUNK,
+        page_timeout: float = config.PDF_PAGE_TIMEOUT_SECONDS,
+        document_timeout: float = config.EXTRACTION_DOCUMENT_TIMEOUT_SECONDS,
+        backend: str = config.PDF_BACKEND,
+        max_pages: int = config.PDF_MAX_PAGES,
+        max_chars: int = config.PDF_MAX_CHARS,
+    ):
+        self.workers = workers
+        self.pages_per_chunk = max(1, pages_per_chunk)
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.backend = get_pdf_backend(backend).name
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=configure_worker_logging)
+        self._lock = threading.Lock()
+        self._stats = {"documents": 0, "pages": 0, "bytes": 0, "seconds": 0.0, "timeouts": 0, "errors": 0}
+
+    async def extract(self, file_content: bytes, file_ext: str) -> str:
+        """Extract text from a PDF/DOCX, same contract as extract_from_pdf / extract_from_doc."""
+        started = time.perf_counter()
+        try:
+            if file_ext == ".pdf":
+                text, pages = await asyncio.wait_for(self._extract_pdf(file_content), self.document_timeout)
+            else:
+                loop = asyncio.get_running_loop()
+                text = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, extract_doc_within, file_content, self.document_timeout),
+                    self.document_timeout,
+                )
+                pages = 0
+        except (asyncio.TimeoutError, ExtractionTimeout):
+            self._record(errors=1, timeouts=1)
+            raise ValueError(f"Document extraction took longer than {self.document_timeout}s")
+        except Exception:
+            self._record(errors=1)
+            raise
+
+        if pages:
+            INPUT_PAGES.observe(pages)
+        self._record(documents=1, pages=pages, bytes=len(file_content), seconds=time.perf_counter() - started)
+        return text
+
+    async def _extract_pdf(self, file_content: bytes) -> tuple:
+        loop = asyncio.get_running_loop()
+
+        # The first chunk also tells us the page count; short CVs are done after it
+        page_count, first = await loop.run_in_executor(
+            self._executor, extract_pdf_page_range, file_content, 0, self._chunk_stop(0), self.page_timeout, self.backend, self.max_chars
+        )
+        last = min(page_count, self.max_pages) if self.max_pages else page_count
+        first_chars = sum(len(text) for text in first)
+        if self.max_chars and first_chars >= self.max_chars:
+            last = 0
+        elif self.max_chars and first_chars:
+            # Pages after the character budget would be thrown away: estimate where it
+            # runs out from the first chunk's text per page, with a chunk of slack
+            needed = -(-self.max_chars * len(first) // first_chars)
+            last = min(last, needed + self.pages_per_chunk)
+        chunks = [
+            loop.run_in_executor(
+                self._executor, extract_pdf_page_range, file_content, start, self._chunk_stop(start), self.page_timeout, self.backend
+            )
+            for start in range(self.pages_per_chunk, last, self.pages_per_chunk)
+        ]
+        try:
+            rest = await asyncio.gather(*chunks)
+        except BaseException:
+            # Timed out or failed: don't leave queued chunks behind for the workers
+            for chunk in chunks:
+                chunk.cancel()
+            raise
+
+        texts = list(first)
+        for _, chunk_texts in rest:
+            texts.extend(chunk_texts)
+        return join_pdf_pages(texts, self.max_chars), len(texts)
+
+    def _chunk_stop(self, start: int) -> int:
+        stop = start + self.pages_per_chunk
+        return min(stop, self.max_pages) if self.max_pages else stop
+
+    def _record(self, **deltas) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def stats(self) -> dict:
+        """
+        Throughput counters, to size the pool against the machine's cores.
+
+        Rates are per document in flight (totals divided by summed extraction
+        time); multiply by the number of busy workers for the pool's capacity.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        seconds = stats["seconds"]
+        stats["seconds"] = round(seconds, 3)
+        stats["avg_document_ms"] = round(seconds * 1000 / stats["documents"], 2) if stats["documents"] else 0.0
+        stats["workers"] = self.workers
+        stats["pdf_backend"] = self.backend
+        stats["cpu_count"] = os.cpu_count()
+        stats["documents_per_second"] = round(stats["documents"] / seconds, 2) if seconds else 0.0
+        stats["pages_per_second"] = round(stats["pages"] / seconds, 2) if seconds else 0.0
+        stats["mb_per_second"] = round(stats["bytes"] / (1024 * 1024) / seconds, 3) if seconds else 0.0
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_doc_within(file_content: bytes, seconds: Optional[float]) -> str:
+    """extract_from_doc in a pool worker, stopped with ExtractionTimeout after seconds."""
+    with time_limit(seconds):
+        return extract_from_doc(file_content)
+
+
+_extraction_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Shared pool, or None when EXTRACTION_PROCESS_WORKERS is 0 (extract on the default thread pool)."""
+    global _extraction_pool
+    if config.EXTRACTION_PROCESS_WORKERS <= 0:
+        return None
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool()
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
+        _extraction_pool = None
@@ -1,29 +1,279 @@
-import PyPDF2
+import importlib.util
 import logging  # FIXED: Changed from 'import logger' to 'import logging'
-from io import BytesIO #this helps prevent saving to disk thus immune to local storage changes
+from io import BytesIO, StringIO #this helps prevent saving to disk thus immune to local storage changes
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from file_parsing.time_limit import ExtractionTimeout, time_limit
+import config
 
 # Create logger instance
 logger = logging.getLogger(__name__)
 
-def extract_from_pdf(file_content:bytes)->str:
+def _as_stream(file_content: Union[bytes, BinaryIO]) -> BinaryIO:
+    #creating a file-object from bytes; an upload's spooled file is read in place
+    return BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+
+
+class PdfDocument:
+    """An opened PDF: its page count and a lazy iterator over page texts."""
+
+    page_count: int = 0
+
+    def iter_pages(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PdfBackend:
+    """
+    A PDF text extraction engine. Backends other than PyPDF2 are optional
+    dependencies, imported only when opened and listed by available_pdf_backends()
+    when installed.
+    """
+
+    name = ""
+    module = ""
+
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    def open(self, file_content: Union[bytes, BinaryIO]) -> PdfDocument:
+        raise NotImplementedError
+
+
+class _PyPDF2Document(PdfDocument):
+    def __init__(self, file_content):
+        import PyPDF2
+        self._reader = PyPDF2.PdfReader(_as_stream(file_content))
+        self.page_count = len(self._reader.pages)
+
+    def iter_pages(self, start=0, stop=None):
+        for page_num in range(start, self.page_count if stop is None else min(stop, self.page_count)):
+            yield self._reader.pages[page_num].extract_text()
+
+
+class PyPDF2Backend(PdfBackend):
+    """Pure Python, always installed. The slowest of the three, and holds the GIL."""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, file_content):
+        return _PyPDF2Document(file_content)
+
+
+class _PdfiumDocument(PdfDocument):
+    def __init__(self, file_content):
+        import pypdfium2
+        self._pdf = pypdfium2.PdfDocument(file_content)
+        self.page_count = len(self._pdf)
+
+    def iter_pages(self, start=0, stop=None):
+        for page_num in range(start, self.page_count if stop is None else min(stop, self.page_count)):
+            page = self._pdf[page_num]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+
+    def close(self):
+        self._pdf.close()
+
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2: bindings to Chrome's PDFium, in C++ and much faster than PyPDF2."""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def open(self, file_content):
+        return _PdfiumDocument(file_content)
+
+
+class _PdfminerDocument(PdfDocument):
+    def __init__(self, file_content):
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdftypes import resolve1
+        self._document = PDFDocument(PDFParser(_as_stream(file_content)))
+        self.page_count = int(resolve1(self._document.catalog["Pages"])["Count"])
+
+    def iter_pages(self, start=0, stop=None):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        resources = PDFResourceManager()
+        output = StringIO()
+        device = TextConverter(resources, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(resources, device)
+        try:
+            # create_pages walks the page tree lazily, so pages after stop are never parsed
+            for page in islice(PDFPage.create_pages(self._document), start, stop):
+                interpreter.process_page(page)
+                yield output.getvalue().rstrip("\f")
+                output.seek(0)
+                output.truncate()
+        finally:
+            device.close()
+
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six: pure Python like PyPDF2, slower, but with better layout analysis (reading order, columns)."""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, file_content):
+        return _PdfminerDocument(file_content)
+
+
+PDF_BACKENDS: Dict[str, PdfBackend] = {backend.name: backend for backend in (PyPDF2Backend(), PdfiumBackend(), PdfminerBackend())}
+
+
+def available_pdf_backends() -> List[str]:
+    return [name for name, backend in PDF_BACKENDS.items() if backend.available()]
+
+
+def get_pdf_backend(name: Optional[str] = None) -> PdfBackend:
+    """
+    PDF backend by name (default: config.PDF_BACKEND). "auto" picks the first
+    installed of pypdfium2, pypdf2.
+
+    Raises:
+        ValueError: Unknown backend, or it isn't installed
+    """
+    name = (name or config.PDF_BACKEND).lower()
+    if name == "auto":
+        name = "pypdfium2" if PDF_BACKENDS["pypdfium2"].available() else "pypdf2"
+    backend = PDF_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown PDF backend '{name}'. Use one of: auto, {', '.join(PDF_BACKENDS)}.")
+    if not backend.available():
+        raise ValueError(f"PDF backend '{name}' needs the {backend.module} package, which isn't installed")
+    return backend
+
+
+def iter_pdf_pages(
+    document: PdfDocument,
+    start: int = 0,
+    stop: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    max_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield page texts of pages [start, stop) one at a time, each within
+    page_timeout seconds (a slow page is skipped as empty text). Stops early,
+    trimming the last page, once max_chars characters have been yielded.
+    """
+    pages = document.iter_pages(start, stop)
+    page_num = start
+    chars = 0
+    while True:
+        try:
+            with time_limit(page_timeout):
+                page_text = next(pages, None)
+        except ExtractionTimeout:
+            logger.warning(f"Page {page_num} took longer than {page_timeout}s, skipped")
+            # A generator that raised is finished: carry on from the next page
+            pages = document.iter_pages(page_num + 1, stop)
+            page_text = ""
+        else:
+            if page_text is None:
+                return
+        if not page_text:
+            logger.warning(f"No text on page {page_num}")
+            page_text = ""
+        if max_chars and chars + len(page_text) >= max_chars:
+            logger.info(f"Stopped at page {page_num}: reached the {max_chars} character budget")
+            yield page_text[:max_chars - chars]
+            return
+        chars += len(page_text)
+        yield page_text
+        page_num += 1
+
+def extract_pdf_page_range(
+    file_content: bytes,
+    start: int,
+    stop: Optional[int],
+    page_timeout: Optional[float] = None,
+    backend: Optional[str] = None,
+    max_chars: Optional[int] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Extract the text of pages [start, stop) of a PDF.
+
+    Runs inside extraction pool workers, so large PDFs can be split across
+    processes. A page that exceeds page_timeout seconds is skipped (empty text).
+
+    Args:
+        file_content: PDF file as bytes
+        start: First page index
+        stop: Page index to stop before (None for the last page)
+        page_timeout: Per-page time budget in seconds (None for no limit)
+        backend: PDF backend name (None for config.PDF_BACKEND)
+        max_chars: Stop once the range has this many characters (None for no limit)
+
+    Returns:
+        (total page count, list of page texts for the range)
+
+    Raises:
+        ValueError: If PDF parsing fails
+    """
+    pdf_backend = get_pdf_backend(backend)
     try:
-        #creating a file-object from bytes
-        pdf=BytesIO(file_content)
-        
-        #initialise reader
-        reader=PyPDF2.PdfReader(pdf)
-        
-        #Text extraction
-        text=[]
-        for page_num,page in enumerate(reader.pages):
-            page_text=page.extract_text()
-            if not page_text:
-                logger.warning(f"No text on page {page_num}")
-            text.append(page_text)
-        
+        with time_limit(page_timeout):
+            document = pdf_backend.open(file_content)
+        try:
+            return document.page_count, list(iter_pdf_pages(document, start, stop, page_timeout, max_chars))
+        finally:
+            document.close()
+
+    except ExtractionTimeout:
+        raise ValueError(f"Error parsing PDF: reading the document took longer than {page_timeout}s")
+    except Exception as e:
+        raise ValueError(f"Error parsing PDF: {str(e)}")
+
+def join_pdf_pages(texts: List[str], max_chars: Optional[int] = None) -> str:
+    """Combine page texts the same way extract_from_pdf does, cut at max_chars if given."""
+    full_text = "\n\n".join(texts) #double line break so the LLM can distinguish between sections better
+    if max_chars:
+        full_text = full_text[:max_chars]
+    return full_text.strip() #removing leading/trailing whitespace
+
+def extract_from_pdf(
+    file_content: Union[bytes, BinaryIO],
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """
+    Extract the text of a PDF, page by page, stopping early after max_pages
+    pages or max_chars characters (defaults: config.PDF_MAX_PAGES and
+    config.PDF_MAX_CHARS, 0 for no limit).
+
+    Raises:
+        ValueError: If PDF parsing fails
+    """
+    max_pages = config.PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = config.PDF_MAX_CHARS if max_chars is None else max_chars
+    pdf_backend = get_pdf_backend(backend)
+    try:
+        document = pdf_backend.open(file_content)
+        try:
+            texts = list(iter_pdf_pages(document, 0, max_pages or None, max_chars=max_chars))
+        finally:
+            document.close()
+        if max_pages and document.page_count > max_pages:
+            logger.info(f"Extracted the first {max_pages} of {document.page_count} pages")
+
         #combining all text
-        full_text="\n\n".join(text) #double line break so the LLM can distinguish between sections better
-        return full_text.strip() #removing leading/trailing whitespace
-    
+        return join_pdf_pages(texts, max_chars)
+
     except Exception as e:
-        raise ValueError(f"Error parsing PDF: {str(e)}")  # FIXED: Changed str{e} to {str(e)}
\ No newline at end of file
+        raise ValueError(f"Error parsing PDF: {str(e)}")  # FIXED: Changed str{e} to {str(e)}
@@ -0,0 +1,36 @@
+import signal
+from contextlib import contextmanager
+from typing import Optional
+
+
+class ExtractionTimeout(Exception):
+    """Raised when extracting a page or a document takes longer than its time budget."""
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """
+    Raise ExtractionTimeout if the block runs longer than seconds.
+
+    Uses SIGALRM, so it only works in a process's main thread on Unix (which is
+    where ProcessPoolExecutor workers run tasks); elsewhere it is a no-op.
+    """
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+    try:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    except ValueError:
+        # Not the main thread
+        yield
+        return
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
@@ -0,0 +1,408 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from cv_process import cv_processing
+from logs import set_request_id
+from metrics import IN_FLIGHT
+from shared_state import pid_alive
+import config
+
+logger = logging.getLogger(__name__)
+
+# How often a long-poll checks the store for a job another worker process is running
+STORE_POLL_SECONDS = 0.5
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised by JobManager.submit when the queue is at its maximum depth."""
+
+
+@dataclass
+class Job:
+    id: str
+    filename: str
+    file_ext: str
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    # Not exposed: file bytes until a worker picks the job up, and the running task
+    content: Optional[bytes] = field(default=None, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    done_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        queue_seconds = None
+        run_seconds = None
+        if self.started_at is not None:
+            queue_seconds = round(self.started_at - self.submitted_at, 3)
+            if self.finished_at is not None:
+                run_seconds = round(self.finished_at - self.started_at, 3)
+        elif self.finished_at is not None:
+            queue_seconds = round(self.finished_at - self.submitted_at, 3)
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": queue_seconds,
+            "run_seconds": run_seconds,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class _JobStore:
+    """
+    SQLite persistence so queued jobs survive a restart. Several worker
+    processes (serve.py) can share it: each job records the pid of the
+    process that queued it, and only jobs of processes that are gone are
+    taken over on start.
+    """
+
+    def __init__(self, db_path: str):
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                file_ext TEXT NOT NULL,
+                status TEXT NOT NULL,
+                content BLOB,
+                result TEXT,
+                error TEXT,
+                submitted_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner INTEGER
+            )"""
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, submitted_at)")
+
+    def insert(self, job: Job) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, filename, file_ext, status, content, submitted_at, owner) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.filename, job.file_ext, job.status, job.content, job.submitted_at, os.getpid()),
+            )
+
+    def update(self, job: Job) -> None:
+        # File bytes are dropped once a job has finished. A job cancelled through
+        # another worker process stays cancelled when its own worker finishes it
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, started_at = ?, finished_at = ?, "
+                "content = CASE WHEN ? THEN NULL ELSE content END WHERE id = ? AND status != ?",
+                (
+                    job.status,
+                    json.dumps(job.result) if job.result is not None else None,
+                    job.error,
+                    job.started_at,
+                    job.finished_at,
+                    job.status in FINISHED_STATES,
+                    job.id,
+                    CANCELLED,
+                ),
+            )
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, filename, file_ext, status, result, error, submitted_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = Job(
+            id=row[0], filename=row[1], file_ext=row[2], status=row[3],
+            result=json.loads(row[4]) if row[4] else None, error=row[5],
+            submitted_at=row[6], started_at=row[7], finished_at=row[8],
+        )
+        if job.status in FINISHED_STATES:
+            job.done_event.set()
+        return job
+
+    def status(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def claim_unfinished(self) -> List[Job]:
+        """
+        Jobs that were queued or running in a process that has stopped, oldest
+        first, now owned by this one. Jobs of live worker processes are left alone.
+        """
+        pid = os.getpid()
+        claimed = []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, filename, file_ext, content, submitted_at, owner FROM jobs "
+                "WHERE status IN (?, ?) ORDER BY submitted_at",
+                (QUEUED, RUNNING),
+            ).fetchall()
+            for job_id, filename, file_ext, content, submitted_at, owner in rows:
+                if owner is not None and owner != pid and pid_alive(owner):
+                    continue
+                # Only one of several restarting workers wins each job
+                cur = self._db.execute("UPDATE jobs SET owner = ? WHERE id = ? AND owner IS ?", (pid, job_id, owner))
+                if cur.rowcount:
+                    claimed.append(Job(id=job_id, filename=filename, file_ext=file_ext, content=content, submitted_at=submitted_at))
+        return claimed
+
+    def purge(self, older_than: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                (*FINISHED_STATES, older_than),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class JobManager:
+    """
+    In-process job queue drained by a fixed pool of worker tasks.
+
+    submit() returns immediately with a queued Job; workers run cv_processing
+    and store the result on the job. The queue is bounded: once max_depth jobs
+    are waiting, submit() raises QueueFullError (the API maps it to 429).
+    With a db_path, jobs are also written to SQLite and unfinished ones are
+    re-queued on the next start; worker processes sharing the file see each
+    other's jobs (status, long-poll, cancel) but each runs the ones it queued.
+
+    Once drain_deadline is set (serve.py, on SIGTERM) no new job is started,
+    and stop() lets running ones finish until then.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.JOB_WORKERS,
+        max_depth: int = config.JOB_MAX_QUEUE_DEPTH,
+        db_path: Optional[str] = config.JOB_QUEUE_DB_PATH,
+        result_ttl_seconds: int = config.JOB_RESULT_TTL_SECONDS,
+    ):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl_seconds = result_ttl_seconds
+        self._store = _JobStore(db_path) if db_path else None
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        # Queued jobs not yet cancelled; cancelled ones stay in _queue until a worker skips them
+        self._pending = 0
+        self._worker_tasks: List[asyncio.Task] = []
+        # time.monotonic() by which running jobs must be done when shutting down
+        self.drain_deadline: Optional[float] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._pending = 0
+        self._stopping = False
+        if self._store is not None:
+            recovered = await asyncio.to_thread(self._store.claim_unfinished)
+            for job in recovered:
+                job.status = QUEUED
+                self._jobs[job.id] = job
+                self._queue.put_nowait(job)
+            self._pending = len(recovered)
+            if recovered:
+                logger.info(f"Re-queued {len(recovered)} unfinished jobs")
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers. Jobs still running after drain_deadline (or at once without one) are cancelled and re-queued on the next start."""
+        running = [job.task for job in self._jobs.values() if job.task is not None]
+        if running and self.drain_deadline is not None:
+            timeout = self.drain_deadline - time.monotonic()
+            if timeout > 0:
+                logger.info(f"Waiting up to {timeout:.0f}s for {len(running)} running jobs")
+                await asyncio.wait(running, timeout=timeout)
+        self._stopping = True
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._store is not None:
+            self._store.close()
+
+    def _update_depth_gauge(self) -> None:
+        IN_FLIGHT.set(self.depth, what="queued_jobs")
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker (cancelled ones still in the queue don't count)."""
+        return self._pending
+
+    async def submit(self, file_content: bytes, filename: str, file_ext: str) -> Job:
+        if self.depth >= self.max_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting)")
+
+        job = Job(id=uuid.uuid4().hex, filename=filename, file_ext=file_ext, content=file_content)
+        if self._store is not None:
+            await asyncio.to_thread(self._store.insert, job)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._pending += 1
+        self._update_depth_gauge()
+        await self._prune()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = await asyncio.to_thread(self._store.load, job_id)
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Long-poll: return the job once it has finished or after timeout seconds."""
+        job = await self.get(job_id)
+        if job is None or job.status in FINISHED_STATES or timeout <= 0:
+            return job
+        if job_id not in self._jobs:
+            return await self._poll_store(job, timeout)
+        try:
+            await asyncio.wait_for(job.done_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _poll_store(self, job: Job, timeout: float) -> Job:
+        """Long-poll on a job another worker process is running: no event to wait on, so re-read it."""
+        deadline = time.monotonic() + timeout
+        while job.status not in FINISHED_STATES and time.monotonic() < deadline:
+            await asyncio.sleep(min(STORE_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+            job = await asyncio.to_thread(self._store.load, job.id) or job
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        job = await self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        if job.status == RUNNING and job.task is not None:
+            job.task.cancel()
+        # Queued jobs stay in the queue; workers skip them, and they stop counting towards max_depth now
+        if job.status == QUEUED and job_id in self._jobs:
+            self._pending -= 1
+            self._update_depth_gauge()
+        await self._finish(job, CANCELLED)
+        return job
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.status == QUEUED:
+                self._pending -= 1
+            self._update_depth_gauge()
+            try:
+                # Draining: leave it queued (it is persisted) for the next start
+                if job.status != QUEUED or self.drain_deadline is not None:
+                    continue
+                if self._store is not None and await asyncio.to_thread(self._store.status, job.id) == CANCELLED:
+                    # Cancelled through another worker process
+                    job.status = CANCELLED
+                    job.done_event.set()
+                    continue
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        IN_FLIGHT.inc(what="running_jobs")
+        try:
+            await self._execute(job)
+        finally:
+            IN_FLIGHT.dec(what="running_jobs")
+
+    async def _execute(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        if self._store is not None:
+            await asyncio.to_thread(self._store.update, job)
+
+        content, job.content = job.content, None
+        if job.status == CANCELLED:
+            # Cancelled while RUNNING was being stored: cancel() found no task to stop,
+            # and the RUNNING write may have landed after its CANCELLED one
+            if self._store is not None:
+                await asyncio.to_thread(self._store.update, job)
+            return
+        # Log records of the job carry its id, the way request records carry the request's
+        set_request_id(job.id)
+        job.task = asyncio.create_task(cv_processing(content, job.file_ext))
+        try:
+            result = await job.task
+        except asyncio.CancelledError:
+            # A job cancelled just before stop() must not swallow the worker's own cancellation
+            if job.status != CANCELLED or self._stopping:
+                # The worker itself is being stopped; leave the job for the next start
+                job.task.cancel()
+                raise
+            return
+        except Exception as e:
+            job.error = str(e)
+            await self._finish(job, FAILED)
+            logger.warning(f"Job {job.id} ({job.filename}) failed: {str(e)}")
+            return
+        finally:
+            job.task = None
+        job.result = result
+        await self._finish(job, DONE)
+
+    async def _finish(self, job: Job, status: str) -> None:
+        # Set before the first await: a cancelled job's task checks it when the cancellation lands
+        job.status = status
+        job.finished_at = time.time()
+        job.done_event.set()
+        if self._store is not None:
+            await asyncio.to_thread(self._store.update, job)
+
+    async def _prune(self) -> None:
+        """Forget finished jobs older than the result TTL."""
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired and self._store is not None:
+            await asyncio.to_thread(self._store.purge, cutoff)
+
+
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Shared job manager for the app (started from the FastAPI lifespan)."""
+    global _job_manager
+    if _job_manager is None:
+        # Read now, not when this module was imported: serve.py may set it in between
+        _job_manager = JobManager(db_path=config.JOB_QUEUE_DB_PATH)
+    return _job_manager
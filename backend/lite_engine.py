@@ -0,0 +1,253 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from schema import EmployeeData, Skill, WorkExperience
+from segmenter import EMAIL_RE, PHONE_RE, SegmentedCV, classify_heading, segment_cv
+from skill_matcher import trie_regex
+from taxonomy import SkillTaxonomy, compact_skill, get_skill_taxonomy
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH_NAME = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = (
+    r"(?:" + _MONTH_NAME + r"\s*,?\s*'?\d{2,4}"   # Jan 2020, January, 2020, Jan '20
+    r"|\d{1,2}[/.\-]\d{4}"                         # 01/2020
+    r"|\d{4}[/.\-]\d{1,2}(?:[/.\-]\d{1,2})?"       # 2020-01, 2020-01-15
+    r"|(?:19|20)\d{2})"                            # 2020
+)
+_END = _DATE + r"|present|current|ongoing|now|till date|to date"
+DATE_RANGE_RE = re.compile(
+    r"(?<![\w/.\-])(?P<start>" + _DATE + r")\s*(?:-|–|—|to|till|until)\s*(?P<end>" + _END + r")(?![\w/])",
+    re.IGNORECASE,
+)
+DOB_RE = re.compile(r"\b(?:dob|d\.o\.b\.?|date of birth)\s*[:\-]?\s*(?P<date>\d{1,2}[/.\-]\d{1,2}[/.\-]\d{2,4}|\d{4}-\d{2}-\d{2}|\d{1,2}\s+" + _MONTH_NAME + r"\s+\d{4})", re.IGNORECASE)
+_NAME_LINE = re.compile(r"^[A-Za-z][A-Za-z.'\- ]{1,60}$")
+_SEPARATORS = re.compile(r"\s*(?:\||•|·|,|\s-\s|\s–\s|\s—\s)\s*")
+_PRESENT = ("present", "current", "ongoing", "now", "till date", "to date")
+
+DESCRIPTION_MAX_CHARS = 500
+EDUCATION_MAX_CHARS = 400
+
+
+def to_iso_date(text: str) -> Optional[str]:
+    """'Jan 2020' / '01/2020' / '2020-01' / '2020' -> 'YYYY-MM-DD' (first of month), 'Present' kept."""
+    value = text.strip().lower().rstrip(".")
+    if value in _PRESENT:
+        return "Present"
+    match = re.match(r"^([a-z]+)\.?\s*,?\s*'?(\d{2,4})$", value)
+    if match and match.group(1)[:3] in _MONTHS:
+        year = int(match.group(2))
+        year = year + 2000 if year < 100 else year
+        return f"{year:04d}-{_MONTHS[match.group(1)[:3]]:02d}-01"
+    match = re.match(r"^(\d{1,2})[/.\-](\d{4})$", value)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return f"{match.group(2)}-{int(match.group(1)):02d}-01"
+    match = re.match(r"^(\d{4})[/.\-](\d{1,2})(?:[/.\-](\d{1,2}))?$", value)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return f"{match.group(1)}-{int(match.group(2)):02d}-{int(match.group(3) or 1):02d}"
+    if re.match(r"^(19|20)\d{2}$", value):
+        return f"{value}-01-01"
+    return None
+
+
+def describe_duration(start: str, end: str) -> str:
+    """Human readable duration between two ISO dates ('Present' = today)."""
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d")
+        end_date = datetime.now() if end == "Present" else datetime.strptime(end, "%Y-%m-%d")
+    except ValueError:
+        return ""
+    months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month
+    if months < 0:
+        return ""
+    years, months = divmod(months, 12)
+    parts = []
+    if years:
+        parts.append(f"{years} year{'s' if years != 1 else ''}")
+    if months or not years:
+        parts.append(f"{months} month{'s' if months != 1 else ''}")
+    return " ".join(parts)
+
+
+class _SkillScanner:
+    """Finds every taxonomy skill (names and aliases) in CV text in one regex pass."""
+
+    def __init__(self, taxonomy: SkillTaxonomy):
+        self.taxonomy = taxonomy
+        self._canonical = taxonomy.surface_forms()
+        # Separator-free spellings too ("ReactJS" for react.js, "NodeJS" for node.js)
+        for form, key in list(self._canonical.items()):
+            self._canonical.setdefault(compact_skill(form), key)
+        forms = sorted(self._canonical)
+        # Longest form wins at a position; it may carry a version ("Python3", "Java 8")
+        # but can't be glued to a word or to '+'/'#'
+        self._regex = re.compile(
+            r"(?<![\w+#])(" + trie_regex(forms) + r")(?:\s?v?\d+(?:\.\d+)*)?(?![\w+#])", re.IGNORECASE
+        ) if forms else None
+
+    def scan(self, text: str) -> List[Skill]:
+        if self._regex is None:
+            return []
+        found: Dict[str, List] = {}  # canonical key -> [display name, mentions]
+        for match in self._regex.finditer(text):
+            surface = match.group(1)
+            if len(surface) == 1:
+                # Single letters ("C", "R") only as standalone words, like the recount rules
+                before = text[match.start() - 1] if match.start() > 0 else " "
+                after = text[match.end()] if match.end() < len(text) else " "
+                if not before.isspace() or not (after.isspace() or after in ".,;"):
+                    continue
+            key = self._canonical[surface.lower()]
+            entry = found.get(key)
+            if entry is None:
+                found[key] = [surface, 1]
+            else:
+                entry[1] += 1
+        return [Skill(name=name, mentions=mentions, category="technical") for name, mentions in found.values()]
+
+
+@lru_cache(maxsize=4)
+def _scanner_for(taxonomy: SkillTaxonomy) -> _SkillScanner:
+    # Keyed by the taxonomy instance, so a hot-reloaded taxonomy gets a fresh scanner
+    return _SkillScanner(taxonomy)
+
+
+def scan_skills(text: str) -> List[Skill]:
+    """Every skill of the current taxonomy mentioned in free text, with mention counts."""
+    return _scanner_for(get_skill_taxonomy()).scan(text)
+
+
+class LiteEngine:
+    """
+    Deterministic, LLM-free extraction into the same raw EmployeeData the LLM
+    engine returns, in a few milliseconds per CV.
+
+    Contact details come from the segmenter's regexes, skills from one pass of
+    the skill taxonomy over the text, and work experience from date-range lines
+    ("Acme Corp | Engineer | Jan 2020 - Present") in the experience section.
+    Output is coarser than the model's: positions and companies are split
+    heuristically and descriptions are the lines under each entry.
+    """
+
+    ready = True
+
+    async def extract(self, cv_text: str, segmented: Optional[SegmentedCV] = None) -> EmployeeData:
+        return self.extract_sync(cv_text, segmented)
+
+    def extract_sync(self, cv_text: str, segmented: Optional[SegmentedCV] = None) -> EmployeeData:
+        if segmented is None:
+            segmented = segment_cv(cv_text)
+        taxonomy = get_skill_taxonomy()
+        skills = _scanner_for(taxonomy).scan(cv_text)
+        jobs = self._work_experience(segmented)
+
+        return EmployeeData(
+            **self.contact_fields(cv_text, segmented),
+            designation=jobs[0].position if jobs else "",
+            allSkills=skills,
+            workExperience=jobs,
+            education=self._education(segmented),
+        )
+
+    def contact_fields(self, cv_text: str, segmented: SegmentedCV) -> Dict[str, str]:
+        """fullName, dob, contact and email only; well under a millisecond."""
+        dob = ""
+        dob_match = DOB_RE.search(cv_text)
+        if dob_match:
+            dob = _parse_dob(dob_match.group("date"))
+        return {
+            "fullName": self._full_name(segmented),
+            "dob": dob,
+            "contact": segmented.phones[0] if segmented.phones else "",
+            "email": segmented.emails[0] if segmented.emails else "",
+        }
+
+    @staticmethod
+    def _full_name(segmented: SegmentedCV) -> str:
+        for line in segmented.sections.get("contact", [])[:6]:
+            if not line or EMAIL_RE.search(line) or PHONE_RE.search(line) or classify_heading(line):
+                continue
+            candidate = _SEPARATORS.split(line)[0].strip()
+            words = candidate.split()
+            if 2 <= len(words) <= 5 and _NAME_LINE.match(candidate):
+                return candidate.title() if candidate.isupper() else candidate
+        return ""
+
+    @staticmethod
+    def _work_experience(segmented: SegmentedCV) -> List[WorkExperience]:
+        if segmented.sections.get("experience"):
+            lines = segmented.sections["experience"]
+        else:
+            # No experience heading found: look everywhere except education
+            lines = [line for section, body in segmented.sections.items() if section != "education" for line in body]
+
+        entries: List[Tuple[str, str, str, List[str]]] = []  # (title text, start, end, description lines)
+        previous = ""
+        for line in lines:
+            match = DATE_RANGE_RE.search(line)
+            start = to_iso_date(match.group("start")) if match else None
+            end = to_iso_date(match.group("end")) if match else None
+            if start and end:
+                title = (line[:match.start()] + " " + line[match.end():]).strip(" |,-–—()")
+                if not title:
+                    # Dates on their own line: the entry title is the line above
+                    title = previous
+                    if entries and entries[-1][3] and entries[-1][3][-1] == previous:
+                        entries[-1][3].pop()
+                entries.append((title, start, end, []))
+            elif entries and line:
+                entries[-1][3].append(line.lstrip("•●▪-* "))
+            if line:
+                previous = line
+
+        jobs = []
+        for title, start, end, description in entries:
+            company, position = _split_title(title)
+            jobs.append(WorkExperience(
+                company=company,
+                position=position,
+                startDate=start,
+                endDate=end,
+                duration=describe_duration(start, end),
+                description=" ".join(description)[:DESCRIPTION_MAX_CHARS],
+            ))
+        return jobs
+
+    @staticmethod
+    def _education(segmented: SegmentedCV) -> str:
+        body = [line for line in segmented.sections.get("education", []) if line and classify_heading(line) is None]
+        return "; ".join(body)[:EDUCATION_MAX_CHARS]
+
+
+def _split_title(title: str) -> Tuple[str, str]:
+    """(company, position) from an entry title such as 'Engineer at Acme' or 'Acme | Engineer'."""
+    at = re.split(r"\s+(?:at|@)\s+", title, maxsplit=1, flags=re.IGNORECASE)
+    if len(at) == 2:
+        return at[1].strip(), at[0].strip()
+    parts = [part for part in _SEPARATORS.split(title) if part]
+    if len(parts) >= 2:
+        return parts[0], parts[1]
+    return (parts[0] if parts else ""), ""
+
+
+def _parse_dob(text: str) -> str:
+    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y-%m-%d", "%d/%m/%y", "%d %B %Y", "%d %b %Y"):
+        try:
+            return datetime.strptime(text.strip(), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return ""
+
+
+_lite_engine: Optional[LiteEngine] = None
+
+
+def get_lite_engine() -> LiteEngine:
+    global _lite_engine
+    if _lite_engine is None:
+        _lite_engine = LiteEngine()
+    return _lite_engine
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from metrics import LLM_RETRIES, LLM_KEY_CALLS, stage_timer, in_flight
+from shared_state import SharedState, refilled, wait_for
+import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMQueueFullError(Exception):
+    """Raised when LLM_QUEUE_MAX_WAITING model calls are already waiting for quota."""
+
+
+class LLMQueueTimeoutError(Exception):
+    """Raised when no API key has quota for a call before its queue deadline."""
+
+
+def is_retryable(error: Optional[BaseException]) -> bool:
+    """Rate limits (429), server errors and timeouts are worth retrying; bad requests are not."""
+    while error is not None:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        try:
+            if int(code) in RETRYABLE_STATUS_CODES:
+                return True
+        except (TypeError, ValueError):
+            pass
+        # langchain-google-genai wraps some API errors
+        error = error.__cause__
+    return False
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket for a per-minute quota (0 = unlimited).
+
+    It holds at most burst_seconds worth of quota, so a burst can't spend a
+    whole minute's allowance at once. take() may leave it negative (e.g. when
+    the real token count of a call turns out higher than reserved); later
+    callers then wait until the debt is paid back.
+
+    With a SharedState the level lives there under name, and every worker
+    process of the node draws from the same bucket.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0, clock: Callable[[], float] = time.monotonic,
+                 shared: Optional[SharedState] = None, name: str = ""):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds) if per_minute > 0 else 0.0
+        self.shared = shared if per_minute > 0 else None
+        self.name = name
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 if right now)."""
+        if self.unlimited:
+            return 0.0
+        return wait_for(self.level(), amount, self.rate, self.capacity)
+
+    def take(self, amount: float) -> None:
+        if self.unlimited:
+            return
+        if self.shared is not None:
+            self.shared.bucket_take([(self.name, amount, self.rate, self.capacity)], self._clock(), only_if_ready=False)
+            return
+        self._refill()
+        self._level -= amount
+
+    def level(self) -> float:
+        if self.unlimited:
+            return float("inf")
+        if self.shared is not None:
+            return self.shared.bucket_level(self.name, self.rate, self.capacity, self._clock())
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = refilled(self._level, self._updated, now, self.rate, self.capacity)
+        self._updated = now
+
+
+def take_together(takes: List[Tuple[TokenBucket, float]]) -> float:
+    """
+    Take (bucket, amount) from every bucket only if they all have it now.
+    Returns 0 once taken, else the seconds until they will. Shared buckets
+    are checked and taken in one transaction, so two workers can't both
+    take the last of a quota.
+    """
+    takes = [(bucket, amount) for bucket, amount in takes if not bucket.unlimited]
+    if not takes:
+        return 0.0
+    shared = takes[0][0].shared
+    if shared is not None:
+        return shared.bucket_take(
+            [(bucket.name, amount, bucket.rate, bucket.capacity) for bucket, amount in takes],
+            takes[0][0]._clock(), only_if_ready=True,
+        )
+    wait = max(bucket.wait_time(amount) for bucket, amount in takes)
+    if wait <= 0:
+        for bucket, amount in takes:
+            bucket.take(amount)
+    return wait
+
+
+class KeySlot:
+    """One API key: its model client, request and token buckets, and calls in flight."""
+
+    def __init__(self, name: str, llm, requests_per_minute: float, tokens_per_minute: float, clock: Callable[[], float],
+                 shared: Optional[SharedState] = None):
+        self.name = name
+        self.llm = llm
+        self.requests = TokenBucket(requests_per_minute, clock=clock, shared=shared, name=f"{name}:requests")
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, shared=shared, name=f"{name}:tokens")
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def ready_in(self, tokens: int, now: float) -> float:
+        return max(self.cooldown_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def acquire(self, tokens: int, now: float) -> float:
+        """Take a request and tokens from the quota if there is room (0), else seconds until there is."""
+        if self.cooldown_until > now:
+            return self.cooldown_until - now
+        return take_together([(self.requests, 1), (self.tokens, tokens)])
+
+
+class LLMScheduler:
+    """
+    Client-side admission control for model calls across one or more API keys.
+
+    Each key has token buckets for its requests-per-minute and tokens-per-minute
+    quota. A call waits in a bounded FIFO queue until some key has quota for
+    it, goes to the key that is ready soonest (ties: fewest calls in flight,
+    then round-robin), and is retried with jittered exponential backoff on
+    rate limits, server errors and timeouts. The key that failed is rested for
+    the backoff period, so with several keys a retry usually goes straight to
+    another one. Bursts are spread out at the quota rate instead of turning
+    into 429s.
+
+    Given a SharedState, the buckets are shared by every worker process of
+    the node (serve.py), so together they stay within the quota; cooldowns
+    after errors stay per process. Shared buckets are SQLite transactions that
+    can wait on another worker's write lock, so they run on a thread, never
+    on the event loop.
+    """
+
+    def __init__(
+        self,
+        llms: List[Any],
+        requests_per_minute: float = config.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = config.LLM_TOKENS_PER_MINUTE,
+        max_retries: int = config.LLM_MAX_RETRIES,
+        retry_base_seconds: float = config.LLM_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = config.LLM_RETRY_MAX_SECONDS,
+        max_waiting: int = config.LLM_QUEUE_MAX_WAITING,
+        queue_timeout_seconds: float = config.LLM_QUEUE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        shared_state: Optional[SharedState] = None,
+    ):
+        if not llms:
+            raise ValueError("LLMScheduler needs at least one model client")
+        self.slots = [
+            KeySlot(f"key{index + 1}", llm, requests_per_minute, tokens_per_minute, clock, shared_state)
+            for index, llm in enumerate(llms)
+        ]
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_waiting = max_waiting
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._clock = clock
+        self._shared = shared_state
+        self._turn = 0
+        self._waiting = 0
+        self._admission = asyncio.Lock()
+
+    async def call(self, invoke: Callable[[Any], Awaitable[T]], tokens: int) -> T:
+        """
+        Run invoke(llm) on a key once its quota allows, retrying retryable errors.
+
+        Args:
+            invoke: Makes the model call with the given client and returns its AIMessage
+            tokens: Estimated prompt tokens, reserved against the token quota up front;
+                the difference to the reported usage is settled afterwards
+
+        Raises:
+            LLMQueueFullError: Too many calls already waiting
+            LLMQueueTimeoutError: No quota within LLM_QUEUE_TIMEOUT_SECONDS
+            The model's own error when it isn't retryable or retries ran out
+        """
+        deadline = self._clock() + self.queue_timeout_seconds
+        attempt = 0
+        while True:
+            slot = await self._acquire(tokens, deadline)
+            slot.in_flight += 1
+            slot.calls += 1
+            LLM_KEY_CALLS.inc(key=slot.name)
+            try:
+                result = await invoke(slot.llm)
+            except Exception as e:
+                slot.errors += 1
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                slot.cooldown_until = max(slot.cooldown_until, self._clock() + delay)
+                attempt += 1
+                LLM_RETRIES.inc(reason=type(e).__name__)
+                logger.warning(f"LLM call on {slot.name} failed ({type(e).__name__}: {str(e)[:200]}), "
+                               f"retry {attempt}/{self.max_retries} after {delay:.1f}s")
+                deadline = self._clock() + delay + self.queue_timeout_seconds
+                continue
+            finally:
+                slot.in_flight -= 1
+            usage = getattr(result, "usage_metadata", None) or {}
+            if usage.get("total_tokens"):
+                await self._off_loop(slot.tokens.take, usage["total_tokens"] - tokens)
+            return result
+
+    def snapshot(self) -> dict:
+        return {
+            "waiting": self._waiting,
+            "keys": [
+                {
+                    "name": slot.name,
+                    "in_flight": slot.in_flight,
+                    "calls": slot.calls,
+                    "errors": slot.errors,
+                    "cooling_down": slot.cooldown_until > self._clock(),
+                    "requests_available": round(slot.requests.level(), 1),
+                    "tokens_available": round(slot.tokens.level()),
+                }
+                for slot in self.slots
+            ],
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        # "Equal jitter": at least half the exponential step, so retries never come back instantly
+        step = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt)
+        return step / 2 + random.uniform(0, step / 2)
+
+    async def _acquire(self, tokens: int, deadline: float) -> KeySlot:
+        if self._waiting >= self.max_waiting:
+            raise LLMQueueFullError(f"{self._waiting} LLM calls are already waiting for quota")
+        self._waiting += 1
+        try:
+            with in_flight("llm_waiting"), stage_timer("llm_queue"):
+                # The lock keeps the queue FIFO: only its holder waits on the buckets
+                try:
+                    await asyncio.wait_for(self._admission.acquire(), max(0.0, deadline - self._clock()))
+                except asyncio.TimeoutError:
+                    raise LLMQueueTimeoutError(f"No LLM quota within {self.queue_timeout_seconds:.0f}s")
+                try:
+                    while True:
+                        now = self._clock()
+                        slot, wait = await self._off_loop(self._try_acquire, tokens, now)
+                        if wait <= 0:
+                            return slot
+                        if now + wait > deadline:
+                            raise LLMQueueTimeoutError(f"No LLM quota within {self.queue_timeout_seconds:.0f}s")
+                        await asyncio.sleep(wait)
+                finally:
+                    self._admission.release()
+        finally:
+            self._waiting -= 1
+
+    async def _off_loop(self, function: Callable[..., T], *args) -> T:
+        if self._shared is None:
+            return function(*args)
+        return await asyncio.to_thread(function, *args)
+
+    def _try_acquire(self, tokens: int, now: float) -> Tuple[KeySlot, float]:
+        """(key, 0) once a key's quota is taken for the call, else (key ready soonest, seconds until it is)."""
+        slot, wait = self._best_slot(tokens, now)
+        if wait <= 0:
+            # Another worker may have taken the quota since (shared buckets)
+            wait = slot.acquire(tokens, now)
+        return slot, wait
+
+    def _best_slot(self, tokens: int, now: float) -> Tuple[KeySlot, float]:
+        best, best_rank, best_index = None, None, 0
+        for offset in range(len(self.slots)):
+            index = (self._turn + offset) % len(self.slots)
+            slot = self.slots[index]
+            rank = (max(0.0, slot.ready_in(tokens, now)), slot.in_flight)
+            if best_rank is None or rank < best_rank:
+                best, best_rank, best_index = slot, rank, index
+        if best_rank[0] <= 0:
+            self._turn = (best_index + 1) % len(self.slots)
+        return best, best_rank[0]
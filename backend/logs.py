@@ -0,0 +1,193 @@
+"""
+Logging for the API: log calls on the request path only put the record on a
+queue, and one background thread formats and writes them, so a slow stderr
+or log pipe never stalls the event loop.
+
+Records are written as one JSON object per line (LOG_FORMAT=json) with the
+time, level, logger, message, the id of the request that logged them and any
+`extra` fields. Below DEBUG level, long messages and fields are cut to
+LOG_MAX_FIELD_CHARS; the full CV text is only logged at DEBUG.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Optional
+
+from metrics import LOG_RECORDS_DROPPED
+import config
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Id of the request being handled (or job being run) in the current context
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id", "taskName"}
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """The client's X-Request-ID if it looks like an id, else a fresh one."""
+    if incoming and _REQUEST_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def set_request_id(request_id: Optional[str]) -> None:
+    _request_id.set(request_id)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def _extras(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+def _truncate(value, limit: int):
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}...[+{len(value) - limit} chars]"
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, request_id, extra fields, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        entry.update(_extras(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for reading logs in a terminal, extra fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            line = f"[{request_id}] {line}"
+        extras = _extras(record)
+        if extras:
+            line += " " + " ".join(f"{key}={value}" for key, value in extras.items())
+        return line
+
+
+class _RequestQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. Everything that depends on the caller
+    (message arguments, traceback, request id) is resolved here, bulky fields
+    are cut, and when the queue is full the record is dropped and counted
+    instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_field_chars: int):
+        super().__init__(log_queue)
+        self.max_field_chars = max_field_chars
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = _request_id.get()
+        if record.levelno > logging.DEBUG and self.max_field_chars:
+            record.msg = _truncate(record.msg, self.max_field_chars)
+            for key, value in _extras(record).items():
+                setattr(record, key, _truncate(value, self.max_field_chars))
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full at shutdown: wait for room rather than lose the stop signal
+        self.queue.put(self._sentinel)
+
+
+_handler: Optional[_RequestQueueHandler] = None
+_listener: Optional[_Listener] = None
+
+
+def _formatter(fmt: str) -> logging.Formatter:
+    return TextFormatter() if fmt == "text" else JsonFormatter()
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream: Optional[IO[str]] = None) -> None:
+    """
+    Route the root logger through the queue to the writer thread (idempotent).
+
+    Args:
+        level: Root log level (default config.LOG_LEVEL)
+        fmt: "json" or "text" (default config.LOG_FORMAT)
+        stream: Where the writer thread writes (default stderr)
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(_formatter(fmt or config.LOG_FORMAT))
+    _handler = _RequestQueueHandler(log_queue, config.LOG_MAX_FIELD_CHARS)
+    _listener = _Listener(log_queue, output)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel((level or config.LOG_LEVEL).upper())
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out the records still queued and stop the writer thread."""
+    global _handler, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _handler, _listener = None, None
+
+
+def configure_worker_logging() -> None:
+    """
+    For extraction pool worker processes: a forked worker inherits the queue
+    handler, but no writer thread drains its copy of the queue. Workers write
+    directly instead (they have no event loop to stall).
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _RequestQueueHandler):
+            root.removeHandler(handler)
+    if not root.handlers:
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(_formatter(config.LOG_FORMAT))
+        root.addHandler(output)
@@ -0,0 +1,363 @@
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from candidate_store import SKILL_TERM, DOMAIN_TERM, skill_term, domain_term, get_candidate_store
+from lite_engine import scan_skills
+from metrics import stage_timer
+from taxonomy import get_skill_taxonomy
+import config
+
+# "Nice to have" skills weigh less than required ones; a heading with one of
+# these cues switches the lines under it, a cue inside a line only that line
+_OPTIONAL_CUES = re.compile(r"\b(?:nice to have|good to have|preferred|bonus|a plus|desirable|optional|familiarity with)\b", re.IGNORECASE)
+_REQUIRED_CUES = re.compile(r"\b(?:required|requirements|must|mandatory|essential|qualifications|responsibilities)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^[\s•●▪*\-–]+")
+# "5+ years", "3-5 years", "2 yrs" (the lower bound counts)
+_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:(?:-|–|to)\s*\d+(?:\.\d+)?\s*)?(?:years?|yrs?)\b", re.IGNORECASE)
+_MAX_REQUIRED_YEARS = 40.0
+
+
+@dataclass
+class JobProfile:
+    """A job description as weighted skill and domain vectors plus the experience it asks for."""
+
+    skills: Dict[str, float] = field(default_factory=dict)  # skill term -> weight
+    domains: Dict[str, float] = field(default_factory=dict)  # domain term -> weight
+    min_years: Optional[float] = None
+    names: Dict[str, str] = field(default_factory=dict)  # skill term -> name as written in the JD
+
+    @property
+    def empty(self) -> bool:
+        return not self.skills and not self.min_years
+
+    def to_dict(self) -> dict:
+        return {
+            "skills": {self.names[term]: round(weight, 3) for term, weight in sorted(self.skills.items(), key=lambda item: -item[1])},
+            "domains": {term[len(DOMAIN_TERM):]: round(weight, 3) for term, weight in sorted(self.domains.items(), key=lambda item: -item[1])},
+            "min_years": self.min_years,
+        }
+
+
+def parse_job_description(text: str) -> JobProfile:
+    """
+    Weighted skill vector of a job description, in the same terms the
+    candidate store indexes CVs by. Every taxonomy skill found counts 1 per
+    mention (MATCH_OPTIONAL_SKILL_WEIGHT under "nice to have" / "preferred"),
+    capped at 2; domains sum the weights of their skills. The largest
+    "N years" on a line mentioning experience is the experience asked for.
+    """
+    taxonomy = get_skill_taxonomy()
+    profile = JobProfile()
+    optional_section = False
+    for line in text.splitlines():
+        stripped = _BULLET.sub("", line).strip()
+        if not stripped:
+            continue
+        if len(stripped) <= 60 and (stripped.endswith(":") or len(stripped.split()) <= 5):
+            # A heading: "Nice to have:" starts an optional section, "Requirements:" ends it
+            if _OPTIONAL_CUES.search(stripped):
+                optional_section = True
+            elif _REQUIRED_CUES.search(stripped):
+                optional_section = False
+        optional = optional_section or _OPTIONAL_CUES.search(stripped) is not None
+        weight = config.MATCH_OPTIONAL_SKILL_WEIGHT if optional else 1.0
+        for skill in scan_skills(stripped):
+            term = skill_term(skill.name)
+            profile.skills[term] = min(2.0, profile.skills.get(term, 0.0) + weight * skill.mentions)
+            profile.names.setdefault(term, skill.name)
+        if "experience" in stripped.lower() or "exp." in stripped.lower():
+            for match in _YEARS_RE.finditer(stripped):
+                years = min(float(match.group(1)), _MAX_REQUIRED_YEARS)
+                if not optional and years > (profile.min_years or 0.0):
+                    profile.min_years = years
+    for term, weight in profile.skills.items():
+        domain = taxonomy.domain_of(term[len(SKILL_TERM):])
+        if domain != taxonomy.default_domain:
+            key = domain_term(domain)
+            profile.domains[key] = profile.domains.get(key, 0.0) + weight
+    return profile
+
+
+class _Column:
+    """Rows and values of one skill column, in arrays grown by doubling."""
+
+    __slots__ = ("rows", "values", "size")
+
+    def __init__(self, capacity: int = 16):
+        self.rows = np.empty(capacity, dtype=np.int32)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.size = 0
+
+    def extend(self, rows: np.ndarray, values: np.ndarray) -> None:
+        needed = self.size + len(rows)
+        if needed > len(self.rows):
+            capacity = max(needed, 2 * len(self.rows))
+            self.rows = np.resize(self.rows, capacity)
+            self.values = np.resize(self.values, capacity)
+        self.rows[self.size:needed] = rows
+        self.values[self.size:needed] = values
+        self.size = needed
+
+
+class CandidateMatrix:
+    """
+    Sparse skill-by-candidate matrix for ranking every candidate against a job at once.
+
+    Skills are stored column-wise (CSC-like): each skill term has an array of
+    candidate rows and an array of values, the mention count scaled to
+    min(1, log(1 + mentions) / log(1 + MATCH_MENTIONS_SATURATION)). Scoring a
+    JobProfile is then one np.bincount over the columns of the job's skills,
+    i.e. a sparse matrix-vector product whose cost depends on how many
+    candidates have those skills, not on the vocabulary. Skill domains are a
+    small dense candidates x domains matrix of L2-normalized mention counts,
+    scored with one matrix-vector product, and experience a vector.
+
+    Rows are appended as candidates arrive; a replaced or deleted candidate's
+    row is marked dead and skipped, and dead rows are compacted away once they
+    are a quarter of the matrix. It follows the candidate store through
+    CandidateStore.attach().
+    """
+
+    def __init__(self, saturation: float = config.MATCH_MENTIONS_SATURATION):
+        self._scale = 1.0 / math.log1p(saturation)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._size = 0
+        self._dead = 0
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._years = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._row_of: Dict[int, int] = {}
+        self._skills: Dict[str, _Column] = {}
+        self._domain_column: Dict[str, int] = {}
+        self._domains = np.zeros((1024, 0), dtype=np.float32)
+
+    # Updates (entries are (candidate_id, experience_years, {term: mentions}), see CandidateStore)
+    def add(self, entries: Iterable[Tuple[int, float, Dict[str, int]]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        with self._lock:
+            # A candidate added again gets a new row
+            self._kill(candidate_id for candidate_id, _, _ in entries)
+            first = self._size
+            self._reserve(first + len(entries))
+            skill_rows: Dict[str, List[int]] = {}
+            skill_mentions: Dict[str, List[int]] = {}
+            domain_cells: List[Tuple[int, int, int]] = []
+            for row, (candidate_id, years, terms) in enumerate(entries, start=first):
+                self._row_of[candidate_id] = row
+                self._ids[row] = candidate_id
+                self._years[row] = years
+                for term, mentions in terms.items():
+                    if term.startswith(SKILL_TERM):
+                        skill_rows.setdefault(term, []).append(row)
+                        skill_mentions.setdefault(term, []).append(mentions)
+                    elif term.startswith(DOMAIN_TERM):
+                        domain_cells.append((row, self._domain_index(term), mentions))
+            self._alive[first:first + len(entries)] = True
+            self._size = first + len(entries)
+
+            for term, rows in skill_rows.items():
+                mentions = np.asarray(skill_mentions[term], dtype=np.float32)
+                column = self._skills.get(term)
+                if column is None:
+                    column = self._skills[term] = _Column(max(16, len(rows)))
+                column.extend(np.asarray(rows, dtype=np.int32), np.minimum(1.0, np.log1p(mentions) * self._scale))
+            if domain_cells:
+                rows, columns, mentions = zip(*domain_cells)
+                self._domains[list(rows), list(columns)] = mentions
+            block = self._domains[first:self._size]
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            np.divide(block, norms, out=block, where=norms > 0)
+            self._maybe_compact()
+
+    def remove(self, entries: Iterable[Tuple[int, float, Dict[str, int]]]) -> None:
+        with self._lock:
+            self._kill(candidate_id for candidate_id, _, _ in entries)
+            self._maybe_compact()
+
+    # Scoring
+    def rank(self, profile: JobProfile, top_k: int = 20, min_experience: Optional[float] = None) -> Tuple[int, List[dict]]:
+        """
+        Score every candidate against a job and return (candidates considered, top_k results).
+
+        The score is the weighted mean (MATCH_SKILL_WEIGHT, MATCH_DOMAIN_WEIGHT,
+        MATCH_EXPERIENCE_WEIGHT) of the parts the job gives information for:
+          skill_score:      share of the job's skill weight the candidate covers
+          domain_score:     cosine between the candidate's and the job's domain mix
+          experience_score: experienceYears / the years asked for, capped at 1
+        """
+        with self._lock:
+            size = self._size
+            eligible = self._alive[:size].copy()
+            years = self._years[:size]
+            if min_experience is not None:
+                eligible &= years >= min_experience
+            considered = int(eligible.sum())
+            if not considered or top_k <= 0:
+                return considered, []
+
+            parts: List[Tuple[str, float, np.ndarray]] = []
+            columns = {term: self._skills.get(term) for term in profile.skills}
+            if profile.skills:
+                rows = [column.rows[:column.size] for column in columns.values() if column is not None]
+                values = [column.values[:column.size] * profile.skills[term] for term, column in columns.items() if column is not None]
+                covered = np.bincount(np.concatenate(rows), weights=np.concatenate(values), minlength=size) if rows else np.zeros(size)
+                parts.append(("skill_score", config.MATCH_SKILL_WEIGHT, covered / sum(profile.skills.values())))
+            job_domains = np.zeros(self._domains.shape[1], dtype=np.float32)
+            for term, weight in profile.domains.items():
+                if term in self._domain_column:
+                    job_domains[self._domain_column[term]] = weight
+            norm = np.linalg.norm(job_domains)
+            if norm > 0:
+                parts.append(("domain_score", config.MATCH_DOMAIN_WEIGHT, self._domains[:size] @ (job_domains / norm)))
+            if profile.min_years:
+                parts.append(("experience_score", config.MATCH_EXPERIENCE_WEIGHT, np.minimum(1.0, years / profile.min_years)))
+            total_weight = sum(weight for _, weight, _ in parts) or 1.0
+            score = np.zeros(size)
+            for _, weight, values in parts:
+                score += weight * values
+            score /= total_weight
+            score[~eligible] = -np.inf
+
+            k = min(top_k, considered)
+            top = np.argpartition(-score, k - 1)[:k]
+            # Best first, newest first among equal scores (which of several tied at the cut-off make it is arbitrary)
+            top = top[np.lexsort((-self._ids[top], -score[top]))]
+            matched = self._matched_skills(columns, top, size)
+            results = []
+            for position, row in enumerate(top):
+                result = {"id": int(self._ids[row]), "score": round(float(score[row]), 4)}
+                for name, _, values in parts:
+                    result[name] = round(float(values[row]), 4)
+                result["matched_skills"] = [profile.names[term] for term in matched[position]]
+                result["missing_skills"] = [profile.names[term] for term in profile.skills if term not in matched[position]]
+                results.append(result)
+            return considered, results
+
+    # Internals (caller holds self._lock)
+    def _matched_skills(self, columns: Dict[str, Optional[_Column]], top: np.ndarray, size: int) -> List[List[str]]:
+        position = np.full(size, -1, dtype=np.int64)
+        position[top] = np.arange(len(top))
+        matched: List[List[str]] = [[] for _ in top]
+        for term, column in columns.items():
+            if column is None:
+                continue
+            hits = position[column.rows[:column.size]]
+            for index in hits[hits >= 0]:
+                matched[index].append(term)
+        return matched
+
+    def _domain_index(self, term: str) -> int:
+        index = self._domain_column.get(term)
+        if index is None:
+            index = self._domain_column[term] = len(self._domain_column)
+            self._domains = np.hstack([self._domains, np.zeros((len(self._domains), 1), dtype=np.float32)])
+        return index
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= len(self._ids):
+            return
+        capacity = max(rows, 2 * len(self._ids))
+        self._ids = np.resize(self._ids, capacity)
+        self._years = np.resize(self._years, capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        domains = np.zeros((capacity, self._domains.shape[1]), dtype=np.float32)
+        domains[:self._size] = self._domains[:self._size]
+        self._domains = domains
+
+    def _kill(self, candidate_ids: Iterable[int]) -> None:
+        rows = [self._row_of.pop(candidate_id) for candidate_id in candidate_ids if candidate_id in self._row_of]
+        if rows:
+            self._alive[rows] = False
+            self._dead += len(rows)
+
+    def _maybe_compact(self) -> None:
+        if self._dead <= max(1024, self._size // 4):
+            return
+        alive = self._alive[:self._size]
+        new_row = np.cumsum(alive) - 1
+        for term in list(self._skills):
+            column = self._skills[term]
+            rows = column.rows[:column.size]
+            keep = alive[rows]
+            if not keep.any():
+                del self._skills[term]
+                continue
+            compacted = _Column(int(keep.sum()))
+            compacted.extend(new_row[rows[keep]], column.values[:column.size][keep])
+            self._skills[term] = compacted
+        count = int(alive.sum())
+        self._ids[:count] = self._ids[:self._size][alive]
+        self._years[:count] = self._years[:self._size][alive]
+        self._domains[:count] = self._domains[:self._size][alive]
+        self._domains[count:self._size] = 0
+        self._alive[:count] = True
+        self._alive[count:self._size] = False
+        self._size = count
+        self._dead = 0
+        self._row_of = {int(candidate_id): row for row, candidate_id in enumerate(self._ids[:count])}
+
+
+def match_job_description(text: str, top_k: int = 20, min_experience: Optional[float] = None) -> dict:
+    """
+    Rank the stored candidates against a job description.
+
+    Returns:
+        {"job": parsed JobProfile, "candidates": number considered,
+         "results": candidate summaries with score, score parts and matched/missing skills}
+
+    Raises:
+        ValueError: The candidate store is disabled, or the job description has
+            no known skill and no experience requirement to match on
+    """
+    candidate_store = get_candidate_store()
+    if candidate_store is None:
+        raise ValueError("Matching needs the candidate store, which is disabled")
+    profile = parse_job_description(text)
+    if profile.empty:
+        raise ValueError("No known skills or experience requirement found in the job description")
+    candidate_store.flush()
+    with stage_timer("match"):
+        considered, ranked = get_candidate_matrix().rank(profile, top_k, min_experience)
+    summaries = {summary["id"]: summary for summary in candidate_store.summaries([result["id"] for result in ranked])}
+    return {
+        "job": profile.to_dict(),
+        "candidates": considered,
+        "results": [{**summaries[result["id"]], **result} for result in ranked if result["id"] in summaries],
+    }
+
+
+_candidate_matrix: Optional[CandidateMatrix] = None
+_candidate_matrix_lock = threading.Lock()
+
+
+def get_candidate_matrix() -> Optional[CandidateMatrix]:
+    """Shared matrix over the candidate store (None when the store is disabled), built on first use."""
+    global _candidate_matrix
+    candidate_store = get_candidate_store()
+    if candidate_store is None:
+        return None
+    with _candidate_matrix_lock:
+        if _candidate_matrix is None:
+            matrix = CandidateMatrix()
+            candidate_store.attach(matrix)
+            _candidate_matrix = matrix
+        return _candidate_matrix
@@ -0,0 +1,274 @@
+import copy
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 250 * 1024, 500 * 1024, 1024 ** 2, 2 * 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2)
+PAGES_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+CHARACTERS_BUCKETS = (1000, 2500, 5000, 10000, 20000, 50000, 100000, 250000)
+TOKENS_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def empty(self) -> "_Metric":
+        """Same metric with no values, e.g. to add up the values of several processes."""
+        clone = copy.copy(self)
+        clone._lock = threading.Lock()
+        clone._values = {}
+        return clone
+
+    def dump(self) -> list:
+        """Values as JSON-able [[label values], value] pairs (see load)."""
+        with self._lock:
+            return [[list(key), copy.deepcopy(value)] for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def load(self, dumped: list) -> None:
+        """Add the values of another process's dump() to these."""
+        for key, value in dumped:
+            self.inc(value, **dict(zip(self.label_names, key)))
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        with self._lock:
+            return [(self.name, key, "", value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def load(self, dumped: list) -> None:
+        with self._lock:
+            for key, (counts, total, count) in dumped:
+                entry = self._values.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0, 0])
+                entry[0] = [mine + theirs for mine, theirs in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        out = []
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                out.append((self.name + "_bucket", key, f'le="{_format_value(bound)}"', cumulative))
+            out.append((self.name + "_sum", key, "", total))
+            out.append((self.name + "_count", key, "", count))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def dump(self) -> Dict[str, list]:
+        """Every metric's values, to add up with other worker processes' (see render)."""
+        return {metric.name: metric.dump() for metric in self._metrics}
+
+    def render(self, dumps: Optional[Iterable[Tuple[Dict[str, list], bool]]] = None) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+
+        Args:
+            dumps: (dump(), alive) of every worker process, added up instead of
+                this process's own values; gauges only count live workers
+        """
+        if dumps is not None:
+            dumps = list(dumps)
+        lines = []
+        for metric in self._metrics:
+            if dumps is not None:
+                total = metric.empty()
+                for dump, alive in dumps:
+                    if alive or metric.kind != "gauge":
+                        total.load(dump.get(metric.name, []))
+                metric = total
+            lines.extend(metric.header())
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(metric.label_names, key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "cv_stage_duration_seconds", "Time spent in each CV pipeline stage", ["stage"]))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "cv_stage_errors_total", "Failures by pipeline stage and exception type", ["stage", "exception"]))
+INPUT_BYTES = REGISTRY.register(Histogram(
+    "cv_input_bytes", "Size of uploaded CV files", ["format"], buckets=BYTES_BUCKETS))
+INPUT_PAGES = REGISTRY.register(Histogram(
+    "cv_input_pages", "Pages per PDF CV", buckets=PAGES_BUCKETS))
+INPUT_CHARACTERS = REGISTRY.register(Histogram(
+    "cv_input_characters", "Characters of text extracted per CV", buckets=CHARACTERS_BUCKETS))
+LLM_TOKENS = REGISTRY.register(Histogram(
+    "cv_llm_tokens", "Prompt and response tokens per LLM call", ["kind"], buckets=TOKENS_BUCKETS))
+LLM_TOKENS_TOTAL = REGISTRY.register(Counter(
+    "cv_llm_tokens_total", "Prompt and response tokens sent to/received from the LLM", ["kind"]))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "cv_in_flight", "Work currently in progress", ["what"]))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "cv_http_requests_total", "HTTP requests by route and status code", ["route", "status"]))
+HTTP_REQUESTS_SHED = REGISTRY.register(Counter(
+    "cv_http_requests_shed_total", "Requests answered 503 because their worker was at SERVE_WORKER_CONCURRENCY"))
+SEGMENTER_TOKENS = REGISTRY.register(Histogram(
+    "cv_segmenter_tokens", "Estimated prompt tokens of the CV text before and after segmentation", ["kind"], buckets=TOKENS_BUCKETS))
+SEGMENTER_REDUCTION = REGISTRY.register(Histogram(
+    "cv_segmenter_token_reduction_ratio", "Fraction of CV text tokens removed by segmentation",
+    buckets=(0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)))
+SEGMENTER_FALLBACKS = REGISTRY.register(Counter(
+    "cv_segmenter_fallbacks_total", "CVs sent in full because segmentation confidence was low"))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cv_cache_lookups_total", "Result cache lookups by outcome", ["result"]))
+EXTRACTIONS = REGISTRY.register(Counter(
+    "cv_extractions_total", "CVs extracted by engine and why that engine was used", ["engine", "reason"]))
+LLM_SECTION_RETRIES = REGISTRY.register(Counter(
+    "cv_llm_section_retries_total", "Sectioned extraction calls repeated because their output didn't parse", ["section"]))
+LLM_RETRIES = REGISTRY.register(Counter(
+    "cv_llm_retries_total", "Model calls retried by the scheduler, by error type", ["reason"]))
+LLM_KEY_CALLS = REGISTRY.register(Counter(
+    "cv_llm_key_calls_total", "Model calls per configured API key (key1, key2, ...)", ["key"]))
+BREAKER_OPEN = REGISTRY.register(Gauge(
+    "cv_circuit_breaker_open", "1 while a circuit breaker is open or half-open", ["name"]))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "cv_log_records_dropped_total", "Log records dropped because the log writer queue was full"))
+STARTUP_DURATION = REGISTRY.register(Histogram(
+    "cv_startup_duration_seconds", "Time each startup warm-up step took, after the app began answering /health", ["step"]))
+
+
+# Server-Timing entries for the current request; None when not collecting
+_server_timing: ContextVar[Optional[list]] = ContextVar("server_timing", default=None)
+
+
+def start_server_timing() -> list:
+    """Begin collecting stage timings for the current request (see server_timing_header)."""
+    timings: list = []
+    _server_timing.set(timings)
+    return timings
+
+
+def server_timing_header(timings: list) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    STAGE_DURATION.observe(seconds, stage=stage)
+    timings = _server_timing.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a pipeline stage; failures are counted by stage and exception type."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        STAGE_ERRORS.inc(stage=stage, exception=type(e).__name__)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def in_flight(what: str):
+    IN_FLIGHT.inc(what=what)
+    try:
+        yield
+    finally:
+        IN_FLIGHT.dec(what=what)
+
+
+def record_llm_usage(usage: Optional[dict]) -> None:
+    """Token counts from an AIMessage.usage_metadata, when the model reports them."""
+    if not usage:
+        return
+    for kind, key in (("prompt", "input_tokens"), ("response", "output_tokens")):
+        tokens = usage.get(key)
+        if tokens is not None:
+            LLM_TOKENS.observe(tokens, kind=kind)
+            LLM_TOKENS_TOTAL.inc(tokens, kind=kind)
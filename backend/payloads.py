@@ -0,0 +1,132 @@
+"""
+CV results on the wire: JSON encoded once, field projection (fields=) and
+opt-in gzip / brotli compression.
+
+The pipeline encodes each EmployeeData to JSON once, with pydantic's
+encoder (cv_process.cv_processing_encoded). The endpoints send those bytes
+as they are, instead of letting FastAPI walk the dict again
+(jsonable_encoder) and re-encode it. A projection encodes only the fields
+asked for.
+
+Compression is off unless RESPONSE_COMPRESSION lists the encodings to
+offer. The client chooses with Accept-Encoding. Brotli is optional
+(`pip install brotli`) and is skipped when it isn't installed.
+"""
+import importlib.util
+import zlib
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from schema import EmployeeData
+import config
+
+JSON_MEDIA_TYPE = "application/json"
+RESULT_FIELDS = tuple(EmployeeData.model_fields)
+# Looked up once: installing brotli takes a restart anyway
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+
+def parse_fields(names: Sequence[str]) -> Optional[List[str]]:
+    """
+    EmployeeData fields to send, from a fields= parameter (None = all of them).
+
+    Raises:
+        ValueError: For a name that isn't an EmployeeData field
+    """
+    if not names:
+        return None
+    unknown = [name for name in names if name not in EmployeeData.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Use any of: {', '.join(RESULT_FIELDS)}.")
+    return list(dict.fromkeys(names))
+
+
+def encode_result(data: dict, payload: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> bytes:
+    """JSON of a result: its already encoded payload when sent whole, else only the fields asked for."""
+    if fields is None:
+        return payload.encode("utf-8") if payload is not None else to_json(data)
+    return to_json({name: data.get(name) for name in fields})
+
+
+def offered_encodings() -> List[str]:
+    return [name for name in config.RESPONSE_COMPRESSION
+            if name == "gzip" or (name == "br" and BROTLI_AVAILABLE)]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The offered encoding the client accepts with the highest q-value (ties: RESPONSE_COMPRESSION order)."""
+    offered = offered_encodings()
+    if not offered or not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    ranked = [(weights.get(name, weights.get("*", 0.0)), -index, name) for index, name in enumerate(offered)]
+    weight, _, name = max(ranked)
+    return name if weight > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=config.RESPONSE_BROTLI_QUALITY)
+    compressor = zlib.compressobj(config.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+def json_response(body: bytes, accept_encoding: str = "", headers: Optional[Dict[str, str]] = None) -> Response:
+    """A response with already encoded JSON, compressed if it is large enough and the client accepts it."""
+    headers = dict(headers or {})
+    if config.RESPONSE_COMPRESSION:
+        headers["Vary"] = "Accept-Encoding"
+    encoding = choose_encoding(accept_encoding) if len(body) >= config.RESPONSE_COMPRESSION_MIN_BYTES else None
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+class StreamCompressor:
+    """
+    Compresses a stream piece by piece, flushing after each piece, so every
+    NDJSON line still reaches the client as soon as it is produced. The
+    compression window is kept across pieces, so repeated keys stay cheap.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            import brotli
+            self._brotli = brotli.Compressor(quality=config.RESPONSE_BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(config.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, piece: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(piece) + self._brotli.flush()
+        return self._gzip.compress(piece) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush()
+
+
+async def compressed_stream(pieces: AsyncGenerator[bytes, None], encoding: str) -> AsyncIterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    try:
+        async for piece in pieces:
+            yield compressor.compress(piece)
+        yield compressor.finish()
+    finally:
+        # A client that went away must stop the inner stream's work now, not when it is collected
+        await pieces.aclose()
@@ -1,6 +1,7 @@
 from __future__ import annotations  # FIXED: Enable forward references
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, create_model
+from typing import Dict, List, Optional, Type
+import config
 
 class Skill(BaseModel):
     name: str = Field(description="Skill name (e.g., Python)")
@@ -41,4 +42,27 @@ class EmployeeData(BaseModel):
     workExperience: List[WorkExperience] = Field(default_factory=list, description="Work history with dates")  # FIXED: Changed to WorkExperience
     
     # Education
-    education: Optional[str] = Field(default="", description="Educational qualifications")
\ No newline at end of file
+    education: Optional[str] = Field(default="", description="Educational qualifications")
+
+
+# Sub-schemas for sectioned extraction (one smaller LLM call per group of fields),
+# with the same types, defaults and descriptions as the EmployeeData fields
+def _section_model(name: str, fields: List[str]) -> Type[BaseModel]:
+    return create_model(name, **{field: (EmployeeData.model_fields[field].annotation, EmployeeData.model_fields[field]) for field in fields})
+
+ProfileSection = _section_model("ProfileSection", ["fullName", "dob", "contact", "email", "emergencyContact", "designation", "department", "education"])
+SkillsSection = _section_model("SkillsSection", ["allSkills"])
+ExperienceSection = _section_model("ExperienceSection", ["workExperience"])
+
+SECTION_MODELS: Dict[str, Type[BaseModel]] = {
+    "profile": ProfileSection,
+    "skills": SkillsSection,
+    "experience": ExperienceSection,
+}
+
+
+class MatchRequest(BaseModel):
+    """Body of POST /api/match"""
+    job_description: str = Field(min_length=1, description="Job description text")
+    top_k: int = Field(default=20, ge=1, le=config.MATCH_MAX_TOP_K, description="Number of best candidates to return")
+    min_experience: Optional[float] = Field(default=None, ge=0, description="Only consider candidates with at least this many years")
@@ -0,0 +1,217 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+# Sections the LLM prompt actually needs; everything under other known
+# headings (projects, references, hobbies...) is left out of the prompt
+RELEVANT_SECTIONS = ("contact", "skills", "experience", "education")
+
+# Exact heading texts (normalized: lowercase, no bullets/colons, single spaces)
+HEADINGS = {
+    "skills": [
+        "skills", "technical skills", "key skills", "core skills", "skill set", "skillset", "skills & tools",
+        "skills and tools", "technical expertise", "core competencies", "competencies", "technologies",
+        "tech stack", "technology stack", "tools", "tools & technologies", "tools and technologies",
+        "programming languages", "languages", "frameworks", "libraries", "databases", "technical proficiency",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "relevant experience", "internships",
+        "internship", "internship experience", "employment", "employment history", "work history",
+        "career history", "professional background", "industrial experience", "freelance",
+    ],
+    "education": [
+        "education", "academic background", "academics", "academic qualifications", "qualifications",
+        "educational qualifications", "education & certifications", "education and certifications",
+    ],
+    "contact": [
+        "contact", "contact information", "contact details", "personal information", "personal details",
+    ],
+    "other": [
+        "projects", "academic projects", "personal projects", "key projects", "project experience",
+        "references", "hobbies", "interests", "hobbies & interests", "hobbies and interests",
+        "achievements", "awards", "honors", "honours", "certifications", "certificates", "publications",
+        "extracurricular activities", "extra-curricular activities", "activities", "volunteering",
+        "volunteer experience", "declaration", "summary", "profile", "professional summary", "objective",
+        "career objective", "about me", "positions of responsibility", "leadership", "languages known",
+    ],
+}
+_EXACT = {text: section for section, texts in HEADINGS.items() for text in texts}
+
+# Keywords for headings not in the exact list; only used for short lines that
+# look like headings (ALL CAPS, or ending with a colon)
+_KEYWORDS: List[Tuple[str, str]] = [
+    ("experience", "experience"), ("internship", "experience"), ("employment", "experience"),
+    ("skill", "skills"), ("technolog", "skills"), ("competenc", "skills"),
+    ("education", "education"), ("academic", "education"),
+    ("project", "other"), ("reference", "other"), ("hobb", "other"), ("interest", "other"),
+    ("achievement", "other"), ("award", "other"), ("certif", "other"), ("publication", "other"),
+    ("extracurricular", "other"), ("extra-curricular", "other"), ("volunteer", "other"),
+]
+
+_DECORATION = re.compile(r"^[\s•●▪■◆►\-*#=_|~]+|[\s:：\-–—=_|~]+$")
+_SPACES = re.compile(r"[ \t\f\v ]+")
+_INLINE_HEADING = re.compile(r"^([A-Za-z][A-Za-z &/\-]{1,40}?)\s*[:：]\s*(\S.*)$")
+_PAGE_NOISE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-\s*\d+\s*-)$", re.IGNORECASE)
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w/])(?:\+\d{1,3}[\s\-.]?)?(?:\(?\d{2,5}\)?[\s\-.]?){2,4}\d{2,5}(?![\w/])")
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE_RE = re.compile(
+    r"\b(?:" + _MONTHS + r"\s*'?\d{2,4}|\d{1,2}/\d{4}|\d{4}-\d{2}(?:-\d{2})?|(?:19|20)\d{2})\b"
+    r"|\b(?:present|current|ongoing|now)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class SegmentedCV:
+    """Result of segment_cv."""
+    sections: Dict[str, List[str]] = field(default_factory=dict)
+    emails: List[str] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    dates: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+    used_fallback: bool = True
+    prompt_text: str = ""
+    original_tokens: int = 0
+    prompt_tokens: int = 0
+
+    @property
+    def token_reduction(self) -> float:
+        """Fraction of (estimated) prompt tokens saved, 0.0 when falling back."""
+        if not self.original_tokens:
+            return 0.0
+        return round(1 - self.prompt_tokens / self.original_tokens, 4)
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough rule of thumb for Gemini/GPT-style tokenizers on English text
+    return (len(text) + 3) // 4
+
+
+def classify_heading(line: str) -> Optional[str]:
+    """Section name if the line is a section heading, else None."""
+    stripped = line.strip()
+    normalized = _SPACES.sub(" ", _DECORATION.sub("", stripped)).lower()
+    if not normalized or len(normalized) > 45:
+        return None
+    if normalized in _EXACT:
+        return _EXACT[normalized]
+
+    words = normalized.split()
+    looks_like_heading = (
+        (len(words) <= 5 and stripped.isupper())
+        or (len(words) <= 4 and stripped.rstrip().endswith((":", "：")))
+    )
+    if not looks_like_heading:
+        return None
+    # Relevant sections win over "other" when a heading mentions both
+    found = [section for keyword, section in _KEYWORDS if keyword in normalized]
+    for section in RELEVANT_SECTIONS:
+        if section in found:
+            return section
+    return found[0] if found else None
+
+
+def clean_lines(cv_text: str) -> List[str]:
+    """Collapse whitespace, drop page numbers and repeated page headers/footers."""
+    lines = []
+    seen_short: Dict[str, int] = {}
+    for raw in cv_text.splitlines():
+        line = _SPACES.sub(" ", raw).strip()
+        if not line:
+            if lines and lines[-1] != "":
+                lines.append("")
+            continue
+        if _PAGE_NOISE.match(line):
+            continue
+        # Short lines repeated across pages are running headers/footers
+        if len(line) <= 60:
+            seen_short[line] = seen_short.get(line, 0) + 1
+            if seen_short[line] > 2:
+                continue
+        lines.append(line)
+    while lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def segment_cv(cv_text: str, min_confidence: float = config.SEGMENTER_MIN_CONFIDENCE) -> SegmentedCV:
+    """
+    Split extracted CV text into sections and build a compact prompt text.
+
+    Only the contact block (text before the first heading plus any contact
+    section), skills, experience and education are kept. Text under a heading
+    we don't recognize stays with the previous section, so unknown layouts
+    lose nothing. When the expected sections aren't found with enough
+    confidence, the whole (whitespace-collapsed) text is used instead.
+
+    Args:
+        cv_text: Text from the PDF/DOCX extractors
+        min_confidence: Below this, fall back to the full text
+
+    Returns:
+        SegmentedCV with the sections, regex-found contact details and dates,
+        the text to send to the LLM and token estimates
+    """
+    lines = clean_lines(cv_text)
+    result = SegmentedCV()
+    result.emails = list(dict.fromkeys(EMAIL_RE.findall(cv_text)))
+    result.phones = list(dict.fromkeys(
+        p.strip() for p in PHONE_RE.findall(cv_text) if sum(ch.isdigit() for ch in p) >= 10
+    ))
+    result.dates = [m.group(0) for m in DATE_RE.finditer(cv_text)]
+
+    current = "contact"
+    sections: Dict[str, List[str]] = {"contact": []}
+    found = set()
+    for line in lines:
+        section = classify_heading(line)
+        if section is None:
+            inline = _INLINE_HEADING.match(line)
+            # "Skills: Python, Java" can open a relevant section, but an inline
+            # label never starts a dropped one ("Project: X" inside a job entry)
+            if inline:
+                inline_section = classify_heading(inline.group(1) + ":")
+                if inline_section in RELEVANT_SECTIONS and inline_section != current:
+                    section = inline_section
+        if section is not None:
+            current = section
+            found.add(section)
+        sections.setdefault(current, []).append(line)
+    result.sections = sections
+
+    # Confidence that the relevant content was found under recognized headings
+    confidence = 0.0
+    if "skills" in found:
+        confidence += 0.4
+    if "experience" in found:
+        confidence += 0.3
+    if "education" in found:
+        confidence += 0.2
+    if result.emails or result.phones:
+        confidence += 0.1
+    result.confidence = round(confidence, 2)
+
+    full_text = "\n".join(lines)
+    result.original_tokens = estimate_tokens(cv_text)
+    if result.confidence >= min_confidence and "skills" in found:
+        parts = []
+        for section in RELEVANT_SECTIONS:
+            body = "\n".join(sections.get(section, [])).strip()
+            if body:
+                parts.append(body)
+        # Contact details that only appeared in a dropped section go on top
+        kept = "\n".join(parts)
+        missing = [value for value in result.emails + result.phones if value not in kept]
+        if missing:
+            parts.insert(0, " | ".join(missing))
+        result.prompt_text = "\n\n".join(parts)
+        result.used_fallback = False
+    else:
+        result.prompt_text = full_text
+        result.used_fallback = True
+    result.prompt_tokens = estimate_tokens(result.prompt_text)
+    return result
@@ -0,0 +1,230 @@
+"""
+Production server: SERVE_WORKERS uvicorn worker processes pre-forked on one
+listening socket, so CPU-bound work (text extraction, JSON) uses every core.
+
+The parent binds the socket and imports the app once, then forks the
+workers; each runs its own event loop, extraction pool and job workers, and
+the kernel hands each new connection to one of them. What has to be the
+same in every worker is shared through files on the node: the LLM quota
+buckets and metrics (shared_state.py), the result cache's disk tier and its
+invalidations (cache.py) and the job queue (jobs.py). With several workers,
+SHARED_STATE_DB_PATH and JOB_QUEUE_DB_PATH default to files in the working
+directory. A worker that dies is replaced.
+
+A worker answers 503 once SERVE_WORKER_CONCURRENCY requests are in
+progress in it. On SIGTERM or SIGINT every worker stops accepting
+connections, lets in-flight requests (model calls included) and running
+jobs finish for up to SERVE_DRAIN_SECONDS, runs the app's shutdown and
+exits; workers still running well after that are killed.
+
+Usage (from backend/):
+    python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+from typing import Dict, Optional
+
+import uvicorn
+
+from logs import configure_worker_logging
+from metrics import HTTP_REQUESTS_SHED
+from shared_state import SharedState
+from startup import preload_modules
+import config
+
+logger = logging.getLogger("serve")
+
+DEFAULT_SHARED_STATE_DB_PATH = "shared_state.db"
+# Without a shared store each worker has its own job queue, and polls reaching another worker get 404
+DEFAULT_JOB_QUEUE_DB_PATH = "jobs.db"
+# Answered even by a worker at its concurrency limit: probes and scrapes must not fail under load
+UNLIMITED_PATHS = ("/", "/health", "/ready", "/metrics")
+BACKLOG = 2048
+# After the drain deadline, how long a worker may still take (app shutdown, flushing candidates) before it is killed
+KILL_GRACE_SECONDS = 10.0
+# A worker that dies sooner than this after starting is replaced only after this pause (crash loop)
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware answering 503 (with Retry-After) once limit requests are
+    in progress in this worker, so a saturated worker turns extra requests
+    away at once instead of queueing them behind slow model calls.
+    """
+
+    def __init__(self, app, limit: int, unlimited_paths=UNLIMITED_PATHS):
+        self.app = app
+        self.limit = limit
+        self.unlimited_paths = set(unlimited_paths)
+        self.in_progress = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.limit <= 0 or scope["path"] in self.unlimited_paths:
+            await self.app(scope, receive, send)
+            return
+        if self.in_progress >= self.limit:
+            HTTP_REQUESTS_SHED.inc()
+            await self._reject(send)
+            return
+        self.in_progress += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_progress -= 1
+
+    @staticmethod
+    async def _reject(send) -> None:
+        body = json.dumps({"detail": "Server is busy, retry shortly."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", b"1"), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class _WorkerServer(uvicorn.Server):
+    def handle_exit(self, sig, frame) -> None:
+        if not self.should_exit:
+            # Background jobs get the same deadline as in-flight requests (uvicorn drains those)
+            from jobs import get_job_manager
+            get_job_manager().drain_deadline = time.monotonic() + config.SERVE_DRAIN_SECONDS
+        super().handle_exit(sig, frame)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(BACKLOG)
+    return sock
+
+
+def run_worker(sock: socket.socket, app) -> int:
+    """Body of a forked worker: serve on the inherited socket until told to stop. Returns the exit code."""
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    # Forked workers would otherwise all draw the same retry jitter
+    random.seed()
+    # The app's lifespan sets up this worker's queued logging
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    server = _WorkerServer(uvicorn.Config(
+        ConcurrencyLimitMiddleware(app, config.SERVE_WORKER_CONCURRENCY),
+        timeout_graceful_shutdown=config.SERVE_DRAIN_SECONDS,
+        log_config=None,
+        access_log=False,
+    ))
+    server.run(sockets=[sock])
+    return 0 if server.started else 1
+
+
+def _exit_code(status: int) -> int:
+    return os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+
+class Supervisor:
+    """Forks the workers, replaces the ones that die and stops them all on SIGTERM / SIGINT."""
+
+    def __init__(self, sock: socket.socket, app, workers: int):
+        self.sock = sock
+        self.app = app
+        self.workers = workers
+        self.children: Dict[int, float] = {}  # pid -> time.monotonic() it started
+        self.stopping_since: Optional[float] = None
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self._spawn()
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                self._kill_stragglers()
+                time.sleep(0.2)
+                continue
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping_since is not None:
+                continue
+            logger.warning("Worker exited, starting another", extra={"pid": pid, "exit_code": _exit_code(status)})
+            if time.monotonic() - started < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            self._spawn()
+
+    def stop(self, sig, frame) -> None:
+        if self.stopping_since is None:
+            self.stopping_since = time.monotonic()
+            logger.info("Stopping workers", extra={"signal": signal.Signals(sig).name, "drain_seconds": config.SERVE_DRAIN_SECONDS})
+        # A second signal is passed on too (uvicorn: a second SIGINT skips the drain)
+        self._signal_all(signal.SIGINT if sig == signal.SIGINT else signal.SIGTERM)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(self.sock, self.app)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _kill_stragglers(self) -> None:
+        if self.stopping_since is None:
+            return
+        if time.monotonic() - self.stopping_since > config.SERVE_DRAIN_SECONDS + KILL_GRACE_SECONDS:
+            logger.error("Workers still running after the drain deadline, killing them", extra={"pids": list(self.children)})
+            self._signal_all(signal.SIGKILL)
+
+    def _signal_all(self, sig: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVE_WORKERS, help="Worker processes (0 = one per CPU core)")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    # No log writer thread in the parent: it would not survive the fork
+    configure_worker_logging()
+    logging.getLogger().setLevel(config.LOG_LEVEL.upper())
+    if workers > 1 and not config.SHARED_STATE_DB_PATH:
+        config.SHARED_STATE_DB_PATH = DEFAULT_SHARED_STATE_DB_PATH
+    if workers > 1 and not config.JOB_QUEUE_DB_PATH:
+        config.JOB_QUEUE_DB_PATH = DEFAULT_JOB_QUEUE_DB_PATH
+    if config.SHARED_STATE_DB_PATH:
+        state = SharedState(config.SHARED_STATE_DB_PATH)
+        state.reset()
+        state.close()
+
+    sock = bind_socket(args.host, args.port)
+    # Imported once before forking: workers start faster and share its memory pages.
+    # Only modules: clients, threads and connections are made by each worker's warm-up
+    from app import app
+    preload_modules()
+    logger.info("Starting workers", extra={"workers": workers, "address": f"{args.host}:{args.port}", "pid": os.getpid()})
+    Supervisor(sock, app, workers).run()
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    main()
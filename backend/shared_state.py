@@ -0,0 +1,167 @@
+"""
+State shared by the worker processes of one node (serve.py), in a small
+SQLite file at SHARED_STATE_DB_PATH:
+
+    buckets:  the LLM scheduler's per-key request and token buckets, so the
+              Gemini quota is spent by all workers together, not once each
+    metrics:  each worker's metric values, published every few seconds and
+              added up by whichever worker answers /metrics
+
+Every change is one short write transaction; WAL mode lets the workers read
+while another one writes. With no path set (a single process) everything
+stays in memory as before.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Sequence, Tuple
+
+from metrics import Registry
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def refilled(level: float, updated: float, now: float, rate: float, capacity: float) -> float:
+    """Bucket level at now, refilled at rate per second since updated (never above capacity)."""
+    # A timestamp from the future is from before a reboot (monotonic clock): start full
+    if now < updated:
+        return capacity
+    return min(capacity, level + (now - updated) * rate)
+
+
+def wait_for(level: float, amount: float, rate: float, capacity: float) -> float:
+    """Seconds until amount can be taken from a bucket at level (0 if right now)."""
+    # More than the bucket can ever hold goes through when it is full (and leaves debt)
+    missing = min(amount, capacity) - level
+    return max(0.0, missing / rate)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid is running (on this node)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedState:
+    """One connection to the shared state file, per process (open it after forking)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # This process's row in the metrics table; pids get reused, so add a random part
+        self.worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS metrics (
+                worker TEXT PRIMARY KEY,
+                pid INTEGER NOT NULL,
+                updated REAL NOT NULL,
+                payload TEXT NOT NULL
+            )"""
+        )
+
+    # Token buckets (see llm_scheduler.TokenBucket)
+    def bucket_level(self, name: str, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            return self._level(name, rate, capacity, now)
+
+    def bucket_take(self, takes: Sequence[Tuple[str, float, float, float]], now: float, only_if_ready: bool) -> float:
+        """
+        Take (name, amount, rate, capacity) from several buckets in one transaction.
+
+        With only_if_ready, nothing is taken unless every bucket has its amount;
+        the return value is then the seconds until they all will (0 = taken).
+        Otherwise everything is taken, going into debt if need be, and 0 is returned.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                levels = [self._level(name, rate, capacity, now) for name, _, rate, capacity in takes]
+                if only_if_ready:
+                    wait = max(wait_for(level, amount, rate, capacity)
+                               for level, (_, amount, rate, capacity) in zip(levels, takes))
+                    if wait > 0:
+                        self._db.execute("COMMIT")
+                        return wait
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+                    [(name, level - amount, now) for level, (name, amount, _, _) in zip(levels, takes)],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return 0.0
+
+    # Metrics
+    def publish_metrics(self, registry: Registry) -> None:
+        """Store this worker's current metric values for the others to add up."""
+        payload = json.dumps(registry.dump())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO metrics (worker, pid, updated, payload) VALUES (?, ?, ?, ?)",
+                (self.worker, os.getpid(), time.time(), payload),
+            )
+
+    def render_metrics(self, registry: Registry) -> str:
+        """
+        Prometheus text of every worker's metrics added up, this one's fresh.
+        Counters and histograms of workers that have exited still count (so
+        totals never go backwards); their gauges don't.
+        """
+        self.publish_metrics(registry)
+        with self._lock:
+            rows = self._db.execute("SELECT pid, payload FROM metrics").fetchall()
+        return registry.render([(json.loads(payload), pid_alive(pid)) for pid, payload in rows])
+
+    # Lifecycle
+    def reset(self) -> None:
+        """Forget the state of a previous run (serve.py, before starting the workers)."""
+        with self._lock:
+            self._db.execute("DELETE FROM buckets")
+            self._db.execute("DELETE FROM metrics")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # Internals (caller holds self._lock)
+    def _level(self, name: str, rate: float, capacity: float, now: float) -> float:
+        row = self._db.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return capacity
+        return refilled(row[0], row[1], now, rate, capacity)
+
+
+_shared_state: Optional[SharedState] = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """This process's connection to the shared state, or None when SHARED_STATE_DB_PATH is empty."""
+    global _shared_state
+    if not config.SHARED_STATE_DB_PATH:
+        return None
+    with _shared_state_lock:
+        if _shared_state is None:
+            _shared_state = SharedState(config.SHARED_STATE_DB_PATH)
+        return _shared_state
@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# Matching rules, mirroring the per-skill regexes recount_skill_mentions used to build:
+#   RULE_SINGLE: r'(?:^|\s)X(?=\s|\.|,|;|$)(?!\+)'  single letters such as "C" or "R"
+#   RULE_PREFIX: r'\bC\+\+'                          "C++" / "C#" (no trailing boundary)
+#   RULE_WORD:   r'\bname\b'                         everything else
+RULE_SINGLE = "single"
+RULE_PREFIX = "prefix"
+RULE_WORD = "word"
+
+PREFIX_RULE_SKILLS = ("C++", "C#")
+SINGLE_FOLLOWERS = frozenset(".,;")
+
+
+def skill_rule(name: str) -> str:
+    """Which matching rule applies to a skill name (decided on the name as written)."""
+    if len(name) == 1:
+        return RULE_SINGLE
+    if name in PREFIX_RULE_SKILLS:
+        return RULE_PREFIX
+    return RULE_WORD
+
+
+def _is_word(ch: str) -> bool:
+    # Same definition as \w for str patterns
+    return ch.isalnum() or ch == "_"
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Build a regex matching any of words, factored as a trie so each text
+    position explores one branch instead of every alternative. Longer
+    continuations are tried first, so the longest word matching at a
+    position is the one returned.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """
+    Counts every skill of a fixed skill set in one pass over the lowercased text.
+
+    The set of skill names is compiled once into a trie-shaped regex wrapped
+    in a lookahead, so a single finditer visits each candidate start position.
+    At a position the regex reports the longest skill that matches; shorter
+    skills matching at the same place are exactly its prefixes in the set,
+    which are precomputed. Each candidate is then checked against its rule and
+    counted with the same left-to-right, non-overlapping semantics re.findall had.
+    """
+
+    def __init__(self, names: Tuple[str, ...]):
+        # (lowered name, rule) -> counting slot
+        self.specs: List[Tuple[str, str]] = sorted({(name.lower(), skill_rule(name)) for name in names if name})
+        self._slot = {spec: i for i, spec in enumerate(self.specs)}
+
+        self._rules: Dict[str, List[Tuple[int, str]]] = {}
+        for (pattern, rule), slot in self._slot.items():
+            self._rules.setdefault(pattern, []).append((slot, rule))
+
+        patterns = list(self._rules)
+        self._shorter = {
+            p: [q for q in patterns if q != p and p.startswith(q)]
+            for p in patterns
+        }
+
+        # Every rule except a single non-word character starts at a word boundary,
+        # which lets the regex engine skip most positions without entering the trie
+        anchor = r"\b"
+        if any(rule == RULE_SINGLE and not _is_word(p) for p, rule in self.specs):
+            anchor = ""
+        self._regex = re.compile(anchor + "(?=(" + trie_regex(patterns) + "))") if patterns else None
+
+    def count(self, text: str) -> Dict[Tuple[str, str], int]:
+        """Mention counts keyed by (lowered name, rule)."""
+        if self._regex is None:
+            return {}
+        counts = [0] * len(self.specs)
+
+        lowered = text.lower()
+        length = len(lowered)
+        last_end = [0] * len(self.specs)
+        rules = self._rules
+        shorter = self._shorter
+
+        for match in self._regex.finditer(lowered):
+            start = match.start()
+            longest = match.group(1)
+            before = lowered[start - 1] if start > 0 else ""
+
+            for pattern in (longest, *shorter[longest]):
+                end = start + len(pattern)
+                after = lowered[end] if end < length else ""
+                for slot, rule in rules[pattern]:
+                    if rule == RULE_SINGLE:
+                        if before and not before.isspace():
+                            continue
+                        if after and not (after.isspace() or after in SINGLE_FOLLOWERS):
+                            continue
+                        # The leading whitespace is part of the match
+                        consumed_from = start - 1 if before else start
+                    else:
+                        if (before != "" and _is_word(before)) == _is_word(pattern[0]):
+                            continue
+                        if rule == RULE_WORD and (after != "" and _is_word(after)) == _is_word(pattern[-1]):
+                            continue
+                        consumed_from = start
+
+                    if consumed_from < last_end[slot]:
+                        continue
+                    counts[slot] += 1
+                    last_end[slot] = end
+
+        return {spec: counts[slot] for spec, slot in self._slot.items()}
+
+    def count_name(self, counts: Dict[Tuple[str, str], int], name: str) -> int:
+        """Look up the count for a skill name in the result of count()."""
+        return counts.get((name.lower(), skill_rule(name)), 0)
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(names: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(names)
+
+
+def get_skill_matcher(names: Iterable[str]) -> SkillMatcher:
+    """Compiled matcher for a skill set, shared by every caller asking for the same set."""
+    return _cached_matcher(tuple(sorted(set(names))))
@@ -0,0 +1,118 @@
+"""
+Cold start. The app answers /health as soon as uvicorn is up; what is slow
+to load (langchain and the Gemini client, the PDF/DOCX libraries, the skill
+taxonomy, the candidate store's search index, the candidate matrix) is
+loaded afterwards by a background warm-up task, and /ready turns 200 once
+it is all done. Point liveness probes at /health and readiness probes at
+/ready.
+
+The heavy modules are imported where they are first used (engine.py,
+file_parsing/), so `import app` stays cheap. A request arriving before the
+warm-up is through still works: it loads what it needs itself, off the
+event loop.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from candidate_store import get_candidate_store
+from engine import get_engine
+from file_parsing.pdf_parse import get_pdf_backend
+from matching import get_candidate_matrix
+from metrics import STARTUP_DURATION
+from taxonomy import get_skill_taxonomy
+import config
+
+logger = logging.getLogger(__name__)
+
+# Imported by engine.py on first use: over a second together
+LLM_MODULES = ("langchain_google_genai", "langchain.prompts", "langchain.output_parsers",
+               "langchain_core.exceptions", "langchain_core.utils.json")
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+
+def heavy_modules() -> List[str]:
+    """The lazily imported modules this configuration will need."""
+    modules = list(LLM_MODULES)
+    try:
+        modules.append(get_pdf_backend().module)
+    except ValueError:
+        # Reported by the first PDF request, as before
+        pass
+    if config.DOCX_EXTRACTOR == "python-docx":
+        modules.append("docx")
+    return modules
+
+
+def preload_modules() -> None:
+    """Import the heavy modules now (serve.py does it before forking, so the workers share them)."""
+    for name in heavy_modules():
+        importlib.import_module(name)
+
+
+async def open_llm_connection() -> None:
+    if not await get_engine().warm_up():
+        raise ConnectionError("The LLM warm-up call failed")
+
+
+class WarmUp:
+    """The background warm-up: its steps, run in order, and how each went."""
+
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable]] = [
+            ("imports", lambda: asyncio.to_thread(preload_modules)),
+            ("engine", lambda: asyncio.to_thread(get_engine)),
+            ("taxonomy", lambda: asyncio.to_thread(get_skill_taxonomy)),
+            ("candidate_store", lambda: asyncio.to_thread(get_candidate_store)),
+            ("candidate_matrix", lambda: asyncio.to_thread(get_candidate_matrix)),
+        ]
+        if config.LLM_WARMUP_ON_STARTUP:
+            # Opens the model connection; not required for readiness (a failure is only logged)
+            self.steps.append(("llm_connection", open_llm_connection))
+        self.status: Dict[str, str] = {name: PENDING for name, _ in self.steps}
+        self.errors: Dict[str, str] = {}
+        self.seconds: Dict[str, float] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return all(self.status[name] == DONE for name in self.status if name != "llm_connection")
+
+    async def run(self) -> None:
+        for name, step in self.steps:
+            started = time.perf_counter()
+            try:
+                await step()
+                self.status[name] = DONE
+            except Exception as e:
+                self.status[name] = FAILED
+                self.errors[name] = f"{type(e).__name__}: {str(e)[:200]}"
+                logger.exception("Startup step failed", extra={"step": name})
+            self.seconds[name] = round(time.perf_counter() - started, 3)
+            STARTUP_DURATION.observe(self.seconds[name], step=name)
+        self.finished = time.monotonic()
+        logger.info("Warm-up finished", extra={"ready": self.ready, "seconds": round(self.finished - self.started, 3), **self.seconds})
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "steps": dict(self.status),
+            "seconds": dict(self.seconds),
+            "errors": dict(self.errors),
+            "warm_up_seconds": round((self.finished or time.monotonic()) - self.started, 3),
+        }
+
+
+_warm_up: Optional[WarmUp] = None
+
+
+def get_warm_up() -> WarmUp:
+    """This process's warm-up (created by the app lifespan, or on first use)."""
+    global _warm_up
+    if _warm_up is None:
+        _warm_up = WarmUp()
+    return _warm_up
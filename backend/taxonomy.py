@@ -0,0 +1,246 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s,;:•●▪*\-]+|[\s,;:•●▪*]+$")
+# Separators ignored when comparing names ("React.js" ~ "ReactJS", "CI-CD" ~ "CI/CD");
+# '+' and '#' are kept so C, C++ and C# stay distinct
+_COMPACT_STRIP = re.compile(r"[\s.\-_/]+")
+_TOKEN_SPLIT = re.compile(r"[\s\-_/]+")
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)$")  # "Python (Programming Language)"
+_VERSION_SUFFIX = re.compile(r"(?:\s*v?\d+(?:\.\d+)*[a-z]?|\s+(?:lts|latest))$")  # "Python 3.10", "Angular14", "Java 8 LTS"
+
+_MEMO_MAX_ENTRIES = 100_000
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercase, single-spaced, without list bullets or trailing separators."""
+    return _EDGE_PUNCTUATION.sub("", _SPACES.sub(" ", name.lower()))
+
+
+def compact_skill(normalized: str) -> str:
+    return _COMPACT_STRIP.sub("", normalized)
+
+
+def _tokens(normalized: str) -> List[str]:
+    return [token for token in _TOKEN_SPLIT.split(normalized) if token]
+
+
+class SkillTaxonomy:
+    """
+    Compiled skill -> domain index built from the taxonomy data file.
+
+    A name is resolved by, in order: exact normalized key or alias; the same
+    with separators ignored (and an optional "js" suffix); the same again
+    after dropping a trailing parenthetical or version number; and finally the
+    longest known multi-word prefix ("AWS Lambda" -> aws) when it covers at
+    least half of the words. Results are memoized per name, so
+    classifying a skill that was seen before is one dict lookup.
+    """
+
+    def __init__(self, domains: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None,
+                 default_domain: str = "Other Technologies", version: str = "", fingerprint: str = ""):
+        self.default_domain = default_domain
+        self.version = version
+        self.fingerprint = fingerprint
+        self.path: Optional[str] = None
+        self.mtime: Optional[float] = None
+        self.loaded_at = time.time()
+
+        self._domain: Dict[str, str] = {}  # canonical key -> domain
+        for domain, skills in domains.items():
+            for skill in skills:
+                key = normalize_skill(skill)
+                if key in self._domain and self._domain[key] != domain:
+                    raise ValueError(f"Skill '{skill}' is listed under both '{self._domain[key]}' and '{domain}'")
+                self._domain[key] = domain
+
+        self._exact: Dict[str, str] = {key: key for key in self._domain}  # key or alias -> canonical key
+        for alias, target in (aliases or {}).items():
+            target_key = normalize_skill(target)
+            if target_key not in self._domain:
+                raise ValueError(f"Alias '{alias}' points to unknown skill '{target}'")
+            self._exact.setdefault(normalize_skill(alias), target_key)
+
+        self._compact: Dict[str, str] = {}
+        for name, key in self._exact.items():
+            self._compact.setdefault(compact_skill(name), key)
+
+        # Word-level trie for multi-word prefixes; "" marks the end of a key
+        self._trie: dict = {}
+        for name, key in self._exact.items():
+            node = self._trie
+            for token in _tokens(name):
+                node = node.setdefault(token, {})
+            node.setdefault("", key)
+
+        self._memo: Dict[str, str] = {}
+
+    @classmethod
+    def from_dict(cls, data: dict, fingerprint: str = "") -> "SkillTaxonomy":
+        if not isinstance(data.get("domains"), dict):
+            raise ValueError("Skill taxonomy needs a 'domains' object mapping domain names to skill lists")
+        return cls(
+            domains=data["domains"],
+            aliases=data.get("aliases", {}),
+            default_domain=data.get("default_domain", "Other Technologies"),
+            version=str(data.get("version", "")),
+            fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        """
+        Read and compile a taxonomy JSON file.
+
+        Raises:
+            ValueError: If the file is missing, not valid JSON or inconsistent
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, "rb") as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Could not load skill taxonomy from {path}: {str(e)}")
+        taxonomy = cls.from_dict(data, fingerprint=hashlib.sha256(raw).hexdigest()[:16])
+        taxonomy.path = path
+        taxonomy.mtime = mtime
+        return taxonomy
+
+    # Lookup
+    def classify(self, name: str) -> str:
+        """Domain of a skill name, or the default domain if it isn't in the taxonomy."""
+        domain = self._memo.get(name)
+        if domain is None:
+            key = self.canonical(name)
+            domain = self._domain[key] if key is not None else self.default_domain
+            if len(self._memo) >= _MEMO_MAX_ENTRIES:
+                self._memo.clear()
+            self._memo[name] = domain
+        return domain
+
+    def classify_many(self, names: Iterable[str]) -> List[str]:
+        return [self.classify(name) for name in names]
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Canonical taxonomy key for a skill name, or None if unknown."""
+        normalized = normalize_skill(name)
+        candidates = [normalized]
+        without_parenthetical = _PARENTHETICAL.sub("", normalized)
+        if without_parenthetical and without_parenthetical != normalized:
+            candidates.append(without_parenthetical)
+        for candidate in list(candidates):
+            without_version = _VERSION_SUFFIX.sub("", candidate).strip()
+            if without_version and without_version != candidate:
+                candidates.append(without_version)
+
+        for candidate in candidates:
+            key = self._exact.get(candidate)
+            if key is not None:
+                return key
+            compact = compact_skill(candidate)
+            key = self._compact.get(compact) or self._compact.get(compact + "js")
+            if key is None and compact.endswith("js") and len(compact) > 2:
+                key = self._compact.get(compact[:-2])
+            if key is not None:
+                return key
+        return self._prefix_match(candidates[-1])
+
+    def surface_forms(self) -> Dict[str, str]:
+        """Every normalized skill name and alias -> its canonical key."""
+        return dict(self._exact)
+
+    def domain_of(self, key: str) -> str:
+        return self._domain.get(key, self.default_domain)
+
+    def _prefix_match(self, normalized: str) -> Optional[str]:
+        tokens = _tokens(normalized)
+        node = self._trie
+        best, best_length = None, 0
+        for length, token in enumerate(tokens, 1):
+            node = node.get(token)
+            if node is None:
+                break
+            if "" in node:
+                best, best_length = node[""], length
+        # "Docker Compose" -> docker, but not "Go to market strategy" -> go
+        if best is not None and best_length * 2 >= len(tokens):
+            return best
+        return None
+
+    def describe(self) -> dict:
+        counts: Dict[str, int] = {}
+        for domain in self._domain.values():
+            counts[domain] = counts.get(domain, 0) + 1
+        return {
+            "path": self.path,
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "loaded_at": self.loaded_at,
+            "skills": len(self._domain),
+            "aliases": len(self._exact) - len(self._domain),
+            "domains": counts,
+        }
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_last_check = 0.0
+_taxonomy_lock = threading.Lock()
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """
+    Shared compiled taxonomy for all requests, batches and jobs.
+
+    The file's mtime is checked at most every SKILL_TAXONOMY_RELOAD_SECONDS;
+    an edited file is recompiled and swapped in. If the new file is invalid
+    the previous taxonomy stays in use.
+    """
+    global _taxonomy, _last_check
+    if _taxonomy is not None:
+        interval = config.SKILL_TAXONOMY_RELOAD_SECONDS
+        if interval <= 0 or time.monotonic() - _last_check < interval:
+            return _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = SkillTaxonomy.load(config.SKILL_TAXONOMY_PATH)
+            _last_check = time.monotonic()
+        elif time.monotonic() - _last_check >= config.SKILL_TAXONOMY_RELOAD_SECONDS:
+            _last_check = time.monotonic()
+            try:
+                changed = os.stat(_taxonomy.path).st_mtime != _taxonomy.mtime
+            except OSError:
+                changed = False
+            if changed:
+                try:
+                    _taxonomy = SkillTaxonomy.load(_taxonomy.path)
+                    logger.info(f"Reloaded skill taxonomy from {_taxonomy.path}")
+                except ValueError as e:
+                    logger.error(f"Keeping the previous skill taxonomy: {str(e)}")
+    return _taxonomy
+
+
+def reload_skill_taxonomy(path: Optional[str] = None) -> SkillTaxonomy:
+    """
+    Recompile the taxonomy now and swap it in.
+
+    Raises:
+        ValueError: If the file is invalid (the current taxonomy is kept)
+    """
+    global _taxonomy, _last_check
+    taxonomy = SkillTaxonomy.load(path or config.SKILL_TAXONOMY_PATH)
+    with _taxonomy_lock:
+        _taxonomy = taxonomy
+        _last_check = time.monotonic()
+    return taxonomy
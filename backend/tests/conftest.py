@@ -0,0 +1,10 @@
+"""
+Tests run from backend/ (`pytest`), importing the modules the way the app
+does. Nothing here calls Gemini or needs an API key.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("GOOGLE_API_KEY", "test")
@@ -0,0 +1,91 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+import batch
+import config
+from batch import BatchSource, stream_batch
+
+PDF = b"%PDF-1.4 fake"
+
+
+def upload(filename: str, content: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename, size=len(content))
+
+
+@pytest.fixture
+def processing(monkeypatch):
+    """cv_processing_encoded replaced: fails on b"%PDF-bad", tracks how many items run at once."""
+    state = {"running": 0, "most": 0}
+
+    async def fake_encoded(content, file_ext, extraction_limit=None, llm_limit=None, mode=None):
+        state["running"] += 1
+        state["most"] = max(state["most"], state["running"])
+        try:
+            await asyncio.sleep(0.01)
+            if content == b"%PDF-bad":
+                raise ValueError("unreadable CV")
+            data = {"fullName": content.decode(), "email": "a@example.com"}
+            return data, json.dumps(data)
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(batch, "cv_processing_encoded", fake_encoded)
+    monkeypatch.setattr(batch, "extraction_engine_used", lambda: "lite")
+    monkeypatch.setattr(batch, "_limits", None)
+    monkeypatch.setattr(config, "BATCH_EXTRACTION_CONCURRENCY", 2)
+    monkeypatch.setattr(config, "BATCH_LLM_CONCURRENCY", 1)
+    return state
+
+
+def run_batch(source, **kwargs) -> list:
+    async def collect():
+        return [json.loads(line) async for line in stream_batch(source, **kwargs)]
+    return asyncio.run(collect())
+
+
+def test_uploads_are_spooled_and_read_back():
+    source = asyncio.run(BatchSource.from_uploads([upload("a.pdf", PDF + b"a"), upload("b.pdf", PDF + b"b")]))
+    try:
+        assert [(item.filename, item.size, item.read()) for item in source] == [
+            ("a.pdf", len(PDF) + 1, PDF + b"a"), ("b.pdf", len(PDF) + 1, PDF + b"b")]
+    finally:
+        source.close()
+
+
+def test_zip_members_are_items_without_metadata():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as package:
+        package.writestr("cvs/a.pdf", PDF)
+        package.writestr("cvs/", "")
+        package.writestr("__MACOSX/cvs/._a.pdf", "x")
+        package.writestr("cvs/.DS_Store", "x")
+    source = asyncio.run(BatchSource.from_uploads([upload("cvs.zip", archive.getvalue())]))
+    try:
+        assert [(item.filename, item.read()) for item in source] == [("cvs/a.pdf", PDF)]
+    finally:
+        source.close()
+    with pytest.raises(ValueError, match="not a valid ZIP"):
+        asyncio.run(BatchSource.from_uploads([upload("cvs.zip", b"not a zip")]))
+
+
+def test_every_file_gets_a_line(processing):
+    files = [upload(f"{i}.pdf", b"%PDF-" + str(i).encode()) for i in range(8)]
+    files += [upload("bad.pdf", b"%PDF-bad"), upload("notes.txt", b"hello"), upload("fake.pdf", b"hello")]
+    source = asyncio.run(BatchSource.from_uploads(files))
+    lines = sorted(run_batch(source, on_close=source.close, fields=["fullName"]), key=lambda line: line["index"])
+
+    assert [line["index"] for line in lines] == list(range(11))
+    assert all(line["status"] == "ok" and line["engine"] == "lite" for line in lines[:8])
+    assert lines[3]["data"] == {"fullName": "%PDF-3"}
+    assert [line["status"] for line in lines[8:]] == ["error"] * 3
+    assert lines[8]["error"] == "unreadable CV"
+    assert "Unsupported file format" in lines[9]["error"]
+    assert "not a valid PDF or DOCX" in lines[10]["error"]
+    assert source._file.closed
+    # Never more items in flight than both budgets together
+    assert processing["most"] <= 3
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+import pytest
+
+import config
+import cv_process
+from cache import ResultCache, content_hash, make_cache_key
+
+FILE_HASH = content_hash(b"cv bytes")
+
+
+def cache_at(path, **kwargs) -> ResultCache:
+    return ResultCache(db_path=str(path), **kwargs)
+
+
+def generation_reads(cache: ResultCache) -> list:
+    """Statements reading the generation, recorded as the cache runs them."""
+    reads = []
+    cache._db.set_trace_callback(lambda sql: reads.append(sql) if "cache_meta" in sql and sql.startswith("SELECT") else None)
+    return reads
+
+
+def test_results_come_back_from_memory_then_disk(tmp_path):
+    cache = cache_at(tmp_path / "cache.db")
+    key = make_cache_key(FILE_HASH)
+    assert cache.get(key) is None
+    cache.set(key, FILE_HASH, {"fullName": "Ann"})
+    assert cache.get(key) == {"fullName": "Ann"}
+
+    restarted = cache_at(tmp_path / "cache.db")
+    assert restarted.get_payload(key) == '{"fullName": "Ann"}'
+    stats = restarted.stats()
+    assert (stats["disk_hits"], stats["memory_entries"], stats["disk_entries"]) == (1, 1, 1)
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_expired_results_are_misses(tmp_path):
+    cache = cache_at(tmp_path / "cache.db", ttl_seconds=0)
+    key = make_cache_key(FILE_HASH)
+    cache.set(key, FILE_HASH, {"fullName": "Ann"})
+    assert cache.get(key) is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_keys_differ_by_variant():
+    assert make_cache_key(FILE_HASH) != make_cache_key(FILE_HASH, variant="lite")
+    assert make_cache_key(FILE_HASH, variant="lite") == make_cache_key(FILE_HASH, variant="lite")
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("PDF_BACKEND", "pdfminer"),
+    ("PDF_MAX_PAGES", 0),
+    ("PDF_MAX_CHARS", 500),
+    ("DOCX_EXTRACTOR", "python-docx"),
+])
+def test_keys_differ_by_extraction_settings(monkeypatch, setting, value):
+    before = make_cache_key(FILE_HASH)
+    monkeypatch.setattr(config, setting, value)
+    assert make_cache_key(FILE_HASH) != before
+
+
+def test_invalidate_drops_every_variant_of_a_file(tmp_path):
+    cache = cache_at(tmp_path / "cache.db")
+    other = content_hash(b"other cv")
+    for variant in ("", "lite"):
+        cache.set(make_cache_key(FILE_HASH, variant), FILE_HASH, {"variant": variant})
+    cache.set(make_cache_key(other), other, {"fullName": "Bob"})
+
+    assert cache.invalidate(FILE_HASH) == 2
+    assert cache.get(make_cache_key(FILE_HASH)) is None
+    assert cache.get(make_cache_key(FILE_HASH, "lite")) is None
+    assert cache.get(make_cache_key(other)) == {"fullName": "Bob"}
+
+
+def test_memory_hits_do_not_read_the_generation_each_time(tmp_path):
+    cache = cache_at(tmp_path / "cache.db", generation_check_seconds=60)
+    key = make_cache_key(FILE_HASH)
+    cache.set(key, FILE_HASH, {"fullName": "Ann"})
+    reads = generation_reads(cache)
+    for _ in range(50):
+        assert cache.get_payload(key) is not None
+    assert reads == []
+
+
+def test_other_workers_invalidations_reach_the_memory_tier(tmp_path):
+    throttled = cache_at(tmp_path / "cache.db", generation_check_seconds=60)
+    eager = cache_at(tmp_path / "cache.db", generation_check_seconds=0)
+    other_worker = cache_at(tmp_path / "cache.db")
+    key = make_cache_key(FILE_HASH)
+    throttled.set(key, FILE_HASH, {"fullName": "Ann"})
+    assert eager.get(key) == {"fullName": "Ann"}
+
+    other_worker.invalidate(FILE_HASH)
+    assert eager.get(key) is None
+    # Still inside its check interval: served from memory until the next read
+    assert throttled.get(key) == {"fullName": "Ann"}
+    throttled.generation_check_seconds = 0
+    assert throttled.get(key) is None
+
+
+def test_own_invalidations_apply_at_once(tmp_path):
+    cache = cache_at(tmp_path / "cache.db", generation_check_seconds=60)
+    key = make_cache_key(FILE_HASH)
+    cache.set(key, FILE_HASH, {"fullName": "Ann"})
+    cache.clear()
+    assert cache.get(key) is None
+
+
+def test_pipeline_lookup_runs_off_the_event_loop(tmp_path):
+    cache = cache_at(tmp_path / "cache.db")
+    cache.set(make_cache_key(FILE_HASH, variant="lite"), FILE_HASH, {"fullName": "Ann"})
+    lookup_threads = []
+    get_payload = cache.get_payload
+
+    def recording_get_payload(key):
+        lookup_threads.append(threading.get_ident())
+        return get_payload(key)
+
+    cache.get_payload = recording_get_payload
+
+    async def main():
+        cached = await cv_process._cache_lookup(cache, FILE_HASH, "lite")
+        return cached, cv_process.extraction_engine_used(), threading.get_ident()
+
+    cached, engine, loop_thread = asyncio.run(main())
+    assert cached == ({"fullName": "Ann"}, '{"fullName": "Ann"}')
+    assert engine == "lite"
+    assert lookup_threads and loop_thread not in lookup_threads
+
+
+@pytest.mark.parametrize("engine_name", ["lite", "llm"])
+def test_pipeline_lookup_misses_return_none(tmp_path, engine_name):
+    cache = cache_at(tmp_path / "cache.db")
+    assert asyncio.run(cv_process._cache_lookup(cache, FILE_HASH, engine_name)) is None
+
+
+def test_uploads_without_a_hash_are_hashed_off_the_event_loop(tmp_path, monkeypatch):
+    cache = cache_at(tmp_path / "cache.db")
+    cache.set(make_cache_key(FILE_HASH, variant="lite"), FILE_HASH, {"fullName": "Ann"})
+    monkeypatch.setattr(cv_process, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(cv_process, "get_candidate_store", lambda: None)
+    hash_threads = []
+
+    def recording_content_hash(content):
+        hash_threads.append(threading.get_ident())
+        return content_hash(content)
+
+    monkeypatch.setattr(cv_process, "content_hash", recording_content_hash)
+
+    async def main():
+        events = [event async for event in cv_process.cv_processing_events(b"cv bytes", ".pdf", mode="lite")]
+        return events, threading.get_ident()
+
+    events, loop_thread = asyncio.run(main())
+    assert events[-1][1]["cached"] and events[-1][1]["data"] == {"fullName": "Ann"}
+    assert hash_threads and loop_thread not in hash_threads
@@ -0,0 +1,114 @@
+import pytest
+
+import config
+from candidate_store import BitmapIndex, CandidateStore
+from matching import CandidateMatrix, parse_job_description
+
+
+def employee(name: str, skills, years: float) -> dict:
+    return {
+        "fullName": name,
+        "email": f"{name.lower()}@example.com",
+        "designation": "Engineer",
+        "allSkills": [{"name": skill, "mentions": 2, "category": "technical"} for skill in skills],
+        "primarySkill": "",
+        "secondarySkill": "",
+        "experienceYears": years,
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "candidates.db")
+
+
+def names(result: dict):
+    return [candidate["fullName"] for candidate in result["results"]]
+
+
+def test_search_combines_skills_and_orders_by_experience(db_path):
+    store = CandidateStore(db_path)
+    store.add_many([
+        ("a", employee("Ann", ["Python", "Docker"], 3.5), None),
+        ("b", employee("Bob", ["Python"], 7.0), None),
+        ("c", employee("Cid", ["Java", "Docker"], 5.0), None),
+    ])
+    assert names(store.search(skills=["python"])) == ["Bob", "Ann"]
+    assert names(store.search(skills=["Python"], exclude_skills=["Docker"])) == ["Bob"]
+    assert names(store.search(any_skills=["Java", "Docker"])) == ["Cid", "Ann"]
+    assert names(store.search(min_experience=3.6, max_experience=7.0)) == ["Bob", "Cid"]
+    assert store.search(page=2, page_size=2)["total"] == 3
+    store.close()
+
+
+def test_a_reparsed_cv_replaces_its_entry(db_path):
+    store = CandidateStore(db_path)
+    store.add("a", employee("Ann", ["Python"], 2.0))
+    store.add("a", employee("Ann", ["Rust"], 4.0))
+    assert store.search(skills=["Python"])["total"] == 0
+    assert names(store.search(skills=["Rust"])) == ["Ann"]
+    store.add_many([("a", employee("Ann", ["Go"], 1.0))])
+    assert store.search(skills=["Rust"])["total"] == 0
+    assert store.stats()["candidates"] == 1
+    store.close()
+
+
+def test_delete_removes_from_search(db_path):
+    store = CandidateStore(db_path)
+    store.add_many([("a", employee("Ann", ["Python"], 2.0)), ("b", employee("Bob", ["Python"], 3.0))])
+    bob = store.search(skills=["Python"])["results"][0]["id"]
+    assert store.delete(bob)
+    assert not store.delete(bob)
+    assert names(store.search(skills=["Python"])) == ["Ann"]
+    store.close()
+
+
+def test_writes_through_another_connection_show_up(db_path):
+    """Two stores on one file, as two serve.py workers: each answers from every write."""
+    first, second = CandidateStore(db_path), CandidateStore(db_path)
+    matrix = CandidateMatrix()
+    second.attach(matrix)
+    profile = parse_job_description("Python developer with Docker")
+
+    first.add_many([("a", employee("Ann", ["Python", "Docker"], 3.0)), ("b", employee("Bob", ["Python"], 5.0))])
+    assert names(second.search(skills=["Python"])) == ["Bob", "Ann"]
+    second.flush()
+    assert matrix.rank(profile)[0] == 2
+
+    first.add_many([("a", employee("Ann", ["Java"], 3.0))])
+    first.delete(first.search(skills=["Python"])["results"][0]["id"])
+    assert second.search(skills=["Python"])["total"] == 0
+    assert names(second.search(skills=["Java"])) == ["Ann"]
+    assert second.stats()["candidates"] == 1
+    second.flush()
+    assert matrix.rank(profile)[0] == 1
+
+    second.add_many([("c", employee("Cid", ["Python"], 1.0))])
+    assert names(first.search(skills=["Python"])) == ["Cid"]
+    first.close()
+    second.close()
+
+
+def test_a_connection_behind_the_change_log_rebuilds(db_path, monkeypatch):
+    monkeypatch.setattr(config, "CANDIDATE_CHANGE_LOG_MAX_ROWS", 2)
+    first, second = CandidateStore(db_path), CandidateStore(db_path)
+    first.add_many([("a", employee("Ann", ["Python"], 1.0))])
+    for years in (2.0, 3.0, 4.0):
+        first.add_many([("a", employee("Ann", ["Rust"], years))])
+    first.add_many([("b", employee("Bob", ["Python"], 5.0))])
+    assert names(second.search(skills=["Python"])) == ["Bob"]
+    assert second.search(skills=["Rust"])["results"][0]["experienceYears"] == 4.0
+    assert second.stats()["candidates"] == 2
+    first.close()
+    second.close()
+
+
+def test_bitmap_index_page_filters_edge_buckets():
+    index = BitmapIndex()
+    index.add([(1, 2.9, {"skill:python": 1}), (2, 3.1, {"skill:python": 1}), (3, 3.8, {"skill:go": 1}), (4, 9.0, {})])
+    everyone = index.match([], [], [])
+    assert index.page(everyone, 3.0, 3.9, 0, 10) == (2, [3, 2])
+    assert index.page(index.match(["skill:python"], [], []), None, None, 0, 1) == (2, [2])
+    index.remove([(2, 3.1, {"skill:python": 1})])
+    assert index.page(everyone & index.everyone, None, None, 0, 10) == (3, [4, 3, 1])
+    assert len(index) == 3
@@ -0,0 +1,79 @@
+import asyncio
+
+import config
+import cv_process
+from benchmarks.corpus import generate_corpus
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def breaker(clock: Clock) -> CircuitBreaker:
+    return CircuitBreaker("test", window=4, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, open_seconds=10, clock=clock)
+
+
+def test_opens_on_failures_and_slow_calls_then_recovers():
+    clock = Clock()
+    llm = breaker(clock)
+    llm.record_success(0.1)
+    llm.record_failure()
+    llm.record_success(0.2)
+    assert llm.state == CLOSED  # under min_calls
+    llm.record_success(5.0)  # slow counts as bad: 2 of 4
+    assert llm.state == OPEN and not llm.allow()
+    assert llm.snapshot() == {"state": OPEN, "calls": 4, "failure_rate": 0.5}
+
+    clock.now = 10
+    assert llm.state == HALF_OPEN
+    assert llm.allow() and not llm.allow()  # one trial at a time
+    llm.record_success(0.1)
+    assert llm.state == CLOSED and llm.snapshot()["calls"] == 0
+
+
+def test_a_failed_trial_reopens():
+    clock = Clock()
+    llm = breaker(clock)
+    for _ in range(4):
+        llm.record_failure()
+    clock.now = 10
+    assert llm.allow()
+    llm.record_failure()
+    assert llm.state == OPEN
+    clock.now = 15
+    assert not llm.allow()
+
+
+def test_a_trial_that_never_reports_back_is_retried():
+    clock = Clock()
+    llm = breaker(clock)
+    for _ in range(4):
+        llm.record_failure()
+    clock.now = 10
+    assert llm.allow()
+    clock.now = 20
+    assert llm.allow()
+
+
+def test_auto_mode_uses_the_lite_engine_while_open(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "CANDIDATE_STORE_ENABLED", False)
+    clock = Clock()
+    llm = breaker(clock)
+    for _ in range(4):
+        llm.record_failure()
+    monkeypatch.setattr(cv_process, "get_llm_breaker", lambda: llm)
+    cv = generate_corpus(1, min_pages=1, max_pages=1)[0]
+
+    async def process():
+        data = await cv_process.cv_processing(cv.docx, ".docx", mode="auto")
+        return data, cv_process.extraction_engine_used()
+
+    data, engine = asyncio.run(process())
+    assert engine == "lite"
+    assert data["fullName"] == cv.employee["fullName"]
@@ -0,0 +1,66 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+
+from benchmarks.corpus import generate_corpus
+from file_parsing.doc_parse import extract_from_doc, extract_from_doc_python_docx, extract_from_doc_stream
+
+
+def docx_bytes() -> bytes:
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    run = doc.add_paragraph().add_run("Python\tSQL")
+    run.add_break()
+    run.add_text("Docker")
+    doc.add_paragraph("   ")
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).text, table.cell(0, 1).text = "Skill", "Years"
+    table.cell(1, 0).merge(table.cell(1, 1)).text = "Spans two columns"
+    table.cell(1, 2).merge(table.cell(2, 2)).text = "Spans two rows"
+    table.cell(2, 0).text = "Go"
+    doc.add_paragraph("After the table")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def blocks(text: str) -> list:
+    return text.split("\n\n")
+
+
+def test_stream_keeps_document_order():
+    assert blocks(extract_from_doc_stream(docx_bytes())) == [
+        "Jane Doe",
+        "Python\tSQL\nDocker",
+        "Skill | Years",
+        "Spans two columns | Spans two columns | Spans two rows",
+        "Go | Spans two rows",
+        "After the table",
+    ]
+
+
+@pytest.mark.parametrize("content", [docx_bytes()] + [cv.docx for cv in generate_corpus(3)])
+def test_stream_has_the_same_blocks_as_python_docx(content):
+    assert sorted(blocks(extract_from_doc(content))) == sorted(blocks(extract_from_doc_python_docx(content)))
+    assert extract_from_doc(io.BytesIO(content)) == extract_from_doc(content)
+
+
+def test_main_part_is_found_through_the_package_relationships():
+    original = zipfile.ZipFile(io.BytesIO(docx_bytes()))
+    moved = io.BytesIO()
+    with zipfile.ZipFile(moved, "w") as package:
+        for info in original.infolist():
+            data = original.read(info)
+            if info.filename == "_rels/.rels":
+                data = data.replace(b"word/document.xml", b"word/main.xml")
+            package.writestr("word/main.xml" if info.filename == "word/document.xml" else info.filename, data)
+    assert extract_from_doc_stream(moved.getvalue()).startswith("Jane Doe")
+
+
+def test_bad_input():
+    with pytest.raises(ValueError, match="Error parsing DOCX"):
+        extract_from_doc(b"PK\x03\x04 not really")
+    with pytest.raises(ValueError, match="Unknown DOCX extractor"):
+        extract_from_doc(docx_bytes(), extractor="antiword")
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import SecretStr
+
+import engine
+from benchmarks.stub_llm import CANNED_EMPLOYEE, StubChatModel
+from engine import SECTIONS, ExtractionEngine, build_llm, engine_ready
+
+
+class KeylessModel:
+    """A model whose API key is blank; warm-up calls succeed only when reachable is set."""
+
+    google_api_key = SecretStr(" ")
+
+    def __init__(self, reachable: bool):
+        self.reachable = reachable
+
+    async def ainvoke(self, prompt):
+        if not self.reachable:
+            raise ConnectionError("unauthenticated")
+        return "OK"
+
+
+def test_models_with_keys_are_ready():
+    assert ExtractionEngine(llm=build_llm("a-key")).ready
+    assert ExtractionEngine(llm=StubChatModel()).ready
+
+
+def test_blank_key_is_ready_only_after_a_warm_up_goes_through():
+    unreachable = ExtractionEngine(llm=KeylessModel(reachable=False))
+    assert not unreachable.ready
+    assert not asyncio.run(unreachable.warm_up())
+    assert not unreachable.ready
+
+    reachable = ExtractionEngine(llm=KeylessModel(reachable=True))
+    assert not reachable.ready
+    assert asyncio.run(reachable.warm_up())
+    assert reachable.ready
+
+
+def test_engine_ready_reflects_the_installed_engine():
+    try:
+        engine.set_engine(None)
+        assert not engine_ready()
+        engine.set_engine(ExtractionEngine(llm=KeylessModel(reachable=False)))
+        assert not engine_ready()
+        engine.set_engine(ExtractionEngine(llm=StubChatModel()))
+        assert engine_ready()
+    finally:
+        engine.set_engine(None)
+
+
+# A field only the section's own schema (in its format instructions) mentions
+SECTION_FIELDS = {"profile": '"fullName"', "skills": '"allSkills"', "experience": '"workExperience"'}
+
+
+def section_responder(calls: list, unparsable_once: str = ""):
+    """Answers each section call with the canned CV; the first call for unparsable_once gets broken JSON."""
+    def respond(prompt: str) -> str:
+        section = next(name for name, field in SECTION_FIELDS.items() if field in prompt)
+        calls.append(section)
+        if section == unparsable_once and calls.count(section) == 1:
+            return '{"allSkills": [{"name": '
+        return json.dumps(CANNED_EMPLOYEE)
+    return respond
+
+
+def test_sectioned_extraction_merges_one_call_per_section():
+    calls = []
+    sectioned = ExtractionEngine(llm=StubChatModel(responder=section_responder(calls)), strategy="sectioned")
+    reported = []
+    result = asyncio.run(sectioned.extract_streaming("cv text", lambda name, fields: reported.append(name)))
+    assert sorted(calls) == ["experience", "profile", "skills"]
+    assert result.fullName == CANNED_EMPLOYEE["fullName"]
+    assert len(result.allSkills) == len(CANNED_EMPLOYEE["allSkills"])
+    assert len(result.workExperience) == len(CANNED_EMPLOYEE["workExperience"])
+    assert sorted(reported) == sorted(SECTIONS)
+
+
+def test_a_section_that_does_not_parse_is_retried_alone():
+    calls = []
+    sectioned = ExtractionEngine(llm=StubChatModel(responder=section_responder(calls, "skills")), strategy="sectioned")
+    result = asyncio.run(sectioned.extract("cv text"))
+    assert sorted(calls) == ["experience", "profile", "skills", "skills"]
+    assert len(result.allSkills) == len(CANNED_EMPLOYEE["allSkills"])
+
+
+def test_single_call_streaming_reports_every_section_once():
+    single = ExtractionEngine(llm=StubChatModel(), strategy="single")
+    reported = []
+    result = asyncio.run(single.extract_streaming("cv text", lambda name, fields: reported.append((name, fields))))
+    assert sorted(name for name, _ in reported) == sorted(SECTIONS)
+    assert dict(reported)["personal"]["fullName"] == result.fullName == CANNED_EMPLOYEE["fullName"]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown LLM extraction strategy"):
+        ExtractionEngine(llm=StubChatModel(), strategy="parallel")
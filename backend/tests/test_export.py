@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import export
+from candidate_store import CandidateStore
+from export import export_stream
+
+
+def employee(name: str) -> dict:
+    return {
+        "fullName": name,
+        "email": f"{name.lower()}@example.com",
+        "allSkills": [{"name": "Python", "mentions": 3, "category": "technical"}, {"name": "SQL", "mentions": 1}],
+        "workExperience": [{"company": "Acme", "position": "Engineer", "startDate": "2020-01", "endDate": "Present"}],
+        "experienceYears": 4.5,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    store.add_many([(f"hash{i}", employee(name), None) for i, name in enumerate(["Ann", "Bob", "Cid"])])
+    return store
+
+
+def text(chunks) -> str:
+    return b"".join(chunks).decode("utf-8")
+
+
+def test_candidates_as_jsonl(store):
+    lines = [json.loads(line) for line in text(export_stream(store)).splitlines()]
+    assert [line["data"]["fullName"] for line in lines] == ["Ann", "Bob", "Cid"]
+    assert [line["file_hash"] for line in lines] == ["hash0", "hash1", "hash2"]
+    assert lines[0]["data"]["allSkills"][0]["name"] == "Python"
+
+
+def test_child_tables_as_csv(store):
+    skills = list(csv.DictReader(io.StringIO(text(export_stream(store, "csv", "skills")))))
+    assert len(skills) == 6
+    assert (skills[0]["name"], skills[0]["mentions"], skills[1]["category"]) == ("Python", "3", "")
+    jobs = list(csv.DictReader(io.StringIO(text(export_stream(store, "csv", "work_experience")))))
+    assert [(job["position_index"], job["company"]) for job in jobs] == [("0", "Acme")] * 3
+
+
+def test_pages_and_gzip(store):
+    first = [json.loads(line) for line in text(export_stream(store, limit=2)).splitlines()]
+    cursor = store.next_cursor(0, 2)
+    assert cursor == first[-1]["id"]
+    rest = gzip.decompress(b"".join(export_stream(store, after_id=cursor, gzip=True))).decode("utf-8")
+    assert [json.loads(line)["data"]["fullName"] for line in rest.splitlines()] == ["Cid"]
+    assert store.next_cursor(cursor, 2) is None
+
+
+def test_large_exports_are_chunked(store, monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_BYTES", 100)
+    chunks = list(export_stream(store, "csv"))
+    assert len(chunks) > 1
+    assert len(list(csv.reader(io.StringIO(text(chunks))))) == 4
+
+
+@pytest.mark.parametrize("fmt, table", [("xml", "candidates"), ("csv", "education")])
+def test_unknown_formats_and_tables(store, fmt, table):
+    with pytest.raises(ValueError, match="Unknown export"):
+        export_stream(store, fmt, table)
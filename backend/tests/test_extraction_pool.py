@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from file_parsing import extraction_pool
+from file_parsing.extraction_pool import ExtractionPool
+
+
+def spin_on_pathological(file_content: bytes) -> str:
+    """extract_from_doc stand-in: never returns for b"pathological", like a DOCX that parses forever."""
+    while file_content == b"pathological":
+        pass
+    return file_content.decode()
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1, document_timeout=0.5, page_timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+def test_pdf_pages_are_extracted_in_order(pool):
+    cv = generate_corpus(1, seed=5, min_pages=6, max_pages=6)[0]
+    text = asyncio.run(pool.extract(cv.pdf, ".pdf"))
+    assert text.index(cv.lines[0]) < text.index(cv.lines[-1])
+    assert pool.stats()["pages"] == 6
+
+
+def test_a_docx_over_the_time_limit_frees_its_worker(pool, monkeypatch):
+    # The pool's worker is forked on first use, so it runs the stand-in
+    monkeypatch.setattr(extraction_pool, "extract_from_doc", spin_on_pathological)
+    with pytest.raises(ValueError, match="took longer than"):
+        asyncio.run(pool.extract(b"pathological", ".docx"))
+    # The only worker has to be free again for this to finish in time
+    assert asyncio.run(pool.extract(b"ordinary", ".docx")) == "ordinary"
+    assert pool.stats()["timeouts"] == 1
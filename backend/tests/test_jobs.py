@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+import pytest
+
+import jobs
+from jobs import CANCELLED, DONE, FAILED, RUNNING, JobManager, QueueFullError
+
+
+@pytest.fixture
+def processing(monkeypatch):
+    """cv_processing replaced: waits for release (if cleared), fails on b"bad", else echoes the bytes."""
+    release = asyncio.Event()
+    release.set()
+
+    async def fake_processing(content, file_ext):
+        await release.wait()
+        if content == b"bad":
+            raise ValueError("unreadable CV")
+        return {"fullName": content.decode()}
+
+    monkeypatch.setattr(jobs, "cv_processing", fake_processing)
+    return release
+
+
+def run(manager: JobManager, scenario):
+    async def main():
+        await manager.start()
+        try:
+            return await scenario()
+        finally:
+            await manager.stop()
+    return asyncio.run(main())
+
+
+def test_jobs_run_and_report_results(processing):
+    manager = JobManager(workers=2, db_path=None)
+
+    async def scenario():
+        ok = await manager.submit(b"Ann", "ann.pdf", ".pdf")
+        bad = await manager.submit(b"bad", "bad.pdf", ".pdf")
+        return await manager.wait(ok.id, 5), await manager.wait(bad.id, 5), await manager.get("missing")
+
+    ok, bad, missing = run(manager, scenario)
+    assert (ok.status, ok.result) == (DONE, {"fullName": "Ann"})
+    assert (bad.status, bad.error) == (FAILED, "unreadable CV")
+    assert missing is None
+
+
+def test_cancel_queued_and_running_jobs(processing):
+    processing.clear()
+    manager = JobManager(workers=1, db_path=None)
+
+    async def scenario():
+        running = await manager.submit(b"Ann", "ann.pdf", ".pdf")
+        queued = await manager.submit(b"Bob", "bob.pdf", ".pdf")
+        await asyncio.sleep(0.05)
+        await manager.cancel(queued.id)
+        await manager.cancel(running.id)
+        processing.set()
+        return await manager.wait(running.id, 1), await manager.wait(queued.id, 1)
+
+    running, queued = run(manager, scenario)
+    assert running.status == CANCELLED and running.result is None
+    assert queued.status == CANCELLED
+
+
+def test_queue_depth_is_bounded(processing):
+    processing.clear()
+    manager = JobManager(workers=1, max_depth=2, db_path=None)
+
+    async def scenario():
+        for name in (b"a", b"b", b"c"):
+            await manager.submit(name, "cv.pdf", ".pdf")
+            await asyncio.sleep(0.01)
+        with pytest.raises(QueueFullError):
+            await manager.submit(b"d", "cv.pdf", ".pdf")
+        processing.set()
+
+    run(manager, scenario)
+
+
+def test_cancelled_queued_jobs_free_their_place(processing):
+    processing.clear()
+    manager = JobManager(workers=1, max_depth=2, db_path=None)
+
+    async def scenario():
+        running = await manager.submit(b"a", "cv.pdf", ".pdf")
+        await asyncio.sleep(0.01)
+        queued = [await manager.submit(name, "cv.pdf", ".pdf") for name in (b"b", b"c")]
+        assert manager.depth == 2
+        for job in queued:
+            await manager.cancel(job.id)
+        assert manager.depth == 0
+        # Both cancelled jobs are still in the queue, but no longer count
+        late = [await manager.submit(name, "cv.pdf", ".pdf") for name in (b"d", b"e")]
+        with pytest.raises(QueueFullError):
+            await manager.submit(b"f", "cv.pdf", ".pdf")
+        processing.set()
+        results = [await manager.wait(job.id, 5) for job in [running] + late]
+        assert [job.result for job in results] == [{"fullName": name} for name in ("a", "d", "e")]
+        assert [job.status for job in queued] == [CANCELLED, CANCELLED]
+        assert manager.depth == 0
+
+    run(manager, scenario)
+
+
+def test_cancel_while_the_running_status_is_stored(monkeypatch, tmp_path):
+    manager = JobManager(workers=1, db_path=str(tmp_path / "jobs.db"))
+    storing, release = threading.Event(), threading.Event()
+    update = manager._store.update
+    calls = []
+
+    def slow_update(job):
+        if job.status == RUNNING:
+            storing.set()
+            release.wait(5)
+        update(job)
+
+    manager._store.update = slow_update
+
+    async def fake_processing(content, file_ext):
+        calls.append(content)
+        return {"fullName": content.decode()}
+
+    monkeypatch.setattr(jobs, "cv_processing", fake_processing)
+
+    async def scenario():
+        job = await manager.submit(b"Ann", "ann.pdf", ".pdf")
+        await asyncio.to_thread(storing.wait, 5)
+        await manager.cancel(job.id)
+        release.set()
+        await asyncio.sleep(0.1)
+        return job, manager._store.load(job.id)
+
+    job, stored = run(manager, scenario)
+    assert calls == []
+    assert job.status == stored.status == CANCELLED
+    assert job.result is None
+
+
+def test_managers_sharing_a_store_see_each_others_jobs(processing, tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first, second = JobManager(workers=1, db_path=path), JobManager(workers=1, db_path=path)
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        try:
+            job = await first.submit(b"Ann", "ann.pdf", ".pdf")
+            seen = await second.wait(job.id, 5)
+            return seen
+        finally:
+            await first.stop()
+            await second.stop()
+
+    seen = asyncio.run(scenario())
+    assert seen.status == DONE
+    assert seen.result == {"fullName": "Ann"}
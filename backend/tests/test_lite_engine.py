@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from lite_engine import describe_duration, get_lite_engine, scan_skills, to_iso_date
+
+CV_TEXT = """JOHN SMITH
+john@example.com | +1 555 123 4567
+DOB: 12/03/1990
+Experience
+Acme Corp | Senior Engineer | Jan 2020 - Present
+- Built ReactJS apps with Python3 and Java 8
+Software Engineer at Globex
+03/2016 - 12/2019
+Worked on C++ and C.
+Education
+BSc Computer Science, MIT
+"""
+
+
+@pytest.mark.parametrize("text, iso", [
+    ("Jan 2020", "2020-01-01"), ("January, 2020", "2020-01-01"), ("Sep '19", "2019-09-01"),
+    ("01/2020", "2020-01-01"), ("2020-01-15", "2020-01-15"), ("2020", "2020-01-01"),
+    ("Present", "Present"), ("13/2020", None), ("someday", None),
+])
+def test_dates_are_normalized(text, iso):
+    assert to_iso_date(text) == iso
+
+
+def test_durations_are_described():
+    assert describe_duration("2016-03-01", "2019-12-01") == "3 years 9 months"
+    assert describe_duration("2020-01-01", "2020-02-01") == "1 month"
+    assert describe_duration("2020-02-01", "2020-01-01") == ""
+
+
+def test_skills_are_found_with_versions_and_aliases():
+    names = {skill.name: skill.mentions for skill in scan_skills("Python3, python and ReactJS; C++ and C. Cats.")}
+    assert names == {"Python": 2, "ReactJS": 1, "C++": 1, "C": 1}
+
+
+def test_cv_fields_are_extracted():
+    data = asyncio.run(get_lite_engine().extract(CV_TEXT))
+    assert (data.fullName, data.dob, data.email, data.contact) == ("John Smith", "1990-03-12", "john@example.com", "+1 555 123 4567")
+    assert data.designation == "Senior Engineer"
+    assert [(job.company, job.position, job.startDate, job.endDate) for job in data.workExperience] == [
+        ("Acme Corp", "Senior Engineer", "2020-01-01", "Present"),
+        ("Globex", "Software Engineer", "2016-03-01", "2019-12-01"),
+    ]
+    assert data.workExperience[1].description == "Worked on C++ and C."
+    assert data.education == "BSc Computer Science, MIT"
+    assert {"Python", "Java", "C++", "C"} <= {skill.name for skill in data.allSkills}
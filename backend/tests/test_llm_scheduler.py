@@ -0,0 +1,106 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import LLMQueueTimeoutError, LLMScheduler, TokenBucket, is_retryable
+from shared_state import SharedState
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class Reply:
+    usage_metadata = {"total_tokens": 10}
+
+
+def test_token_bucket_refills_at_its_rate():
+    now = [0.0]
+    bucket = TokenBucket(60, burst_seconds=5, clock=lambda: now[0])
+    assert bucket.capacity == 5
+    bucket.take(5)
+    assert bucket.wait_time(2) == pytest.approx(2.0)
+    now[0] += 2
+    assert bucket.wait_time(2) == 0
+    assert TokenBucket(0).wait_time(10 ** 9) == 0
+
+
+def test_is_retryable_follows_the_cause_chain():
+    wrapped = ValueError("bad")
+    wrapped.__cause__ = RateLimited()
+    assert is_retryable(wrapped)
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_retries_rate_limits_on_another_key():
+    used = []
+
+    async def invoke(llm):
+        used.append(llm)
+        if len(used) == 1:
+            raise RateLimited()
+        return Reply()
+
+    scheduler = LLMScheduler(["a", "b"], retry_base_seconds=0.01)
+    assert isinstance(asyncio.run(scheduler.call(invoke, tokens=5)), Reply)
+    assert used == ["a", "b"]
+    assert scheduler.snapshot()["keys"][0]["errors"] == 1
+
+
+def test_does_not_retry_bad_requests():
+    async def invoke(llm):
+        raise ValueError("bad request")
+
+    scheduler = LLMScheduler(["a"], retry_base_seconds=0.01)
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.call(invoke, tokens=5))
+
+
+def test_shared_buckets_are_one_quota(tmp_path):
+    path = str(tmp_path / "shared.db")
+
+    async def invoke(llm):
+        return Reply()
+
+    # 6 requests a minute: a bucket of one request, refilled after 10s
+    first = LLMScheduler(["a"], requests_per_minute=6, queue_timeout_seconds=0.2, shared_state=SharedState(path))
+    second = LLMScheduler(["a"], requests_per_minute=6, queue_timeout_seconds=0.2, shared_state=SharedState(path))
+    asyncio.run(first.call(invoke, tokens=5))
+    with pytest.raises(LLMQueueTimeoutError):
+        asyncio.run(second.call(invoke, tokens=5))
+
+
+def test_a_locked_shared_state_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "shared.db")
+    scheduler = LLMScheduler(["a"], shared_state=SharedState(path))
+    # Another worker holding the write lock for a while
+    other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.5, lambda: other.execute("COMMIT")).start()
+
+    async def invoke(llm):
+        return Reply()
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        ticking = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        await scheduler.call(invoke, tokens=5)
+        waited = time.perf_counter() - started
+        ticking.cancel()
+        return waited, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    waited, longest_gap = asyncio.run(main())
+    assert waited >= 0.4
+    assert longest_gap < 0.2
@@ -0,0 +1,77 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+import config
+import logs
+from logs import new_request_id, set_request_id
+from metrics import LOG_RECORDS_DROPPED
+
+logger = logging.getLogger("tests.logs")
+
+
+@pytest.fixture
+def output(monkeypatch):
+    """configure_logging writing to a buffer; the root level is put back afterwards."""
+    monkeypatch.setattr(config, "LOG_MAX_FIELD_CHARS", 20)
+    stream = io.StringIO()
+    root_level = logging.getLogger().level
+
+    def configure(fmt: str) -> io.StringIO:
+        logs.configure_logging(level="INFO", fmt=fmt, stream=stream)
+        return stream
+
+    yield configure
+    logs.shutdown_logging()
+    logging.getLogger().setLevel(root_level)
+    set_request_id(None)
+
+
+def records(stream: io.StringIO) -> list:
+    logs.shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_lines_with_request_id_and_extras(output):
+    stream = output("json")
+    set_request_id("req-1")
+    logger.info("Parsed %s", "cv.pdf", extra={"pages": 2, "text": "x" * 50})
+    logger.debug("not at INFO")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Failed")
+
+    parsed, failed = records(stream)
+    assert (parsed["level"], parsed["logger"], parsed["message"]) == ("INFO", "tests.logs", "Parsed cv.pdf")
+    assert parsed["request_id"] == "req-1" and parsed["pages"] == 2
+    # Cut above DEBUG level
+    assert parsed["text"] == "x" * 20 + "...[+30 chars]"
+    assert "ValueError: boom" in failed["exc"]
+
+
+def test_text_format(output):
+    stream = output("text")
+    set_request_id("req-2")
+    logger.warning("Slow", extra={"seconds": 3})
+    logs.shutdown_logging()
+    line = stream.getvalue().strip()
+    assert line.startswith("[req-2] ") and line.endswith("WARNING tests.logs: Slow seconds=3")
+
+
+def test_records_are_dropped_not_blocked_when_the_queue_is_full():
+    handler = logs._RequestQueueHandler(queue.Queue(maxsize=1), 0)
+    dropped = sum(value for _, _, _, value in LOG_RECORDS_DROPPED.samples())
+    for message in ("first", "second"):
+        handler.handle(logging.LogRecord("tests", logging.INFO, __file__, 1, message, None, None))
+    assert handler.queue.qsize() == 1
+    assert sum(value for _, _, _, value in LOG_RECORDS_DROPPED.samples()) == dropped + 1
+
+
+def test_request_ids():
+    assert new_request_id("abc-123") == "abc-123"
+    assert new_request_id("bad id\n") != "bad id\n"
+    assert len(new_request_id()) == 16
@@ -0,0 +1,155 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+import candidate_store
+import config
+import matching
+from candidate_store import CandidateStore
+from matching import CandidateMatrix, JobProfile, parse_job_description
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Requirements:
+- Python and SQL, Python, Python
+- 5+ years of experience with Docker
+- Familiarity with Kubernetes
+Nice to have:
+- React
+- 10 years of experience with AWS
+"""
+
+
+def job(skills: dict, min_years=None, domains=None) -> JobProfile:
+    return JobProfile(
+        skills={f"skill:{name}": weight for name, weight in skills.items()},
+        domains={f"domain:{name}": weight for name, weight in (domains or {}).items()},
+        min_years=min_years,
+        names={f"skill:{name}": name.title() for name in skills},
+    )
+
+
+def candidate(candidate_id: int, years: float, **mentions) -> tuple:
+    return candidate_id, years, {f"skill:{name}": count for name, count in mentions.items()}
+
+
+def test_job_descriptions_weigh_required_skills_over_nice_to_have():
+    profile = parse_job_description(JOB_DESCRIPTION)
+    assert profile.to_dict() == {
+        # Three mentions of Python are capped at 2; "Familiarity with" and "Nice to have:" halve the weight
+        "skills": {"Python": 2.0, "SQL": 1.0, "Docker": 1.0, "Kubernetes": 0.5, "React": 0.5, "AWS": 0.5},
+        "domains": {"programming languages": 2.0, "devops & cloud": 2.0, "database management": 1.0, "frontend development": 0.5},
+        # The 10 years asked for under "Nice to have" don't count
+        "min_years": 5.0,
+    }
+    assert parse_job_description("3-5 years of experience required").min_years == 3.0
+    assert parse_job_description("Friendly team, great office").empty
+
+
+def test_scores_match_a_hand_computed_example():
+    matrix = CandidateMatrix()
+    matrix.add([
+        candidate(1, 2.0, python=3, sql=1),
+        candidate(2, 8.0, python=3, sql=3),
+        candidate(3, 10.0, java=3),
+    ])
+    considered, results = matrix.rank(job({"python": 1.0, "sql": 1.0}, min_years=4.0))
+    assert considered == 3
+    assert [result["id"] for result in results] == [2, 1, 3]
+    ann = results[1]
+    # One mention of three (MATCH_MENTIONS_SATURATION) covers log(2) / log(4) = half a skill
+    assert (ann["skill_score"], ann["experience_score"]) == (0.75, 0.5)
+    # (0.6 * 0.75 + 0.2 * 0.5) / (0.6 + 0.2): no domain part without job domains
+    assert ann["score"] == 0.6875
+    assert (ann["matched_skills"], ann["missing_skills"]) == (["Python", "Sql"], [])
+    assert (results[2]["score"], results[2]["missing_skills"]) == (0.25, ["Python", "Sql"])
+
+
+def test_domain_score_is_the_cosine_of_the_domain_mix():
+    matrix = CandidateMatrix()
+    matrix.add([(1, 1.0, {"domain:programming languages": 3, "domain:database management": 4})])
+    _, [result] = matrix.rank(job({"python": 1.0}, domains={"programming languages": 2.0}))
+    assert result["domain_score"] == 0.6
+    assert "experience_score" not in result
+
+
+def test_min_experience_and_ties():
+    matrix = CandidateMatrix()
+    matrix.add([candidate(1, 3.0, python=3), candidate(2, 6.0, python=3), candidate(3, 9.0, python=3)])
+    considered, results = matrix.rank(job({"python": 1.0}), min_experience=5.0)
+    assert considered == 2
+    # Equal scores: newest first
+    assert [result["id"] for result in results] == [3, 2]
+    assert matrix.rank(job({"python": 1.0}), top_k=0) == (3, [])
+
+
+def test_updates_replace_remove_and_compact():
+    matrix = CandidateMatrix()
+    matrix.add([candidate(1, 5.0, python=3), candidate(2, 5.0, java=3)])
+    # Re-adding a candidate replaces its row
+    matrix.add([candidate(1, 5.0, java=3)])
+    assert len(matrix) == 2
+    _, results = matrix.rank(job({"python": 1.0}))
+    assert [result["skill_score"] for result in results] == [0.0, 0.0]
+
+    matrix.add(candidate(candidate_id, candidate_id / 100, go=1) for candidate_id in range(10, 2010))
+    matrix.remove(candidate(candidate_id, 1.0) for candidate_id in range(10, 1600))
+    assert len(matrix) == 412
+    # Past a quarter of the rows dead, they are compacted away
+    assert matrix._size == 412 and matrix._dead == 0
+    considered, results = matrix.rank(job({"go": 1.0}, min_years=40.0), top_k=3)
+    assert considered == 412
+    assert [result["id"] for result in results] == [2009, 2008, 2007]
+    assert all(result["skill_score"] == 0.5 for result in results)
+    assert results[0]["experience_score"] == pytest.approx(20.09 / 40, abs=1e-4)
+
+    matrix.clear()
+    assert len(matrix) == 0
+    assert matrix.rank(job({"go": 1.0})) == (0, [])
+
+
+def employee(name: str, skills, years: float) -> dict:
+    return {
+        "fullName": name,
+        "email": f"{name.lower()}@example.com",
+        "designation": "Engineer",
+        "allSkills": [{"name": skill, "mentions": 3, "category": "technical"} for skill in skills],
+        "primarySkill": "",
+        "secondarySkill": "",
+        "experienceYears": years,
+    }
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(config, "CANDIDATE_STORE_ENABLED", True)
+    monkeypatch.setattr(candidate_store, "_candidate_store", store)
+    monkeypatch.setattr(matching, "_candidate_matrix", None)
+    yield store
+    store.close()
+
+
+def test_match_endpoint_ranks_stored_candidates(store):
+    store.add_many([
+        ("a", employee("Ann", ["Python", "SQL", "Docker"], 6.0), None),
+        ("b", employee("Bob", ["Java"], 12.0), None),
+        ("c", employee("Cid", ["Python"], 2.0), None),
+    ])
+    client = TestClient(app.app)
+    response = client.post("/api/match", json={"job_description": JOB_DESCRIPTION, "top_k": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["candidates"] == 3 and body["job"]["min_years"] == 5.0
+    assert [result["fullName"] for result in body["results"]] == ["Ann", "Cid"]
+    assert body["results"][0]["matched_skills"] == ["Python", "SQL", "Docker"]
+
+    # Written after the matrix was built: it follows the store
+    store.add("d", employee("Dee", ["Python", "SQL", "Docker", "Kubernetes", "React", "AWS"], 7.0))
+    response = client.post("/api/match", json={"job_description": JOB_DESCRIPTION, "min_experience": 7})
+    assert [result["fullName"] for result in response.json()["results"]] == ["Dee", "Bob"]
+
+
+def test_match_endpoint_refuses_descriptions_without_requirements(store):
+    response = TestClient(app.app).post("/api/match", json={"job_description": "Friendly team, great office"})
+    assert response.status_code == 400
+    assert "No known skills" in response.json()["detail"]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry, server_timing_header, stage_timer, start_server_timing, STAGE_ERRORS
+
+
+def registry_with_metrics():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ["route"]))
+    in_flight = registry.register(Gauge("in_flight", "Running"))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    return registry, requests, in_flight, latency
+
+
+def test_exposition_format():
+    registry, requests, in_flight, latency = registry_with_metrics()
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    in_flight.inc()
+    in_flight.dec()
+    in_flight.set(3)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests", "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP in_flight Running", "# TYPE in_flight gauge",
+        "in_flight 3",
+        "# HELP latency_seconds Latency", "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1', 'latency_seconds_bucket{le="1"} 2', 'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55", "latency_seconds_count 3",
+    ]
+
+
+def test_workers_are_added_up_and_dead_workers_gauges_dropped():
+    registry, requests, in_flight, latency = registry_with_metrics()
+    requests.inc(route="/")
+    in_flight.set(2)
+    latency.observe(0.5)
+    # Dumps go through JSON between processes
+    dump = json.loads(json.dumps(registry.dump()))
+    text = registry.render([(dump, True), (dump, False)])
+    assert 'requests_total{route="/"} 2' in text
+    assert "in_flight 2" in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text and "latency_seconds_count 2" in text
+    # The process's own values are untouched by the sum
+    assert 'requests_total{route="/"} 1' in registry.render()
+
+
+def test_stage_timer_records_server_timing_and_errors():
+    timings = start_server_timing()
+    with stage_timer("parse"):
+        pass
+    with pytest.raises(KeyError):
+        with stage_timer("llm"):
+            raise KeyError("boom")
+    assert [name for name, _ in timings] == ["parse", "llm"]
+    assert server_timing_header([("parse", 0.0123)]) == "parse;dur=12.3"
+    assert any(key == ("llm", "KeyError") and value >= 1 for _, key, _, value in STAGE_ERRORS.samples())
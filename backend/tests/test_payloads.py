@@ -0,0 +1,88 @@
+import asyncio
+import gzip
+import importlib.util
+import json
+
+import pytest
+
+import config
+import cv_process
+import payloads
+from benchmarks.corpus import generate_corpus
+from payloads import (RESULT_FIELDS, StreamCompressor, choose_encoding, compress, encode_result, json_response,
+                      offered_encodings, parse_fields)
+from schema import EmployeeData
+
+RESULT = {"fullName": "Ann", "allSkills": [{"name": "Python", "mentions": 3}], "experienceYears": 6.5}
+
+
+@pytest.fixture
+def compression(monkeypatch):
+    """Offer gzip and br (as if brotli were installed), with a small size threshold."""
+    monkeypatch.setattr(config, "RESPONSE_COMPRESSION", ["br", "gzip"])
+    monkeypatch.setattr(config, "RESPONSE_COMPRESSION_MIN_BYTES", 64)
+    monkeypatch.setattr(payloads, "BROTLI_AVAILABLE", True)
+
+
+def test_fields_are_validated():
+    assert parse_fields([]) is None
+    assert parse_fields(["fullName", "email", "fullName"]) == ["fullName", "email"]
+    with pytest.raises(ValueError, match="Unknown field"):
+        parse_fields(["fullName", "salary"])
+    assert "allSkills" in RESULT_FIELDS
+
+
+def test_results_are_sent_as_encoded_or_projected():
+    payload = json.dumps(RESULT)
+    assert encode_result(RESULT, payload) == payload.encode("utf-8")
+    assert json.loads(encode_result(RESULT)) == RESULT
+    assert json.loads(encode_result(RESULT, payload, ["experienceYears", "email"])) == {"experienceYears": 6.5, "email": None}
+
+
+def test_brotli_is_looked_up_once(compression, monkeypatch):
+    def find_spec(name):
+        raise AssertionError("looked up per request")
+
+    monkeypatch.setattr(importlib.util, "find_spec", find_spec)
+    assert offered_encodings() == ["br", "gzip"]
+    monkeypatch.setattr(payloads, "BROTLI_AVAILABLE", False)
+    assert offered_encodings() == ["gzip"]
+
+
+@pytest.mark.parametrize("accept, chosen", [
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_encoding_follows_accept_encoding(compression, accept, chosen):
+    assert choose_encoding(accept) == chosen
+
+
+def test_small_bodies_are_not_compressed(compression):
+    small = json_response(b'{"a": 1}', "gzip")
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+    body = json.dumps([RESULT] * 10).encode("utf-8")
+    large = json_response(body, "gzip")
+    assert large.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(large.body) == body
+
+
+def test_streamed_pieces_decompress_to_the_whole():
+    compressor = StreamCompressor("gzip")
+    pieces = [json.dumps({"line": i}).encode("utf-8") + b"\n" for i in range(5)]
+    stream = b"".join(compressor.compress(piece) for piece in pieces) + compressor.finish()
+    assert gzip.decompress(stream) == b"".join(pieces)
+    assert gzip.decompress(compress(b"x" * 100, "gzip")) == b"x" * 100
+
+
+def test_pipeline_json_matches_pydantics(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "CANDIDATE_STORE_ENABLED", False)
+    cv = generate_corpus(1, min_pages=1, max_pages=1)[0]
+    data, payload = asyncio.run(cv_process.cv_processing_encoded(cv.docx, ".docx", mode="lite"))
+    assert json.loads(payload) == data
+    assert payload == EmployeeData(**data).model_dump_json()
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from file_parsing.pdf_parse import (PdfDocument, available_pdf_backends, extract_from_pdf, extract_pdf_page_range,
+                                    get_pdf_backend, iter_pdf_pages)
+
+CV = generate_corpus(1, min_pages=3, max_pages=3)[0]
+
+
+class SlowPageDocument(PdfDocument):
+    """Pages "page 0", "page 1"...; the slow page spins until interrupted."""
+
+    def __init__(self, pages: int, slow: int):
+        self.page_count = pages
+        self.slow = slow
+
+    def iter_pages(self, start=0, stop=None):
+        for page in range(start, self.page_count if stop is None else stop):
+            if page == self.slow:
+                while True:
+                    time.sleep(0.01)
+            yield f"page {page}"
+
+
+@pytest.mark.parametrize("backend", available_pdf_backends())
+def test_every_installed_backend_reads_the_cv(backend):
+    text = extract_from_pdf(CV.pdf, backend=backend, max_pages=0, max_chars=0)
+    assert text.startswith(CV.employee["fullName"])
+    assert CV.employee["email"] in text
+
+
+def test_extraction_stops_at_the_page_and_character_budgets():
+    whole = extract_from_pdf(CV.pdf, max_pages=0, max_chars=0)
+    first_page = extract_from_pdf(CV.pdf, max_pages=1, max_chars=0)
+    assert len(first_page) < len(whole) and whole.startswith(first_page)
+    assert extract_from_pdf(CV.pdf, max_pages=0, max_chars=100) == whole[:100].strip()
+
+
+def test_page_ranges_join_to_the_whole():
+    page_count, first = extract_pdf_page_range(CV.pdf, 0, 1)
+    _, rest = extract_pdf_page_range(CV.pdf, 1, None)
+    assert page_count == len(first) + len(rest)
+    assert "\n\n".join(first + rest).strip() == extract_from_pdf(CV.pdf, max_pages=0, max_chars=0)
+
+
+def test_a_slow_page_is_skipped():
+    texts = list(iter_pdf_pages(SlowPageDocument(pages=4, slow=1), page_timeout=0.2))
+    assert texts == ["page 0", "", "page 2", "page 3"]
+
+
+def test_backend_errors():
+    with pytest.raises(ValueError, match="Unknown PDF backend"):
+        get_pdf_backend("ghostscript")
+    with pytest.raises(ValueError, match="Error parsing PDF"):
+        extract_from_pdf(b"%PDF-1.4 truncated")
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+
+import app
+import config
+import engine
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_llm import StubChatModel
+from cv_process import cv_processing_events
+from engine import SECTIONS, ExtractionEngine
+
+CV = generate_corpus(1, min_pages=1, max_pages=1)[0]
+
+
+@pytest.fixture(autouse=True)
+def stub_engine(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "CANDIDATE_STORE_ENABLED", False)
+    engine.set_engine(ExtractionEngine(llm=StubChatModel(responder=lambda prompt: json.dumps(CV.employee))))
+    yield
+    engine.set_engine(None)
+
+
+def collect(events) -> list:
+    async def run():
+        return [event async for event in events]
+    return asyncio.run(run())
+
+
+def test_stages_arrive_in_order_before_the_result():
+    events = collect(cv_processing_events(CV.docx, ".docx", mode="llm"))
+    names = [name for name, _ in events]
+    assert names[:2] == ["extracted", "contact"]
+    assert names[-3:] == ["skills", "derived", "result"]
+    assert sorted(data["section"] for name, data in events if name == "section") == sorted(SECTIONS)
+
+    data = dict(events)
+    assert data["contact"]["email"] == CV.employee["email"]
+    result = data["result"]
+    assert (result["engine"], result["cached"]) == ("llm", False)
+    assert json.loads(result["json"]) == result["data"]
+    assert result["data"]["primarySkill"] == data["derived"]["primarySkill"]
+
+
+def test_only_the_result_without_progress():
+    events = collect(cv_processing_events(CV.docx, ".docx", mode="lite", progressive=False))
+    assert [name for name, _ in events] == ["result"]
+
+
+def parse_sse(messages: list) -> list:
+    parsed = []
+    for message in messages:
+        event, data = message.decode().rstrip("\n").split("\n")
+        parsed.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+def test_server_sent_events_end_with_the_result_or_an_error():
+    events = parse_sse(collect(app.stream_cv_events(CV.docx, ".docx", "hash", "lite")))
+    name, result = events[-1]
+    assert name == "result" and result["engine"] == "lite"
+    assert result["data"]["fullName"] == dict(events)["contact"]["fullName"]
+
+    failed = parse_sse(collect(app.stream_cv_events(CV.docx, ".docx", "hash", "psychic")))
+    assert failed == [("error", {"status": 400, "detail": failed[0][1]["detail"]})]
+    assert "Unknown extraction mode" in failed[0][1]["detail"]
@@ -0,0 +1,72 @@
+import pytest
+
+from segmenter import classify_heading, clean_lines, estimate_tokens, segment_cv
+
+CV_TEXT = """Jane Doe
+jane@example.com | +44 20 7946 0958
+
+SUMMARY
+Engineer who likes long walks through legacy code.
+
+Technical Skills:
+Python, Django, PostgreSQL
+
+WORK EXPERIENCE
+Acme Ltd | Backend Engineer | Jan 2020 - Present
+Project: billing rewrite
+
+Education
+BSc Computer Science, 2019
+
+Hobbies
+Chess and climbing
+Page 1 of 2
+"""
+
+
+@pytest.mark.parametrize("line, section", [
+    ("Technical Skills", "skills"), ("• EXPERIENCE:", "experience"), ("Education", "education"),
+    ("HOBBIES & INTERESTS", "other"), ("PROJECTS AND SKILLS", "skills"), ("Languages Known", "other"),
+    ("Built an ETL pipeline in Python", None), ("", None),
+])
+def test_headings_are_classified(line, section):
+    assert classify_heading(line) == section
+
+
+def test_page_noise_and_running_headers_are_dropped():
+    text = "Jane Doe CV\nPage 1 of 2\nline one\n\n\nJane Doe CV\n- 2 -\nline two\nJane Doe CV\n"
+    assert clean_lines(text) == ["Jane Doe CV", "line one", "", "Jane Doe CV", "line two"]
+
+
+def test_prompt_keeps_only_relevant_sections():
+    segmented = segment_cv(CV_TEXT)
+    assert not segmented.used_fallback
+    assert segmented.confidence == 1.0
+    assert segmented.emails == ["jane@example.com"]
+    assert segmented.phones == ["+44 20 7946 0958"]
+    assert "Python, Django" in segmented.prompt_text and "Acme Ltd" in segmented.prompt_text
+    # An inline label inside a job entry doesn't open a dropped section
+    assert "Project: billing rewrite" in segmented.prompt_text
+    assert "legacy code" not in segmented.prompt_text and "Chess" not in segmented.prompt_text
+    assert segmented.prompt_tokens < segmented.original_tokens
+    assert segmented.token_reduction > 0
+
+
+def test_unrecognized_layouts_fall_back_to_the_full_text():
+    text = "Jane Doe\nI have done many things with Python at many companies.\n"
+    segmented = segment_cv(text)
+    assert segmented.used_fallback
+    assert segmented.prompt_text == text.strip()
+    assert segmented.token_reduction == 0.0
+
+
+def test_contact_details_in_dropped_sections_are_kept():
+    text = CV_TEXT.replace("jane@example.com | +44 20 7946 0958\n", "") + "\nReferences\nref@example.com\n"
+    segmented = segment_cv(text, min_confidence=0.5)
+    assert segmented.prompt_text.startswith("ref@example.com")
+
+
+def test_token_estimate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
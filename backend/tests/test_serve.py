@@ -0,0 +1,93 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from serve import ConcurrencyLimitMiddleware
+from tests.conftest import BACKEND_DIR
+
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server(tmp_path):
+    """serve.py with 3 workers in tmp_path, no job store or shared state configured."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, EXTRACTION_MODE="lite", EXTRACTION_PROCESS_WORKERS="0",
+               LOG_LEVEL="WARNING", GOOGLE_API_KEY="test", JOB_QUEUE_DB_PATH="", SHARED_STATE_DB_PATH="")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--workers", "3", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    try:
+        while True:
+            assert process.poll() is None, "serve.py exited"
+            assert time.monotonic() < deadline, "serve.py did not start"
+            try:
+                if httpx.get(base_url + "/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def test_jobs_are_visible_from_every_worker(server, tmp_path):
+    cv = generate_corpus(1, seed=3, max_pages=1)[0]
+    job_ids = []
+    for _ in range(3):
+        response = httpx.post(server + "/api/jobs", files={"file": ("cv.pdf", cv.pdf, "application/pdf")}, timeout=30)
+        assert response.status_code == 202
+        job_ids.append(response.json()["job_id"])
+    # A new connection for every poll, so they are spread over the workers
+    statuses = [httpx.get(f"{server}/api/jobs/{job_id}", timeout=30).status_code for job_id in job_ids for _ in range(4)]
+    assert statuses == [200] * 12
+    for job_id in job_ids:
+        job = httpx.get(f"{server}/api/jobs/{job_id}", params={"wait": 20}, timeout=30).json()
+        assert job["status"] == "done"
+        assert job["result"]["fullName"] == cv.employee["fullName"]
+    assert (tmp_path / "jobs.db").exists()
+
+
+def test_concurrency_limit_sheds_extra_requests():
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+
+    async def send(message):
+        sent.append(message)
+
+    async def main():
+        middleware = ConcurrencyLimitMiddleware(slow_app, limit=1)
+        scope = {"type": "http", "path": "/api/process-cv"}
+        first = asyncio.create_task(middleware(scope, None, send))
+        await asyncio.sleep(0)
+        await middleware(scope, None, send)
+        release.set()
+        await first
+
+    asyncio.run(main())
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
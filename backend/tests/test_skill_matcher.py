@@ -0,0 +1,46 @@
+import random
+import re
+
+import pytest
+
+from benchmarks.bench_skill_matcher import SKILL_POOL, legacy_recount, make_cv, make_skills
+from schema import Skill
+from skill_matcher import RULE_PREFIX, RULE_SINGLE, RULE_WORD, get_skill_matcher, skill_rule, trie_regex
+from utils import recount_skill_mentions
+
+
+def test_trie_regex_matches_the_longest_word():
+    regex = re.compile("(?:" + trie_regex(["java", "javascript", "c", "c++", "c#"]) + ")")
+    assert regex.fullmatch("java") and regex.fullmatch("c++") and regex.fullmatch("c#")
+    assert regex.match("javascript!").group(0) == "javascript"
+    assert regex.match("c++17").group(0) == "c++"
+    assert regex.fullmatch("jav") is None
+    assert trie_regex([]) == ""
+
+
+@pytest.mark.parametrize("name, rule", [("C", RULE_SINGLE), ("C++", RULE_PREFIX), ("C#", RULE_PREFIX), ("Go", RULE_WORD)])
+def test_skill_rules(name, rule):
+    assert skill_rule(name) == rule
+
+
+def test_tricky_single_letters_and_prefixes():
+    matcher = get_skill_matcher(["C", "C++", "C#", "R", "Go"])
+    counts = matcher.count("Shipped C, C++ and C# code. C-level talks; R. c++17 (C) Golang, go")
+    assert [matcher.count_name(counts, name) for name in ("C", "C++", "C#", "R", "Go")] == [1, 2, 1, 1, 1]
+
+
+def test_matchers_are_shared_per_skill_set():
+    assert get_skill_matcher(["Python", "SQL"]) is get_skill_matcher(["SQL", "Python", "SQL"])
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_recount_agrees_with_one_regex_per_skill(seed):
+    rng = random.Random(seed)
+    text = make_cv(rng, 20)
+    skills = make_skills(rng, len(SKILL_POOL))
+    expected = [(s.name, s.mentions) for s in legacy_recount(text, [s.model_copy() for s in skills])]
+    assert [(s.name, s.mentions) for s in recount_skill_mentions(text, skills)] == expected
+
+
+def test_unmentioned_skills_keep_one_mention():
+    assert recount_skill_mentions("nothing relevant", [Skill(name="Rust")])[0].mentions == 1
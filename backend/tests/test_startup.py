@@ -0,0 +1,95 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+import app
+import candidate_store
+import config
+import startup
+from candidate_store import CandidateStore
+from startup import DONE, FAILED, PENDING, WarmUp, heavy_modules
+from tests.conftest import BACKEND_DIR
+
+
+def warm_up_with(**steps) -> WarmUp:
+    warm_up = WarmUp()
+    warm_up.steps = list(steps.items())
+    warm_up.status = {name: PENDING for name in steps}
+    return warm_up
+
+
+async def succeed():
+    pass
+
+
+async def fail():
+    raise RuntimeError("no taxonomy file")
+
+
+def test_importing_the_app_leaves_heavy_modules_for_later():
+    modules = ("langchain_google_genai", "langchain", "PyPDF2", "docx")
+    code = f"import sys, app; print([m for m in {modules!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60,
+                            env=dict(os.environ, GOOGLE_API_KEY="test"))
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.strip() == "[]"
+    assert "langchain_google_genai" in heavy_modules()
+
+
+def test_ready_once_every_step_is_done():
+    warm_up = warm_up_with(imports=succeed, taxonomy=succeed)
+    assert not warm_up.ready
+    asyncio.run(warm_up.run())
+    snapshot = warm_up.snapshot()
+    assert snapshot["ready"] and snapshot["steps"] == {"imports": DONE, "taxonomy": DONE}
+    assert set(snapshot["seconds"]) == {"imports", "taxonomy"}
+
+
+def test_a_failed_step_keeps_it_unready_but_runs_the_rest():
+    warm_up = warm_up_with(taxonomy=fail, imports=succeed)
+    asyncio.run(warm_up.run())
+    snapshot = warm_up.snapshot()
+    assert not snapshot["ready"]
+    assert snapshot["steps"] == {"taxonomy": FAILED, "imports": DONE}
+    assert snapshot["errors"] == {"taxonomy": "RuntimeError: no taxonomy file"}
+
+
+def test_the_llm_connection_is_not_needed_to_be_ready():
+    warm_up = warm_up_with(imports=succeed, llm_connection=fail)
+    asyncio.run(warm_up.run())
+    assert warm_up.ready
+    assert warm_up.status["llm_connection"] == FAILED
+
+
+def test_the_candidate_store_opens_in_the_warm_up():
+    assert [name for name, _ in WarmUp().steps][:4] == ["imports", "engine", "taxonomy", "candidate_store"]
+
+
+def test_health_answers_while_the_candidate_store_opens(monkeypatch, tmp_path):
+    release, opened = threading.Event(), threading.Event()
+
+    class SlowStore(CandidateStore):
+        """Loading the search index of a large store"""
+        def __init__(self):
+            release.wait(5)
+            super().__init__(str(tmp_path / "candidates.db"))
+            opened.set()
+
+    monkeypatch.setattr(config, "CANDIDATE_STORE_ENABLED", True)
+    monkeypatch.setattr(candidate_store, "CandidateStore", SlowStore)
+    monkeypatch.setattr(candidate_store, "_candidate_store", None)
+    monkeypatch.setattr(startup, "_warm_up", warm_up_with(
+        candidate_store=lambda: asyncio.to_thread(startup.get_candidate_store)))
+
+    with TestClient(app.app) as client:
+        health, ready = client.get("/health"), client.get("/ready")
+        store_was_open = opened.is_set()
+        release.set()
+        assert opened.wait(5)
+    assert not store_was_open
+    assert health.status_code == 200 and not health.json()["ready"]
+    assert ready.status_code == 503 and ready.json()["steps"] == {"candidate_store": PENDING}
@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+import config
+import taxonomy
+from taxonomy import SkillTaxonomy, normalize_skill
+
+DATA = {
+    "version": "test",
+    "default_domain": "Other",
+    "domains": {
+        "Backend": ["Python", "Node.js", "Go", "AWS", "C", "C++", "C#"],
+        "Frontend": ["React.js", "CSS"],
+        "DevOps": ["Docker", "Docker Compose"],
+    },
+    "aliases": {"py": "Python", "golang": "Go", "amazon web services": "AWS"},
+}
+
+
+@pytest.fixture
+def skills() -> SkillTaxonomy:
+    return SkillTaxonomy.from_dict(DATA)
+
+
+def write(path, data) -> str:
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("name, domain", [
+    ("python", "Backend"), ("  • Python,", "Backend"), ("Py", "Backend"), ("Golang", "Backend"),
+    ("ReactJS", "Frontend"), ("react", "Frontend"), ("NodeJS", "Backend"),
+    ("Python 3.10", "Backend"), ("Python (Programming Language)", "Backend"),
+    ("AWS Lambda", "Backend"), ("Docker Compose", "DevOps"), ("Docker Swarm", "DevOps"),
+    ("C", "Backend"), ("C#", "Backend"), ("Go to market strategy", "Other"), ("Knitting", "Other"),
+])
+def test_names_are_classified(skills, name, domain):
+    assert skills.classify(name) == domain
+
+
+def test_canonical_keys(skills):
+    assert skills.canonical("Amazon Web Services") == "aws"
+    assert skills.canonical("C++") == "c++"
+    assert skills.canonical("Cobol") is None
+    assert normalize_skill("  Tailwind   CSS; ") == "tailwind css"
+    assert skills.describe()["aliases"] == 3
+
+
+@pytest.mark.parametrize("data, error", [
+    ({"domains": []}, "needs a 'domains' object"),
+    ({"domains": {"A": ["Python"], "B": ["python"]}}, "listed under both"),
+    ({"domains": {"A": ["Python"]}, "aliases": {"js": "JavaScript"}}, "unknown skill"),
+])
+def test_inconsistent_taxonomies_are_refused(data, error):
+    with pytest.raises(ValueError, match=error):
+        SkillTaxonomy.from_dict(data)
+
+
+def test_files_are_fingerprinted(tmp_path):
+    first = SkillTaxonomy.load(write(tmp_path / "a.json", DATA))
+    second = SkillTaxonomy.load(write(tmp_path / "b.json", dict(DATA, version="other")))
+    assert first.fingerprint and first.fingerprint != second.fingerprint
+    with pytest.raises(ValueError, match="Could not load"):
+        SkillTaxonomy.load(str(tmp_path / "missing.json"))
+
+
+def test_edited_files_are_reloaded_and_bad_edits_ignored(tmp_path, monkeypatch):
+    path = write(tmp_path / "taxonomy.json", DATA)
+    monkeypatch.setattr(config, "SKILL_TAXONOMY_PATH", path)
+    monkeypatch.setattr(config, "SKILL_TAXONOMY_RELOAD_SECONDS", 0.0001)
+    monkeypatch.setattr(taxonomy, "_taxonomy", None)
+    assert taxonomy.get_skill_taxonomy().classify("Kotlin") == "Other"
+
+    write(tmp_path / "taxonomy.json", dict(DATA, domains={**DATA["domains"], "Mobile": ["Kotlin"]}))
+    os.utime(path, (1, 1))
+    assert taxonomy.get_skill_taxonomy().classify("Kotlin") == "Mobile"
+
+    (tmp_path / "taxonomy.json").write_text("{not json")
+    os.utime(path, (2, 2))
+    assert taxonomy.get_skill_taxonomy().classify("Kotlin") == "Mobile"
+
+
+def test_shipped_taxonomy_loads():
+    shipped = SkillTaxonomy.load(config.SKILL_TAXONOMY_PATH)
+    assert shipped.describe()["skills"] > 0
+    assert shipped.classify("Python") != shipped.default_domain
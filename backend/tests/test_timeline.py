@@ -0,0 +1,83 @@
+import random
+from datetime import date
+
+import pytest
+
+from timeline import (PRESENT, build_timeline, experience_years, experience_years_batch, find_gaps, merge_intervals,
+                      parse_date, parse_date_range)
+
+TODAY = date(2025, 1, 1)
+
+
+def day(year: int, month: int = 1, dom: int = 1) -> int:
+    return date(year, month, dom).toordinal()
+
+
+def job(start: str, end: str = "") -> dict:
+    return {"company": "Acme", "position": "Engineer", "startDate": start, "endDate": end}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-09-15", day(2024, 9, 15)), ("2024-09", day(2024, 9)), ("Sep 2024", day(2024, 9)),
+    ("September, 2024", day(2024, 9)), ("Sept. '24", day(2024, 9)), ("15 Sep 2024", day(2024, 9, 15)),
+    ("Sep 15, 2024", day(2024, 9, 15)), ("09/2024", day(2024, 9)), ("15/09/2024", day(2024, 9, 15)),
+    ("2024", day(2024)), ("Summer 2019", day(2019, 6)), ("Present", PRESENT), ("currently", PRESENT),
+    ("13/2024", None), ("Smarch 2024", None), ("", None), ("soon", None),
+])
+def test_dates_are_parsed(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2019 – Present", (day(2019), PRESENT)),
+    ("Jan 2019 to Mar 2020", (day(2019), day(2020, 3))),
+    ("2019-2021", (day(2019), day(2021))),
+    ("2019-01-2020-03", (day(2019), day(2020, 3))),
+    ("2021-2019", None),
+    ("2024", None),
+])
+def test_ranges_in_one_field_are_split(text, expected):
+    assert parse_date_range(text) == expected
+
+
+def test_intervals_merge_and_leave_gaps():
+    merged = merge_intervals([(10, 20), (0, 5), (15, 30), (5, 8), (100, 200)])
+    assert merged == [(0, 8), (10, 30), (100, 200)]
+    assert find_gaps(merged, min_days=30) == [(30, 100)]
+    assert find_gaps(merged, min_days=1) == [(8, 10), (30, 100)]
+
+
+def test_overlapping_roles_count_once():
+    timeline = build_timeline([
+        job("Jan 2015", "Jan 2019"),
+        job("2017-01", "2018-01"),  # concurrent with the first
+        job("2020 – Present"),      # whole range in the start field
+        job("whenever", "later"),
+    ], today=TODAY)
+    assert timeline.intervals == [(day(2015), day(2019)), (day(2020), day(2025))]
+    assert timeline.overlap_days == day(2018) - day(2017)
+    assert timeline.unparsed == 1
+    assert timeline.years == 9.0
+    summary = timeline.to_dict()
+    assert summary["gaps"] == [{"start": "2019-01-01", "end": "2020-01-01", "days": 365}]
+    assert summary["experienceYears"] == 9.0
+
+
+def test_jobs_ending_before_they_start_are_unparsed():
+    assert build_timeline([job("2020", "2019")], today=TODAY).unparsed == 1
+    assert experience_years([], today=TODAY) == 0.0
+
+
+def test_batch_agrees_with_one_record_at_a_time():
+    rng = random.Random(3)
+    records = []
+    for _ in range(50):
+        jobs = []
+        for _ in range(rng.randint(0, 6)):
+            start = rng.randint(2000, 2023)
+            end = rng.choice(["Present", str(rng.randint(start - 1, 2024)), f"{rng.randint(1, 12):02d}/{start + 1}"])
+            jobs.append(job(f"Jan {start}", end))
+        records.append({"workExperience": jobs})
+    expected = [experience_years(record["workExperience"], today=TODAY) for record in records]
+    assert experience_years_batch(records, today=TODAY) == expected
+    assert experience_years_batch([{"workExperience": []}], today=TODAY) == [0.0]
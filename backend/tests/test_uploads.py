@@ -0,0 +1,94 @@
+import asyncio
+import io
+import tempfile
+import zipfile
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from benchmarks.corpus import generate_corpus
+from uploads import OLE_MAGIC, detect_cv_format, receive_cv_upload, request_body_limit, sniff_format
+
+CV = generate_corpus(1, min_pages=1, max_pages=1)[0]
+
+
+def zip_of(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        for name, data in members.items():
+            package.writestr(name, data)
+    return buffer.getvalue()
+
+
+def upload(filename: str, content: bytes) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(spooled, filename=filename, size=len(content))
+
+
+def test_formats_are_sniffed_from_content():
+    assert sniff_format(CV.pdf) == ".pdf"
+    assert sniff_format(b"\n\n" + CV.pdf) == ".pdf"
+    assert sniff_format(CV.docx) == ".docx"
+    assert sniff_format(OLE_MAGIC + b"\0" * 100) == ".doc"
+    assert sniff_format(b"plain text") is None
+
+
+def test_only_word_packages_count_as_docx():
+    assert sniff_format(zip_of({"notes.txt": "hello"})) is None
+    assert sniff_format(zip_of({"[Content_Types].xml": "<Types/>", "xl/workbook.xml": "<workbook/>"})) is None
+    assert sniff_format(b"PK\x03\x04 but not a zip") is None
+    # The main part may live under another name when [Content_Types].xml says so
+    renamed = zip_of({
+        "[Content_Types].xml": '<Types><Override PartName="/word/main.xml" ContentType="application/'
+                               'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>',
+        "word/main.xml": "<document/>",
+    })
+    assert sniff_format(renamed) == ".docx"
+
+
+def test_sniffing_a_file_object_rewinds_it():
+    f = io.BytesIO(CV.docx)
+    f.seek(10)
+    assert sniff_format(f) == ".docx"
+    assert f.tell() == 0
+
+
+def test_detect_cv_format_refuses_other_files():
+    with pytest.raises(ValueError, match="Legacy .doc"):
+        detect_cv_format(OLE_MAGIC)
+    with pytest.raises(ValueError, match="not a valid PDF or DOCX"):
+        detect_cv_format(zip_of({"notes.txt": "hello"}))
+
+
+def test_uploads_are_typed_by_content_not_name():
+    received = asyncio.run(receive_cv_upload(upload("cv.docx", CV.pdf)))
+    assert (received.file_ext, received.size) == (".pdf", len(CV.pdf))
+    assert received.read_bytes() == CV.pdf
+
+    received = asyncio.run(receive_cv_upload(upload("cv.pdf", CV.docx)))
+    assert received.file_ext == ".docx"
+    assert received.buffer.tell() == 0
+
+
+@pytest.mark.parametrize("filename, content, error", [
+    ("cv.txt", b"%PDF-1.4", "Unsupported file format"),
+    ("cv.pdf", b"", "empty"),
+    ("cv.docx", zip_of({"notes.txt": "hello"}), "not a valid PDF or DOCX"),
+], ids=["extension", "empty", "plain-zip"])
+def test_bad_uploads_are_refused(filename, content, error):
+    with pytest.raises(HTTPException) as refused:
+        asyncio.run(receive_cv_upload(upload(filename, content)))
+    assert refused.value.status_code == 400
+    assert error in refused.value.detail
+
+
+def test_oversized_uploads_are_refused():
+    with pytest.raises(HTTPException, match="size exceeds"):
+        asyncio.run(receive_cv_upload(upload("cv.pdf", CV.pdf), max_bytes=len(CV.pdf) - 1))
+
+
+def test_body_limits_apply_to_upload_routes_only():
+    assert request_body_limit("/api/process-cv") < request_body_limit("/api/process-cv/batch")
+    assert request_body_limit("/health") is None
@@ -0,0 +1,253 @@
+"""
+Experience timeline: work experience dates parsed into day intervals,
+merged so overlapping and concurrent roles count once, with the gaps between
+them. experienceYears is the merged length in years (days / 365.25, one
+decimal), as calc_years_of_experience always computed it for jobs that
+don't overlap.
+
+Dates are parsed by one compiled regex, memoized: "2024-09-15", "2024-09",
+"Sep 2024", "September, 2024", "Sept. '24", "15 Sep 2024", "Sep 15, 2024",
+"09/2024", "15/09/2024", "2024", "Summer 2019" and "Present". A start date
+holding a whole range ("2019 – Present", "Jan 2019 to Mar 2020",
+"2019-2021") is split into its two ends.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from schema import EmployeeData, WorkExperience
+import config
+
+# parse_date result for "Present" / "current" / "now": resolved to today by the caller
+PRESENT = -1
+
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+    # Seasons, as some CVs date internships: the month the season starts
+    "spring": 3, "summer": 6, "fall": 9, "autumn": 9, "winter": 12,
+}
+
+DATE_RE = re.compile(r"""^\s*(?:
+    (?P<present>present|current(?:ly)?|ongoing|now|today|till\ date|to\ date)
+  | (?P<iso_y>\d{4})[-/.](?P<iso_m>\d{1,2})(?:[-/.](?P<iso_d>\d{1,2}))?(?:T[\d:.]+Z?)?  # 2024-09, 2024-09-15
+  | (?:(?P<num_d>\d{1,2})[-/.])?(?P<num_m>\d{1,2})[-/.](?P<num_y>\d{4}|\d{2})          # 09/2024, 15/09/2024, 09/24
+  | (?:(?P<name_d>\d{1,2})(?:st|nd|rd|th)?\s+)?(?P<name_m>[a-z]{3,9})\.?,?\s*'?(?P<name_y>\d{4}|\d{2})  # Sep 2024, 15 Sep 2024, Sept. '24
+  | (?P<us_m>[a-z]{3,9})\.?\s+(?P<us_d>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<us_y>\d{4})    # September 15, 2024
+  | (?P<year>(?:19|20)\d{2})
+)\s*\.?\s*$""", re.IGNORECASE | re.VERBOSE)
+
+# Separators between the two ends of a range; a bare hyphen is tried at each position instead
+_RANGE_SEPARATOR = re.compile(r"\s*(?:–|—|\s-\s|\bto\b|\btill\b|\buntil\b)\s*", re.IGNORECASE)
+
+
+def _year(text: str) -> int:
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def _ordinal(year: int, month: int, day: Optional[str]) -> Optional[int]:
+    try:
+        return date(year, month, int(day) if day else 1).toordinal()
+    except ValueError:
+        return None
+
+
+def _parse_date(text: str) -> Optional[int]:
+    match = DATE_RE.match(text)
+    if match is None:
+        return None
+    groups = match.groupdict()
+    if groups["present"]:
+        return PRESENT
+    if groups["iso_y"]:
+        return _ordinal(int(groups["iso_y"]), int(groups["iso_m"]), groups["iso_d"])
+    if groups["num_m"]:
+        return _ordinal(_year(groups["num_y"]), int(groups["num_m"]), groups["num_d"])
+    if groups["name_m"]:
+        month = _MONTHS.get(groups["name_m"].lower())
+        return _ordinal(_year(groups["name_y"]), month, groups["name_d"]) if month else None
+    if groups["us_m"]:
+        month = _MONTHS.get(groups["us_m"].lower())
+        return _ordinal(int(groups["us_y"]), month, groups["us_d"]) if month else None
+    return _ordinal(int(groups["year"]), 1, None)
+
+
+@lru_cache(maxsize=config.TIMELINE_DATE_CACHE_SIZE)
+def parse_date(text: str) -> Optional[int]:
+    """
+    A CV date as a day ordinal (date.toordinal(), the 1st when there is no
+    day), PRESENT for "Present", or None when it isn't a date.
+    """
+    return _parse_date(text or "")
+
+
+@lru_cache(maxsize=config.TIMELINE_DATE_CACHE_SIZE)
+def parse_date_range(text: str) -> Optional[Tuple[int, int]]:
+    """(start, end) of a range written in one field, e.g. "2019 – Present" (end may be PRESENT)."""
+    text = text or ""
+    parts = _RANGE_SEPARATOR.split(text, maxsplit=1)
+    if len(parts) == 2:
+        candidates = [parts]
+    else:
+        # "2019-2021", "2019-01-2020-03", "2019-Present": the split where both sides parse
+        candidates = [(text[:index], text[index + 1:]) for index, char in enumerate(text) if char == "-"]
+    for start_text, end_text in candidates:
+        # Both ends are mostly unique to this string: parsed without filling the date memo
+        start, end = _parse_date(start_text.strip()), _parse_date(end_text.strip())
+        if start not in (None, PRESENT) and end is not None and (end == PRESENT or end > start):
+            return start, end
+    return None
+
+
+def _job_dates(job: Union[WorkExperience, dict]) -> Tuple[str, str]:
+    if isinstance(job, dict):
+        return job.get("startDate") or "", job.get("endDate") or ""
+    return job.startDate or "", job.endDate or ""
+
+
+def job_interval(start_text: str, end_text: str, today: int) -> Optional[Tuple[int, int]]:
+    """[start, end) day interval of one job, or None if its dates can't be read or end before they start."""
+    start_text, end_text = start_text.strip(), end_text.strip()
+    if end_text:
+        start, end = parse_date(start_text), parse_date(end_text)
+        dates = parse_date_range(start_text) if start is None else None
+    else:
+        # The whole range is in the start field ("2019 – Present"). Looked up in the
+        # range memo only: these strings are mostly unique and would crowd out dates
+        start, end = None, None
+        dates = parse_date_range(start_text)
+    if dates is not None:
+        start, end = dates[0], dates[1] if end is None else end
+    if start is None or start == PRESENT or end is None:
+        return None
+    if end == PRESENT:
+        end = today
+    return (start, end) if end > start else None
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted, non-overlapping union of [start, end) intervals (touching ones join)."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_gaps(merged: Sequence[Tuple[int, int]], min_days: int = config.TIMELINE_MIN_GAP_DAYS) -> List[Tuple[int, int]]:
+    """Breaks of at least min_days between consecutive merged intervals, as (end of one, start of the next)."""
+    return [(merged[index][1], merged[index + 1][0]) for index in range(len(merged) - 1)
+            if merged[index + 1][0] - merged[index][1] >= min_days]
+
+
+def _iso(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _years(days: float) -> float:
+    return round(days / 365.25, 1)
+
+
+@dataclass
+class Timeline:
+    """A career as merged intervals: total experience, overlap between roles and gaps between them."""
+
+    intervals: List[Tuple[int, int]] = field(default_factory=list)  # merged [start, end) day ordinals
+    gaps: List[Tuple[int, int]] = field(default_factory=list)
+    raw_days: int = 0  # sum of every job's own duration, overlaps counted twice
+    unparsed: int = 0  # jobs whose dates couldn't be read
+
+    @property
+    def total_days(self) -> int:
+        return sum(end - start for start, end in self.intervals)
+
+    @property
+    def overlap_days(self) -> int:
+        return self.raw_days - self.total_days
+
+    @property
+    def years(self) -> float:
+        return _years(self.total_days)
+
+    def to_dict(self) -> dict:
+        return {
+            "experienceYears": self.years,
+            "intervals": [{"start": _iso(start), "end": _iso(end)} for start, end in self.intervals],
+            "gaps": [{"start": _iso(start), "end": _iso(end), "days": end - start} for start, end in self.gaps],
+            "overlap_days": self.overlap_days,
+            "unparsed_jobs": self.unparsed,
+        }
+
+
+def _today(today: Optional[date]) -> int:
+    return (today or date.today()).toordinal()
+
+
+def build_timeline(work_experience: Iterable[Union[WorkExperience, dict]], today: Optional[date] = None) -> Timeline:
+    """Timeline of a list of jobs (WorkExperience models or their dicts); "Present" is today."""
+    now = _today(today)
+    timeline = Timeline()
+    intervals = []
+    for job in work_experience:
+        interval = job_interval(*_job_dates(job), now)
+        if interval is None:
+            timeline.unparsed += 1
+            continue
+        intervals.append(interval)
+        timeline.raw_days += interval[1] - interval[0]
+    timeline.intervals = merge_intervals(intervals)
+    timeline.gaps = find_gaps(timeline.intervals)
+    return timeline
+
+
+def experience_years(work_experience: Iterable[Union[WorkExperience, dict]], today: Optional[date] = None) -> float:
+    return build_timeline(work_experience, today).years
+
+
+def experience_years_batch(records: Sequence[Union[EmployeeData, dict]], today: Optional[date] = None) -> List[float]:
+    """
+    experienceYears of many parsed CVs (EmployeeData or their dicts) at once,
+    same result as experience_years for each. Dates are parsed per job (from
+    the memo after the first time a string is seen); the intervals of all
+    records are then merged in one vectorized pass.
+    """
+    now = _today(today)
+    owners, starts, ends = [], [], []
+    for index, record in enumerate(records):
+        jobs = (record.get("workExperience") or []) if isinstance(record, dict) else record.workExperience
+        for job in jobs:
+            interval = job_interval(*_job_dates(job), now)
+            if interval is not None:
+                owners.append(index)
+                starts.append(interval[0])
+                ends.append(interval[1])
+    if not owners:
+        return [0.0] * len(records)
+
+    owner = np.asarray(owners, dtype=np.int64)
+    start = np.asarray(starts, dtype=np.int64)
+    end = np.asarray(ends, dtype=np.int64)
+    order = np.lexsort((start, owner))
+    owner, start, end = owner[order], start[order], end[order]
+    # Running maximum of end within each record: shift every record above all
+    # ordinals before it, so one global accumulate never crosses records
+    shift = owner * (int(end.max()) + 1)
+    reach = np.maximum.accumulate(end + shift) - shift
+    previous_reach = np.empty_like(reach)
+    previous_reach[0] = start[0]
+    previous_reach[1:] = reach[:-1]
+    previous_reach[1:][owner[1:] != owner[:-1]] = start[1:][owner[1:] != owner[:-1]]
+    # Each interval adds the part of it beyond everything before it in the record
+    covered = np.maximum(0, end - np.maximum(start, previous_reach))
+    days = np.bincount(owner, weights=covered, minlength=len(records))
+    return [_years(value) for value in days.tolist()]
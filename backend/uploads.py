@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Optional, Union
+
+from fastapi import HTTPException, UploadFile
+
+import config
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"  # DOCX (OOXML) is a ZIP package
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # legacy Word 97-2003 .doc
+
+DOCX_MAIN_PART = "word/document.xml"
+DOCX_CONTENT_TYPES = "[Content_Types].xml"
+DOCX_MAIN_CONTENT_TYPE = b"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+CONTENT_TYPES_MAX_BYTES = 64 * 1024  # [Content_Types].xml is a few KB; never inflate more to sniff
+
+
+def is_docx_package(content: Union[bytes, BinaryIO]) -> bool:
+    """
+    Whether a ZIP file is a Word document: it has the main document part, or
+    its [Content_Types].xml declares one (under another name). Only the ZIP
+    directory and, if needed, [Content_Types].xml are read.
+    """
+    source = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+    try:
+        with zipfile.ZipFile(source) as package:
+            names = set(package.namelist())
+            if DOCX_MAIN_PART in names:
+                return True
+            if DOCX_CONTENT_TYPES not in names:
+                return False
+            with package.open(DOCX_CONTENT_TYPES) as f:
+                return DOCX_MAIN_CONTENT_TYPE in f.read(CONTENT_TYPES_MAX_BYTES)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, OSError, EOFError):
+        return False
+    finally:
+        if source is content:
+            content.seek(0)
+
+
+def sniff_format(content: Union[bytes, BinaryIO]) -> Optional[str]:
+    """
+    Detect the real file type from its content (a file object is rewound after).
+
+    Returns:
+        '.pdf', '.docx' or '.doc' (OLE container), or None if unrecognized.
+        A ZIP counts as '.docx' only if it is a Word package (see is_docx_package).
+    """
+    if isinstance(content, (bytes, bytearray)):
+        head = content[:1024]
+    else:
+        content.seek(0)
+        head = content.read(1024)
+        content.seek(0)
+    # The PDF header may legally follow some junk within the first 1KB
+    if PDF_MAGIC in head:
+        return ".pdf"
+    if head.startswith(ZIP_MAGIC):
+        return ".docx" if is_docx_package(content) else None
+    if head.startswith(OLE_MAGIC):
+        return ".doc"
+    return None
+
+
+def detect_cv_format(content: Union[bytes, BinaryIO]) -> str:
+    """
+    File extension to parse a CV as, decided by its content.
+
+    A PDF named .docx (or a DOCX named .doc) is parsed as what it really is;
+    a ZIP that isn't a Word document is refused.
+
+    Raises:
+        ValueError: If the content is neither PDF nor DOCX
+    """
+    detected = sniff_format(content)
+    if detected == ".doc":
+        raise ValueError("Legacy .doc (Word 97-2003) files are not supported. Please save the CV as DOCX or PDF.")
+    if detected is None:
+        raise ValueError("File content is not a valid PDF or DOCX document.")
+    return detected
+
+
+@dataclass
+class ReceivedUpload:
+    """A validated CV upload, still in Starlette's spooled temporary file."""
+    filename: str
+    file_ext: str  # from the content, not the filename
+    size: int
+    sha256: str
+    buffer: BinaryIO  # rewound, ready for the extractors
+
+    def read_bytes(self) -> bytes:
+        """Materialize the upload (for consumers that outlive the request, like jobs)."""
+        self.buffer.seek(0)
+        data = self.buffer.read()
+        self.buffer.seek(0)
+        return data
+
+
+async def receive_cv_upload(file: UploadFile, max_bytes: int = config.MAX_UPLOAD_SIZE_MB * 1024 * 1024) -> ReceivedUpload:
+    """
+    Validate a CV upload without loading it into memory as one bytes object.
+
+    The file is read in chunks (hashing it for the result cache on the way) and
+    rejected as soon as it crosses max_bytes. Its type is decided by magic
+    bytes, so mislabeled or bogus files are refused before any parser runs.
+
+    Raises:
+        HTTPException: 400 for a missing, oversized, unsupported or unrecognized file
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in config.SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported file format. Only PDF and DOCX are supported.")
+
+    size_error = HTTPException(status_code=400, detail=f"File size exceeds {config.MAX_UPLOAD_SIZE_MB}MB limit.")
+    if file.size is not None and file.size > max_bytes:
+        raise size_error
+
+    await file.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise size_error
+        digest.update(chunk)
+
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+    try:
+        # A DOCX check reads the ZIP directory, possibly from a spooled file on disk
+        detected = await asyncio.to_thread(detect_cv_format, file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await file.seek(0)
+    return ReceivedUpload(filename=file.filename, file_ext=detected, size=size, sha256=digest.hexdigest(), buffer=file.file)
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware rejecting oversized request bodies with 413 while they are
+    still arriving, before the multipart parser spools them.
+
+    A declared Content-Length over the limit is refused without reading the
+    body; otherwise bytes are counted as they are received and the request is
+    cut off the moment the limit is crossed.
+    """
+
+    def __init__(self, app, limit_for_path: Callable[[str], Optional[int]]):
+        self.app = app
+        self.limit_for_path = limit_for_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+        limit = self.limit_for_path(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > limit:
+                    await self._reject(send, limit)
+                    return
+                break
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    if not rejected:
+                        rejected = True
+                        await self._reject(send, limit)
+                    # Make the app stop reading; its own response is discarded below
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({"detail": f"Request body exceeds {limit // (1024 * 1024)}MB limit."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def request_body_limit(path: str) -> Optional[int]:
+    """Byte limit for a request path (uploads only)."""
+    if path == "/api/process-cv/batch":
+        return config.BATCH_MAX_REQUEST_MB * 1024 * 1024
+    if path in ("/api/process-cv", "/api/process-cv/stream", "/api/jobs"):
+        # One file plus multipart framing
+        return (config.MAX_UPLOAD_SIZE_MB + 1) * 1024 * 1024
+    return None
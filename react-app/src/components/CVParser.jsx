@@ -38,7 +38,8 @@ const CVParser = () => {
     formData.append('file', file);
 
     try {
-      const response = await fetch('http://localhost:8000/api/process-cv', {
+      // Server-Sent Events: fields are shown as soon as each stage finishes
+      const response = await fetch('http://localhost:8000/api/process-cv/stream', {
         method: 'POST',
         body: formData,
       });
@@ -48,15 +49,43 @@ const CVParser = () => {
         throw new Error(errorData.detail || 'Failed to process CV');
       }
 
-      const data = await response.json();
-      console.log('✅ CV parsed successfully:', data);
-      
-      setCvData(data);
       setCvFile(file);
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      let done = false;
+      while (!done) {
+        const chunk = await reader.read();
+        if (chunk.done) break;
+        buffer += chunk.value;
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop();
+        for (const message of messages) {
+          const event = message.match(/^event: (.*)$/m)?.[1];
+          const payload = message.match(/^data: (.*)$/m)?.[1];
+          if (!event || !payload) continue;
+          const data = JSON.parse(payload);
+
+          if (event === 'error') {
+            throw new Error(data.detail || 'Failed to process CV');
+          } else if (event === 'contact') {
+            // Regex guesses, replaced by the model's answer when its section arrives
+            setCvData(prev => ({ ...prev, ...Object.fromEntries(Object.entries(data).filter(([, value]) => value)) }));
+          } else if (event === 'skills' || event === 'derived') {
+            setCvData(prev => ({ ...prev, ...data }));
+          } else if (event === 'section') {
+            setCvData(prev => ({ ...prev, ...data.data }));
+          } else if (event === 'result') {
+            console.log('✅ CV parsed successfully:', data.data);
+            setCvData(data.data);
+            done = true;
+          }
+        }
+      }
       
     } catch (error) {
       console.error('❌ Error processing CV:', error);
       setError(error.message || 'Failed to process CV. Please try again.');
+      setCvData(null);
       setCvFile(null);
     } finally {
       setIsProcessing(false);
@@ -301,7 +330,7 @@ const CVParser = () => {
                     </svg>
                   </div>
                   <div>
-                    <h3 className="text-xl sm:text-2xl font-bold">CV Processed Successfully!</h3>
+                    <h3 className="text-xl sm:text-2xl font-bold">{isProcessing ? 'Processing CV...' : 'CV Processed Successfully!'}</h3>
                     <p className="text-sm sm:text-base text-green-100">{cvFile?.name}</p>
                   </div>
                 </div>